@@ -4,27 +4,1007 @@ and deserialization of files and directories, and perform relevant
 filesystem operations.
 """
 
-from typing import Optional
+from typing import (
+    Optional, NamedTuple, IO, Iterable, Iterator, AsyncIterator, Callable,
+    Any
+)
 from pathlib import Path
+import os
+import asyncio
+import contextlib
+import functools
+import fnmatch
+import hashlib
+import heapq
 import shutil
-from dcm_common.util import make_path, list_directory_content
+import tempfile
+import threading
+import time
+import zlib
+import gzip
+import bz2
+import lzma
+import zipfile
+import tarfile
+from collections import deque
+from concurrent.futures import (
+    Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+)
+import concurrent.futures
+from dcm_common.util import make_path
 
 # Define the archive formats from the shutil module
 # Expected: ["bztar", "gztar", "tar", "xztar", "zip"]
 # Equivalent to using shutil.get_unpack_formats()
 _ARCHIVE_FORMATS = [el[0] for el in shutil.get_archive_formats()]
 
+# Define the tar-based archive formats that are handled by this module
+# (others are delegated to shutil) and how to open the (compressed)
+# stream; the compression-libraries' file objects support multi-stream
+# data as generated by parallel compression
+_TAR_OPENERS = {
+    "tar": open, "gztar": gzip.open, "bztar": bz2.open, "xztar": lzma.open
+}
+
+# Define the file extensions of archives generated by shutil
+_FORMAT_EXTENSIONS = {
+    "zip": ".zip",
+    "tar": ".tar",
+    "gztar": ".tar.gz",
+    "bztar": ".tar.bz2",
+    "xztar": ".tar.xz",
+}
+
+# Define suffixes that identify archive formats (used if the format can
+# not be identified by its content); longer suffixes take precedence
+_SUFFIX_FORMATS = {
+    ".tar.gz": "gztar",
+    ".tgz": "gztar",
+    ".tar.bz2": "bztar",
+    ".tbz2": "bztar",
+    ".tbz": "bztar",
+    ".tar.xz": "xztar",
+    ".txz": "xztar",
+    ".tar": "tar",
+    ".zip": "zip",
+}
+
+# Define magic bytes of zip-archives and compressed streams (a tar-
+# archive is identified by the magic "ustar" at offset 257 of the
+# (decompressed) stream)
+_ZIP_MAGIC = (b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08")
+_COMPRESSION_MAGIC = {
+    b"\x1f\x8b": ("gztar", lambda: zlib.decompressobj(wbits=31)),
+    b"BZh": ("bztar", bz2.BZ2Decompressor),
+    b"\xfd7zXZ\x00": ("xztar", lzma.LZMADecompressor),
+}
+_TAR_MAGIC_OFFSET = 257
+_TAR_MAGIC = b"ustar"
+
+# number of bytes read from a file to identify its format
+_SNIFF_SIZE = 4096
+
+# default size of chunks in bytes when copying data
+_CHUNK_SIZE = 1024 * 1024
+
+# size of blocks in bytes that are compressed independently when using
+# parallel compression
+_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class ExtractionLimits(NamedTuple):
+    """
+    Limits that are enforced while extracting archives. If a limit is
+    exceeded, extraction is stopped and an UnsafeArchiveError is
+    raised.
+
+    Keyword arguments:
+    max_total_size -- maximum number of bytes written to disk
+                      (default None -> no limit)
+    max_members -- maximum number of extracted members
+                   (default None -> no limit)
+    max_ratio -- maximum ratio of the number of bytes written to disk
+                 and the size of the archive file
+                 (default None -> no limit)
+    """
+    max_total_size: Optional[int] = None
+    max_members: Optional[int] = None
+    max_ratio: Optional[float] = None
+
+
+class UnsafeArchiveError(ValueError):
+    """
+    Raised if an archive exceeds the ExtractionLimits or contains
+    members that would be written outside of the target directory.
+    """
+
+
+class ArchiveUnpackError(Exception):
+    """
+    Raised if one or more archives of a level of a nested archive could
+    not be unpacked with workers set.
+
+    Keyword arguments:
+    errors -- list of pairs of archive path and the raised exception;
+              sorted by archive path
+    """
+    def __init__(self, errors: list[tuple[Path, Exception]]) -> None:
+        self.errors = errors
+        super().__init__(
+            f"Failed to unpack {len(errors)} archive(s): "
+            + ", ".join(f"{path} ({exc})" for path, exc in errors)
+        )
+
+
+class ArchiveOperationCancelled(Exception):
+    """
+    Raised if an archive operation has been cancelled.
+    """
+
+
+class ArchiveIntegrityError(ValueError):
+    """
+    Raised if the verification of the checksums of an archive fails.
+    """
+
+
+# errors raised by the archive- and compression-libraries for corrupt
+# data
+_INTEGRITY_ERRORS = (
+    zipfile.BadZipFile, gzip.BadGzipFile, tarfile.TarError, EOFError,
+    zlib.error, lzma.LZMAError
+)
+
+
+class _Manifest():
+    """
+    Collects digests of the members of an archive.
+
+    Keyword arguments:
+    algorithms -- names of hashlib-algorithms; a ValueError is raised
+                  for unknown algorithms
+    """
+    def __init__(self, algorithms: Iterable[str]) -> None:
+        self.algorithms = tuple(algorithms)
+        for algorithm in self.algorithms:
+            hashlib.new(algorithm)
+        self.entries: dict[str, dict[str, str]] = {}
+
+    def hashers(self) -> list:
+        """Returns a list of new hash objects (one per algorithm)."""
+        return [hashlib.new(algorithm) for algorithm in self.algorithms]
+
+    def add(self, name: str, hashers: list) -> None:
+        """Add digests of hashers for the member name."""
+        self.entries[_member_name(name)] = {
+            algorithm: hasher.hexdigest()
+            for algorithm, hasher in zip(self.algorithms, hashers)
+        }
+
+
+class _HashingReader():
+    """
+    Read-only file-like object wrapping fileobj which updates the given
+    hash objects with the read data.
+    """
+    def __init__(self, fileobj: IO[bytes], hashers: list) -> None:
+        self._fileobj = fileobj
+        self._hashers = hashers
+
+    def read(self, size: int = -1) -> bytes:
+        """Read and hash up to size bytes."""
+        data = self._fileobj.read(size)
+        for hasher in self._hashers:
+            hasher.update(data)
+        return data
+
+
+def _check_cancelled(cancel: Optional[threading.Event]) -> None:
+    """Raises ArchiveOperationCancelled if cancel is set."""
+    if cancel is not None and cancel.is_set():
+        raise ArchiveOperationCancelled("Archive operation cancelled.")
+
+
+class ArchiveEvent(NamedTuple):
+    """
+    Event that is passed to the `on_event`-callback of the archive
+    operations.
+
+    Keyword arguments:
+    kind -- one of "archive_start", "archive_finish", "member_start",
+            and "member_finish"
+    operation -- either "unpack" or "pack"
+    archive -- path of the archive (for write_archive: the packing-
+               target directory)
+    depth -- nesting level of the archive (0 for the top level)
+    member -- archive name of the member; None for archive-events
+              (default None)
+    size -- number of (uncompressed) bytes written (unpack) or read
+            (pack); only set for finish-events
+            (default 0)
+    members -- number of members of the archive; only set for
+               "archive_finish"
+               (default 0)
+    duration -- duration in seconds; only set for finish-events
+                (default 0.0)
+    """
+    kind: str
+    operation: str
+    archive: Path
+    depth: int
+    member: Optional[str] = None
+    size: int = 0
+    members: int = 0
+    duration: float = 0.0
+
+
+class ArchiveMember(NamedTuple):
+    """
+    Member of an archive as listed by list_members.
+
+    Keyword arguments:
+    name -- archive name of the member (using "/" as separator; without
+            leading "./" and trailing "/")
+    size -- (uncompressed) size in bytes
+    is_dir -- whether the member is a directory
+    """
+    name: str
+    size: int
+    is_dir: bool
+
+
+class LevelStatistics(NamedTuple):
+    """
+    Summary of the archives of a single nesting level as collected by
+    ArchiveStatistics.
+
+    Keyword arguments:
+    archives -- number of archives
+    members -- number of members
+    size -- number of (uncompressed) bytes
+    duration -- accumulated duration of the archives in seconds
+    elapsed -- wall-clock time in seconds between the first start and
+               the last finish of an archive of this level
+    """
+    archives: int = 0
+    members: int = 0
+    size: int = 0
+    duration: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second of wall-clock time (0 if unknown)."""
+        return self.size / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class ArchiveStatistics():
+    """
+    Thread-safe collector of ArchiveEvents which summarizes counts,
+    sizes, durations, and throughput overall and per nesting level. An
+    instance can be passed directly as `on_event`-callback.
+
+    Wall-clock times are measured when the events are received, i.e.,
+    for levels that are unpacked by a pool of processes, they cover the
+    time until the results are reported.
+
+    Optional arguments:
+    keep_slowest -- number of slowest members ("member_finish"-events)
+                    that are kept
+                    (default 10)
+    """
+
+    def __init__(self, keep_slowest: int = 10) -> None:
+        self.keep_slowest = keep_slowest
+        self._levels: dict[int, LevelStatistics] = {}
+        self._started: dict[int, float] = {}
+        self._slowest: list[tuple[float, int, ArchiveEvent]] = []
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, event: ArchiveEvent) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            if event.kind == "archive_start":
+                self._started.setdefault(event.depth, now)
+            elif event.kind == "archive_finish":
+                level = self._levels.get(event.depth, LevelStatistics())
+                self._levels[event.depth] = LevelStatistics(
+                    archives=level.archives + 1,
+                    members=level.members + event.members,
+                    size=level.size + event.size,
+                    duration=level.duration + event.duration,
+                    elapsed=now - self._started.get(event.depth, now),
+                )
+            elif event.kind == "member_finish" and self.keep_slowest > 0:
+                self._counter += 1
+                item = (event.duration, self._counter, event)
+                if len(self._slowest) < self.keep_slowest:
+                    heapq.heappush(self._slowest, item)
+                else:
+                    heapq.heappushpop(self._slowest, item)
+
+    @property
+    def levels(self) -> dict[int, LevelStatistics]:
+        """Statistics per nesting level (sorted by depth)."""
+        with self._lock:
+            return dict(sorted(self._levels.items()))
+
+    @property
+    def total(self) -> LevelStatistics:
+        """Statistics across all nesting levels."""
+        with self._lock:
+            levels = list(self._levels.values())
+            elapsed = 0.0
+            if self._started and levels:
+                elapsed = max(
+                    self._started[depth] + level.elapsed
+                    for depth, level in self._levels.items()
+                ) - min(self._started.values())
+        return LevelStatistics(
+            archives=sum(level.archives for level in levels),
+            members=sum(level.members for level in levels),
+            size=sum(level.size for level in levels),
+            duration=sum(level.duration for level in levels),
+            elapsed=elapsed,
+        )
+
+    @property
+    def slowest_members(self) -> list[ArchiveEvent]:
+        """
+        Returns the "member_finish"-events with the longest durations
+        (descending).
+        """
+        with self._lock:
+            return [
+                event for _, _, event in sorted(self._slowest, reverse=True)
+            ]
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Returns a JSON-serializable summary of the collected statistics.
+        """
+        def as_dict(level: LevelStatistics) -> dict[str, Any]:
+            return level._asdict() | {"throughput": level.throughput}
+
+        return {
+            "total": as_dict(self.total),
+            "levels": {
+                depth: as_dict(level) for depth, level in self.levels.items()
+            },
+            "slowest_members": [
+                {
+                    "archive": str(event.archive),
+                    "member": event.member,
+                    "depth": event.depth,
+                    "size": event.size,
+                    "duration": event.duration,
+                }
+                for event in self.slowest_members
+            ],
+        }
+
+
+class _ExtractionBudget():
+    """
+    Thread-safe record of the resources consumed while extracting one or
+    more (nested) archives.
+
+    Keyword arguments:
+    limits -- ExtractionLimits to enforce
+
+    Optional arguments:
+    cancel -- event which cancels the extraction once it is set; it is
+              not transferred to other processes
+              (default None)
+    """
+    def __init__(
+        self,
+        limits: ExtractionLimits,
+        cancel: Optional[threading.Event] = None
+    ) -> None:
+        self.limits = limits
+        self.cancel = cancel
+        self.members = 0
+        self.total_size = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["cancel"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def check(self, members: int = 0, total_size: int = 0) -> None:
+        """
+        Raises UnsafeArchiveError if adding the given consumption would
+        exceed the limits.
+        """
+        if self.limits.max_members is not None \
+                and self.members + members > self.limits.max_members:
+            raise UnsafeArchiveError(
+                "Archive exceeds the maximum number of members "
+                + f"({self.limits.max_members})."
+            )
+        if self.limits.max_total_size is not None \
+                and self.total_size + total_size \
+                > self.limits.max_total_size:
+            raise UnsafeArchiveError(
+                "Archive exceeds the maximum total size "
+                + f"({self.limits.max_total_size} bytes)."
+            )
+
+    def charge(self, members: int = 0, total_size: int = 0) -> None:
+        """
+        Add consumption; raises UnsafeArchiveError if the limits are
+        exceeded and ArchiveOperationCancelled if the extraction has been
+        cancelled.
+        """
+        _check_cancelled(self.cancel)
+        with self._lock:
+            self.check(members, total_size)
+            self.members += members
+            self.total_size += total_size
+
+
+def _safe_target(extract_dir: Path, name: str) -> Path:
+    """
+    Returns the target path of the archive member name in extract_dir.
+    Raises UnsafeArchiveError if the target is not within extract_dir.
+    """
+
+    _name = name.replace("\\", "/")
+    if _name.startswith("/") or ".." in _name.split("/") \
+            or os.path.splitdrive(_name)[0]:
+        raise UnsafeArchiveError(
+            f"Archive member '{name}' points outside of the target "
+            + "directory."
+        )
+    return extract_dir / _name
+
+
+def _check_write_target(extract_dir: Path, target: Path, name: str) -> None:
+    """
+    Raises UnsafeArchiveError if target is an existing symlink or if its
+    parent directory resolves to a location outside of extract_dir
+    (e.g., via a symlink that has been extracted before). Has to be
+    called right before target is written.
+    """
+
+    if target == extract_dir:  # e.g., member "./"
+        return
+    root = os.path.realpath(extract_dir)
+    parent = os.path.realpath(target.parent)
+    if parent != root and not parent.startswith(root + os.sep):
+        raise UnsafeArchiveError(
+            f"Archive member '{name}' points outside of the target "
+            + "directory."
+        )
+    if target.is_symlink():
+        raise UnsafeArchiveError(
+            f"Archive member '{name}' would replace an existing link."
+        )
+
+
+def _copy_member(
+    source: IO[bytes],
+    target: Path,
+    budget: _ExtractionBudget,
+    max_size: Optional[int],
+    chunk_size: int,
+    hashers: Iterable = ()
+) -> int:
+    """
+    Copy data from source to target in chunks while charging the
+    budget and updating the hash objects hashers; the target is deleted
+    if a limit is exceeded. max_size is the maximum number of bytes that
+    can be written from the current archive. Returns the number of bytes
+    written.
+    """
+
+    written = 0
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(target, "wb") as target_file:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if max_size is not None and written > max_size:
+                    raise UnsafeArchiveError(
+                        "Archive exceeds the maximum compression ratio "
+                        + f"({budget.limits.max_ratio})."
+                    )
+                budget.charge(total_size=len(chunk))
+                for hasher in hashers:
+                    hasher.update(chunk)
+                target_file.write(chunk)
+    except BaseException:
+        target.unlink(missing_ok=True)
+        raise
+    return written
+
+
+class _MemberEvents():
+    """
+    Context manager which emits start- and finish-events for a single
+    member to on_event (if set); the size of the member is expected to
+    be assigned to the attribute `size` before the context is left. No
+    finish-event is emitted if an exception occurs.
+    """
+    def __init__(
+        self,
+        on_event: Optional[Callable[[ArchiveEvent], None]],
+        operation: str,
+        archive: Path,
+        depth: int,
+        member: str
+    ) -> None:
+        self._on_event = on_event
+        self._event = ArchiveEvent(
+            "member_start", operation, archive, depth, member
+        )
+        self._start = 0.0
+        self.size = 0
+
+    def __enter__(self) -> "_MemberEvents":
+        if self._on_event is not None:
+            self._on_event(self._event)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        if self._on_event is not None and exc_type is None:
+            self._on_event(
+                self._event._replace(
+                    kind="member_finish",
+                    size=self.size,
+                    duration=time.perf_counter() - self._start
+                )
+            )
+
+
+def _extract_zip(
+    filename: Path,
+    extract_dir: Path,
+    budget: _ExtractionBudget,
+    chunk_size: int,
+    depth: int = 0,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+    select: Optional[Callable[[str], bool]] = None,
+    manifest: Optional[_Manifest] = None,
+    verify: bool = False
+) -> tuple[int, int]:
+    """
+    Streaming extraction of a zip-archive; only members that pass
+    select are extracted. Digests of extracted files are added to
+    manifest. The CRC-32 of every extracted member is checked by the
+    zipfile-library; if verify is set, the remaining members are
+    checked as well. Returns the number of members and bytes written.
+    """
+
+    max_size = None
+    if budget.limits.max_ratio is not None:
+        max_size = int(budget.limits.max_ratio * filename.stat().st_size)
+    with zipfile.ZipFile(filename) as archive:
+        members = [
+            member for member in archive.infolist()
+            if select is None or select(member.filename)
+        ]
+        # fail early based on the (untrusted) central directory
+        budget.check(
+            members=len(members),
+            total_size=sum(m.file_size for m in members)
+        )
+        if max_size is not None \
+                and sum(m.file_size for m in members) > max_size:
+            raise UnsafeArchiveError(
+                "Archive exceeds the maximum compression ratio "
+                + f"({budget.limits.max_ratio})."
+            )
+        written = 0
+        for member in members:
+            target = _safe_target(extract_dir, member.filename)
+            budget.charge(members=1)
+            with _MemberEvents(
+                on_event, "unpack", filename, depth, member.filename
+            ) as events:
+                _check_write_target(extract_dir, target, member.filename)
+                if member.is_dir():
+                    target.mkdir(parents=True, exist_ok=True)
+                    continue
+                hashers = manifest.hashers() if manifest is not None else []
+                with archive.open(member) as source:
+                    events.size = _copy_member(
+                        source, target, budget,
+                        None if max_size is None else max_size - written,
+                        chunk_size, hashers
+                    )
+                if manifest is not None:
+                    manifest.add(member.filename, hashers)
+                written += events.size
+        if verify and len(members) < len(archive.infolist()):
+            selected = set(members)
+            for member in archive.infolist():
+                if member in selected or member.is_dir():
+                    continue
+                _check_cancelled(budget.cancel)
+                with archive.open(member) as source:
+                    while source.read(chunk_size):
+                        pass
+    return len(members), written
+
+
+def _extract_tar(
+    filename: Path,
+    extract_dir: Path,
+    opener: Callable[..., IO[bytes]],
+    budget: _ExtractionBudget,
+    chunk_size: int,
+    depth: int = 0,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+    select: Optional[Callable[[str], bool]] = None,
+    manifest: Optional[_Manifest] = None,
+    verify: bool = False
+) -> tuple[int, int]:
+    """
+    Streaming extraction of a (compressed) tar-archive; only members
+    that pass select are extracted. Digests of extracted files are
+    added to manifest. If verify is set, the stream is read to its end
+    such that the checksums of the compression-format are checked.
+    Returns the number of members and bytes written.
+    """
+
+    max_size = None
+    if budget.limits.max_ratio is not None:
+        max_size = int(budget.limits.max_ratio * filename.stat().st_size)
+    members, written = 0, 0
+    with opener(filename, "rb") as stream, \
+            tarfile.open(fileobj=stream, mode="r|") as archive:
+        for member in archive:
+            if select is not None and not select(
+                member.name + "/" if member.isdir() else member.name
+            ):
+                continue
+            target = _safe_target(extract_dir, member.name)
+            budget.charge(members=1)
+            members += 1
+            hashers = manifest.hashers() if manifest is not None else []
+            with _MemberEvents(
+                on_event, "unpack", filename, depth, member.name
+            ) as events:
+                events.size = _extract_tar_member(
+                    archive, member, target, extract_dir, budget,
+                    None if max_size is None else max_size - written,
+                    chunk_size, hashers
+                )
+            if manifest is not None and member.isreg():
+                manifest.add(member.name, hashers)
+            written += events.size
+        if verify:
+            while stream.read(chunk_size):
+                _check_cancelled(budget.cancel)
+    return members, written
+
+
+def _extract_tar_member(
+    archive: tarfile.TarFile,
+    member: tarfile.TarInfo,
+    target: Path,
+    extract_dir: Path,
+    budget: _ExtractionBudget,
+    max_size: Optional[int],
+    chunk_size: int,
+    hashers: Iterable = ()
+) -> int:
+    """
+    Extract a single member of a tar-archive to target while updating
+    the hash objects hashers. Returns the number of bytes written.
+    """
+
+    _check_write_target(extract_dir, target, member.name)
+    if member.isdir():
+        target.mkdir(parents=True, exist_ok=True)
+        return 0
+    if member.issym() or member.islnk():
+        # only links that resolve within extract_dir are allowed
+        if member.issym():
+            link = (target.parent / member.linkname)
+        else:
+            link = extract_dir / member.linkname
+        if os.path.isabs(member.linkname) or not os.path.realpath(
+            link
+        ).startswith(os.path.realpath(extract_dir) + os.sep):
+            raise UnsafeArchiveError(
+                f"Archive member '{member.name}' links outside of "
+                + "the target directory."
+            )
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # existing files are replaced (existing links are rejected above)
+        target.unlink(missing_ok=True)
+        if member.issym():
+            target.symlink_to(member.linkname)
+        else:
+            os.link(link, target)
+        return 0
+    if not member.isreg():
+        # skip devices, fifos, etc.
+        return 0
+    source = archive.extractfile(member)
+    written = _copy_member(
+        source, target, budget, max_size, chunk_size, hashers
+    )
+    os.chmod(target, member.mode & 0o777)
+    os.utime(target, (member.mtime, member.mtime))
+    return written
+
+
+def _extract(
+    filename: Path,
+    extract_dir: Path,
+    archive_format: str,
+    budget: _ExtractionBudget,
+    chunk_size: int,
+    depth: int = 0,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+    select: Optional[Callable[[str], bool]] = None,
+    manifest: Optional[_Manifest] = None,
+    verify: bool = False
+) -> tuple[int, int]:
+    """
+    Extract archive using the streaming extractors or shutil (for
+    formats that are not natively supported). Returns the number of
+    members and bytes written (both 0 if delegated to shutil). Errors
+    caused by corrupt data are raised as ArchiveIntegrityError if
+    verify is set and as `shutil.ReadError` (like shutil does)
+    otherwise.
+    """
+
+    if archive_format == "zip":
+        extract_dir.mkdir(parents=True, exist_ok=True)
+        extractor = functools.partial(_extract_zip, filename, extract_dir)
+    elif archive_format in _TAR_OPENERS:
+        extract_dir.mkdir(parents=True, exist_ok=True)
+        extractor = functools.partial(
+            _extract_tar, filename, extract_dir, _TAR_OPENERS[archive_format]
+        )
+    else:
+        extractor = None
+    if extractor is not None:
+        try:
+            return extractor(
+                budget, chunk_size, depth, on_event, select, manifest,
+                verify
+            )
+        except _INTEGRITY_ERRORS as exc_info:
+            if not verify:
+                raise shutil.ReadError(
+                    f"Archive '{filename}' cannot be read: {exc_info}"
+                ) from exc_info
+            raise ArchiveIntegrityError(
+                f"Archive '{filename}' is corrupt: {exc_info}"
+            ) from exc_info
+    if select is not None or manifest is not None or verify:
+        raise ValueError(
+            "Selective extraction, digests, and verification are not "
+            + f"supported for '{archive_format}'."
+        )
+    extract_dir.mkdir(parents=True, exist_ok=True)
+    shutil.unpack_archive(
+        filename=filename, extract_dir=extract_dir, format=archive_format
+    )
+    return 0, 0
+
+
+def _sniff_archive_format(file_path: Path) -> Optional[str]:
+    """
+    Returns archive format identified by the magic bytes at the start
+    of the file or None if inconclusive.
+    """
+
+    try:
+        with open(file_path, "rb") as file:
+            head = file.read(_SNIFF_SIZE)
+    except OSError:
+        return None
+
+    if head.startswith(_ZIP_MAGIC):
+        return "zip"
+    for magic, (archive_format, decompressor) in _COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            try:
+                head = decompressor().decompress(head)
+            except (OSError, EOFError, ValueError, zlib.error, lzma.LZMAError):
+                return None
+            break
+    else:
+        archive_format = "tar"
+    if head[
+        _TAR_MAGIC_OFFSET:_TAR_MAGIC_OFFSET + len(_TAR_MAGIC)
+    ] == _TAR_MAGIC:
+        return archive_format
+    return None
+
+def _match_suffix(file_path: Path) -> Optional[str]:
+    """
+    Returns the (multi-)suffix of file_path that identifies an archive
+    format or None.
+    """
+
+    name = file_path.name.lower()
+    for suffix in sorted(_SUFFIX_FORMATS, key=len, reverse=True):
+        if name.endswith(suffix) and len(name) > len(suffix):
+            return suffix
+    return None
+
+def get_archive_format(file_path: str | Path) -> Optional[str]:
+    """
+    Returns the format (one of _ARCHIVE_FORMATS) of the archive at
+    file_path or None if the file is not an archive.
+
+    Only files with archive-suffixes (e.g., ".zip", ".tar.gz", ".tgz",
+    or any of _ARCHIVE_FORMATS like ".gztar") are considered archives;
+    files like ".docx" or ".jar" are not, although they are zip-archives
+    internally. The format is then confirmed by reading the magic bytes
+    at the start of the file (for compressed tar-archives, the beginning
+    of the stream is decompressed), e.g., a gzip-compressed ".tar" is
+    identified as "gztar". If this is inconclusive, the format is
+    derived from the suffix.
+
+    Keyword argument:
+    file_path -- path to the file
+    """
+
+    _file_path = make_path(file_path)
+    if not _file_path.is_file():
+        return None
+    return _detect_archive_format(_file_path)
+
+def _detect_archive_format(file_path: Path) -> Optional[str]:
+    """
+    Returns the format of the archive at file_path (which is expected to
+    be a file) or None.
+    """
+
+    suffix = _match_suffix(file_path)
+    if suffix is not None:
+        archive_format = _SUFFIX_FORMATS[suffix]
+    elif file_path.suffix.lstrip(".") in _ARCHIVE_FORMATS:
+        archive_format = file_path.suffix.lstrip(".")
+    else:
+        # content is not considered for other files since many file
+        # formats are zip-archives internally (e.g., docx, jar, or epub)
+        return None
+    return _sniff_archive_format(file_path) or archive_format
+
+def _archive_stem(file_path: Path) -> str:
+    """
+    Returns the name of file_path without its archive-suffixes, e.g.,
+    "example" for "example.tar.gz".
+    """
+
+    suffix = _match_suffix(file_path)
+    if suffix is not None:
+        return file_path.name[:-len(suffix)]
+    return file_path.stem
+
 def is_archive(file_path: str | Path) -> bool:
     """
     Returns true if the file at file_path is an archive.
 
+    See get_archive_format for details on the detection.
+
     Keyword argument:
     file_path -- path to the file
     """
 
-    _file_path = make_path(file_path)
-    return _file_path.is_file()\
-        and _file_path.suffix.lstrip(".") in _ARCHIVE_FORMATS
+    return get_archive_format(file_path) is not None
+
+def _pattern_closure(parts: list[str], states: set[int]) -> set[int]:
+    """
+    Returns states extended by all states that are reachable by "**"
+    matching zero directories.
+    """
+
+    closure = set(states)
+    for state in sorted(states):
+        while state < len(parts) and parts[state] == "**":
+            state += 1
+            closure.add(state)
+    return closure
+
+def _pattern_step(
+    parts: list[str], states: set[int], name: str, is_dir: bool
+) -> set[int]:
+    """
+    Returns the states after matching a directory entry name against the
+    pattern parts.
+    """
+
+    next_states = set()
+    for state in states:
+        if state >= len(parts):
+            continue
+        if parts[state] == "**":
+            if is_dir:
+                next_states.add(state)
+        elif fnmatch.fnmatch(name, parts[state]):
+            next_states.add(state + 1)
+    return next_states
+
+def iter_archives(
+    path: str | Path,
+    pattern: str = "**/*",
+    condition_function=lambda p: True
+) -> Iterator[Path]:
+    """
+    Lazily yields archives in path that satisfy the given Path.glob-
+    pattern as well as the condition_function.
+
+    The directory tree is walked with os.scandir; the type information
+    of the directory entries is reused and subdirectories that can not
+    match the pattern are not entered. Symbolic links to directories
+    are not followed.
+
+    Keyword argument:
+    path -- path to the directory
+
+    Optional arguments:
+    pattern -- glob pattern
+               (default "**/*" -> recursive search for all sub-
+               directories in path)
+    condition_function -- additional condition function that every entry
+                          is required to pass
+                          (default lambda p : True)
+    """
+
+    return _iter_archives(path, pattern, condition_function)
+
+def _iter_archives(
+    path: str | Path,
+    pattern: str,
+    condition_function,
+    cancel: Optional[threading.Event] = None
+) -> Iterator[Path]:
+    """
+    Implementation of iter_archives; cancel is checked once per
+    directory.
+    """
+
+    parts = [part for part in pattern.split("/") if part not in ("", ".")]
+    stack = [(str(make_path(path)), _pattern_closure(parts, {0}))]
+    while stack:
+        directory, states = stack.pop()
+        _check_cancelled(cancel)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        is_file = not is_dir and entry.is_file()
+                    except OSError:
+                        continue
+                    next_states = _pattern_step(
+                        parts, states, entry.name, is_dir
+                    )
+                    if not next_states:
+                        continue
+                    if is_file and len(parts) in next_states:
+                        entry_path = Path(entry.path)
+                        if _detect_archive_format(entry_path) is not None \
+                                and condition_function(entry_path):
+                            yield entry_path
+                    if is_dir:
+                        next_states = _pattern_closure(parts, next_states)
+                        if any(state < len(parts) for state in next_states):
+                            stack.append((entry.path, next_states))
+        except OSError:
+            continue
 
 def list_archives(
     path: str | Path,
@@ -35,6 +1015,8 @@ def list_archives(
     Returns a list of archives in path that satisfy the given Path.glob-
     pattern as well as the condition_function.
 
+    See iter_archives for details.
+
     Keyword argument:
     path -- path to the directory
 
@@ -47,119 +1029,648 @@ def list_archives(
                           (default lambda p : True)
     """
 
-    return list_directory_content(
-        path=path,
-        pattern=pattern,
-        condition_function=lambda p: is_archive(p) and condition_function(p)
-    )
+    return list(iter_archives(path, pattern, condition_function))
+
+def _member_name(name: str) -> str:
+    """
+    Returns normalized archive name of a member, i.e., without leading
+    "./" and trailing "/".
+    """
+
+    while name.startswith("./"):
+        name = name[2:]
+    return name.rstrip("/") or name
+
+def _member_selector(
+    member_filter: Optional[str | Callable[[str], bool]]
+) -> Optional[Callable[[str], bool]]:
+    """
+    Returns predicate for archive names of members based on the given
+    glob-pattern or predicate (or None if member_filter is None).
+    """
+
+    if member_filter is None:
+        return None
+    if callable(member_filter):
+        return lambda name: member_filter(_member_name(name))
+
+    parts = [
+        part for part in member_filter.split("/") if part not in ("", ".")
+    ]
+
+    def select(name: str) -> bool:
+        states = _pattern_closure(parts, {0})
+        *dirs, last = _member_name(name).split("/")
+        for part in dirs:
+            states = _pattern_closure(
+                parts, _pattern_step(parts, states, part, True)
+            )
+        return len(parts) in _pattern_step(
+            parts, states, last, name.endswith("/")
+        )
+    return select
+
+def _member_archive_format(filename: str | Path) -> tuple[Path, str]:
+    """
+    Returns path and format of the archive filename; raises a
+    ValueError if the format does not support access to members.
+    """
+
+    _filename = make_path(filename)
+    archive_format = get_archive_format(_filename)
+    if archive_format != "zip" and archive_format not in _TAR_OPENERS:
+        raise ValueError("Unknown archive format. Available formats: "\
+            + ", ".join(["zip"] + list(_TAR_OPENERS)))
+    return _filename, archive_format
+
+def list_members(filename: str | Path) -> list[ArchiveMember]:
+    """
+    Returns a list of the members of an archive without extracting
+    them.
+
+    For zip-archives, only the central directory is read. For tar-based
+    archives, the member headers are read sequentially (the data of
+    uncompressed archives is skipped, compressed archives are
+    decompressed once without writing any data).
+
+    Keyword argument:
+    filename -- file path to the target archive
+    """
+
+    _filename, archive_format = _member_archive_format(filename)
+    if archive_format == "zip":
+        with zipfile.ZipFile(_filename) as archive:
+            return [
+                ArchiveMember(
+                    _member_name(member.filename), member.file_size,
+                    member.is_dir()
+                )
+                for member in archive.infolist()
+            ]
+    with _TAR_OPENERS[archive_format](_filename, "rb") as stream, \
+            tarfile.open(fileobj=stream, mode="r:") as archive:
+        return [
+            ArchiveMember(
+                _member_name(member.name), member.size, member.isdir()
+            )
+            for member in archive
+        ]
+
+@contextlib.contextmanager
+def open_member(filename: str | Path, member: str) -> Iterator[IO[bytes]]:
+    """
+    Context manager that provides a read-only binary file-like object
+    for a single member of an archive without extracting the archive.
+
+    For zip-archives, the member is accessed directly (only the data of
+    this member is read and decompressed). For tar-based archives, the
+    archive is read sequentially up to the member (for uncompressed
+    archives, the data of preceding members is skipped).
+
+    A KeyError is raised if the member does not exist and a ValueError
+    if it is not a regular file.
+
+    Keyword arguments:
+    filename -- file path to the target archive
+    member -- archive name of the member (as listed by list_members)
+    """
+
+    _filename, archive_format = _member_archive_format(filename)
+    if archive_format == "zip":
+        with zipfile.ZipFile(_filename) as archive:
+            info = next(
+                (
+                    info for info in archive.infolist()
+                    if _member_name(info.filename) == member
+                ),
+                None
+            )
+            if info is None:
+                raise KeyError(
+                    f"There is no item named '{member}' in the archive."
+                )
+            if info.is_dir():
+                raise ValueError(
+                    f"Archive member '{member}' is not a regular file."
+                )
+            with archive.open(info) as file:
+                yield file
+        return
+    with _TAR_OPENERS[archive_format](_filename, "rb") as stream, \
+            tarfile.open(fileobj=stream, mode="r:") as archive:
+        for info in archive:
+            if _member_name(info.name) != member:
+                continue
+            file = archive.extractfile(info) if info.isreg() else None
+            if file is None:
+                raise ValueError(
+                    f"Archive member '{member}' is not a regular file."
+                )
+            with file:
+                yield file
+            return
+    raise KeyError(f"There is no item named '{member}' in the archive.")
 
 def unpack_archive(
     filename: str | Path,
     extract_dir: Optional[str | Path] = None,
-    keep_archive: bool = True
-) -> None:
+    keep_archive: bool = True,
+    limits: Optional[ExtractionLimits] = None,
+    chunk_size: int = _CHUNK_SIZE,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+    member_filter: Optional[str | Callable[[str], bool]] = None,
+    digests: Optional[Iterable[str]] = None,
+    verify: bool = False
+) -> Optional[dict[str, dict[str, str]]]:
     """
     Method for unpacking an archive.
 
+    Archives of the formats zip, tar, gztar, bztar, and xztar are
+    extracted in a streaming fashion (member by member in chunks of
+    chunk_size bytes). An UnsafeArchiveError is raised if the archive
+    exceeds the given limits or contains members that would be written
+    outside of extract_dir. Note that members which have been extracted
+    before an error occurs are not removed.
+
+    If member_filter is given, only the matching members are extracted
+    (parent directories are created as needed) and the limits apply to
+    these members only.
+
+    If digests are requested, they are computed while the data is
+    written and a manifest is returned which maps the archive names of
+    all extracted files (as listed by list_members) to pairs of
+    algorithm and hex-digest, e.g.,
+    {"data/file.txt": {"sha256": "..."}}.
+
     Keyword argument:
     filename -- file path to the target archive
 
     Optional arguments:
     extract_dir -- path of the target directory
-                   (default None -> (filename.parent / filename.stem) is
-                   used)
+                   (default None -> filename.parent / filename without
+                   archive-suffixes (e.g., ".zip" or ".tar.gz") is used)
     keep_archive -- whether to keep the archive;
-                    no integrity check will be performed beforehand,
-                    if False and shutil.unpack_archive does not raise an
-                    error, the file will be deleted
+                    an integrity check is only performed beforehand if
+                    verify is set, if False and the extraction does not
+                    raise an error, the file will be deleted
                     (default True)
+    limits -- ExtractionLimits for this archive
+              (default None -> no limits)
+    chunk_size -- size of chunks in bytes when copying data
+                  (default 1 MiB)
+    on_event -- callback that is called with an ArchiveEvent at the
+                start and finish of the archive and of every member,
+                e.g., an ArchiveStatistics-object
+                (default None)
+    member_filter -- Path.glob-pattern (matched against the archive
+                     name of a member as listed by list_members, e.g.,
+                     "*/bag-info.txt" or "**/manifest-*.txt") or
+                     predicate for these archive names
+                     (default None -> all members are extracted)
+    digests -- names of hashlib-algorithms (e.g., "sha256", "sha512",
+               or "md5") that are computed for every extracted file
+               (default None -> no manifest is returned)
+    verify -- whether to verify the checksums of the entire archive
+              (CRC-32 of all zip-members or the checksums of the
+              compressed stream of tar-based formats) during
+              extraction; an ArchiveIntegrityError is raised (and the
+              archive is kept) if the verification fails
+              (default False)
+    """
+
+    return _unpack_archive(
+        filename=filename,
+        extract_dir=extract_dir,
+        keep_archive=keep_archive,
+        budget=_ExtractionBudget(limits or ExtractionLimits()),
+        chunk_size=chunk_size,
+        on_event=on_event,
+        select=_member_selector(member_filter),
+        manifest=None if digests is None else _Manifest(digests),
+        verify=verify
+    )
+
+def _unpack_archive(
+    filename: str | Path,
+    extract_dir: Optional[str | Path],
+    keep_archive: bool,
+    budget: _ExtractionBudget,
+    chunk_size: int,
+    depth: int = 0,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+    select: Optional[Callable[[str], bool]] = None,
+    manifest: Optional[_Manifest] = None,
+    verify: bool = False
+) -> Optional[dict[str, dict[str, str]]]:
+    """
+    Unpack archive while charging the given budget; events are reported
+    to on_event with the given depth. Only members that pass select are
+    extracted. Returns the entries of manifest (if given).
     """
 
     # convert to pathlib Paths
     _filename = make_path(filename)
     if extract_dir is None:
-        _extract_dir = _filename.parent / _filename.stem
+        _extract_dir = _filename.parent / _archive_stem(_filename)
     else:
         _extract_dir = make_path(extract_dir)
 
-    if not is_archive(_filename):
+    archive_format = get_archive_format(_filename)
+    if archive_format is None:
         raise ValueError("Unknown archive format. Available formats: "\
             + ", ".join(_ARCHIVE_FORMATS))
 
     # Unpack the file
-    shutil.unpack_archive(
-        filename=_filename,
-        extract_dir=_extract_dir
+    if on_event is not None:
+        on_event(ArchiveEvent("archive_start", "unpack", _filename, depth))
+    start = time.perf_counter()
+    members, written = _extract(
+        _filename,
+        _extract_dir,
+        archive_format,
+        budget,
+        chunk_size,
+        depth,
+        on_event,
+        select,
+        manifest,
+        verify
     )
+    if on_event is not None:
+        on_event(
+            ArchiveEvent(
+                "archive_finish", "unpack", _filename, depth,
+                size=written,
+                members=members,
+                duration=time.perf_counter() - start
+            )
+        )
 
     # Delete the packed file if requested
     if not keep_archive:
         _filename.unlink()
 
+    if manifest is None:
+        return None
+    return manifest.entries
+
 def unpack_archive_recursively(
     filename: str | Path,
     extract_dir: Optional[str | Path] = None,
     keep_archive: bool = True,
     depth: Optional[int] = None,
-    verbose: bool = False
+    verbose: bool = False,
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+    limits: Optional[ExtractionLimits] = None,
+    chunk_size: int = _CHUNK_SIZE,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None
 ) -> None:
     """
     Recursively unpack an archive up to a given maximum depth.
 
+    Nested archives are unpacked level by level. Within a level, the
+    archives can be unpacked concurrently by a pool of workers. If
+    workers is set and any archive of a level fails to unpack, the
+    remaining archives of that level are still processed before an
+    ArchiveUnpackError listing all errors (sorted by archive path) is
+    raised. If workers is not set, the original exception of the first
+    failing archive is raised (e.g., `shutil.ReadError`).
+
+    When using a pool of workers, every archive is extracted into a
+    temporary directory first; these are merged into the parent
+    directories in the order of the archives' paths such that members
+    with the same name are replaced as in sequential processing.
+
+    The limits on the number of members and the total size apply to the
+    entire nested tree, the limit on the compression ratio applies to
+    every archive individually. If a limit is exceeded, the
+    UnsafeArchiveError is raised immediately. When using a pool of
+    processes, the limits are enforced per archive against the budget
+    remaining at the start of the level and for the entire level after
+    all of its archives have been unpacked.
+
+    Events are reported to on_event with the nesting level of the
+    respective archive as depth (0 for filename). Note that on_event
+    may be called concurrently when using a pool of threads. When using
+    a pool of processes, the events of an archive are recorded in the
+    worker and reported after it has been unpacked successfully.
+
     Optional argument:
     filename -- path to a (nested) archive
     extract_dir -- path of the target directory
-                   (default None -> (filename.parent / filename.stem) is
-                   used)
+                   (default None -> filename.parent / filename without
+                   archive-suffixes (e.g., ".zip" or ".tar.gz") is used)
     keep_archive -- whether to keep the (top level) archive;
                     no integrity check will be performed beforehand,
-                    if False and shutil.unpack_archive does not raise an
+                    if False and the extraction does not raise an
                     error, the file will be deleted
                     (default True)
     depth -- maximum recursive depth
              (default None -> indefinite recursion)
     verbose -- print list of unpacked archives
                (default False)
+    workers -- maximum number of archives of the same level that are
+               unpacked concurrently
+               (default None -> sequential processing)
+    use_processes -- whether to use a pool of processes instead of a
+                     pool of threads; only relevant if workers is set
+                     (default False)
+    limits -- ExtractionLimits for the entire nested archive
+              (default None -> no limits)
+    chunk_size -- size of chunks in bytes when copying data
+                  (default 1 MiB)
+    on_event -- callback that is called with an ArchiveEvent at the
+                start and finish of every archive and member, e.g., an
+                ArchiveStatistics-object
+                (default None)
     """
 
     # convert to pathlib Paths
     _filename = make_path(filename)
     if extract_dir is None:
-        _extract_dir = _filename.parent / _filename.stem
+        _extract_dir = _filename.parent / _archive_stem(_filename)
     else:
         _extract_dir = make_path(extract_dir)
 
+    _unpack_archive_recursively(
+        filename=_filename,
+        extract_dir=_extract_dir,
+        keep_archive=keep_archive,
+        depth=depth,
+        verbose=verbose,
+        workers=workers,
+        use_processes=use_processes,
+        budget=_ExtractionBudget(limits or ExtractionLimits()),
+        chunk_size=chunk_size,
+        on_event=on_event
+    )
+
+
+def _unpack_archive_recursively(
+    filename: Path,
+    extract_dir: Path,
+    keep_archive: bool,
+    depth: Optional[int],
+    verbose: bool,
+    workers: Optional[int],
+    use_processes: bool,
+    budget: _ExtractionBudget,
+    chunk_size: int,
+    progress: Optional[Callable[[Path], None]] = None,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None
+) -> None:
+    """
+    Implementation of unpack_archive_recursively; progress is called
+    with the path of every archive after it has been unpacked.
+    """
+
     # unpack current target
     if verbose:
         print("Unpacking archive:", filename)
-    unpack_archive(
-        filename=_filename,
-        extract_dir=_extract_dir,
-        keep_archive=keep_archive
+    _unpack_archive(
+        filename=filename,
+        extract_dir=extract_dir,
+        keep_archive=keep_archive,
+        budget=budget,
+        chunk_size=chunk_size,
+        on_event=on_event
     )
+    if progress is not None:
+        progress(filename)
 
-    # stop process if maximum depth is reached
-    if depth is not None and depth <= 1:
-        return
+    # continue with next layers
+    level = 1
+    while depth is None or level < depth:
+        list_of_archives = sorted(
+            _iter_archives(
+                extract_dir,
+                "**/*",
+                condition_function=lambda p: p != filename,
+                cancel=budget.cancel
+            )
+        )
+        if not list_of_archives:
+            break
+        if verbose:
+            for archive_path in list_of_archives:
+                print("Unpacking archive:", archive_path)
+        errors = _unpack_archives(
+            list_of_archives, workers, use_processes, budget, chunk_size,
+            progress, level, on_event
+        )
+        if errors:
+            raise ArchiveUnpackError(errors)
+        level += 1
+
+
+def _unpack_nested(
+    archive_path: Path,
+    budget: _ExtractionBudget,
+    chunk_size: int,
+    depth: int = 0,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+    extract_dir: Optional[Path] = None
+) -> tuple[int, int]:
+    """
+    Unpack nested archive into extract_dir (default: its parent
+    directory) and delete it afterwards. Returns the state (members,
+    total_size) of the budget after unpacking.
+    """
+
+    _unpack_archive(
+        filename=archive_path,
+        extract_dir=archive_path.parent if extract_dir is None
+        else extract_dir,
+        keep_archive=False,
+        budget=budget,
+        chunk_size=chunk_size,
+        depth=depth,
+        on_event=on_event
+    )
+    return budget.members, budget.total_size
+
+
+def _unpack_nested_recorded(
+    archive_path: Path,
+    budget: _ExtractionBudget,
+    chunk_size: int,
+    depth: int,
+    extract_dir: Optional[Path] = None
+) -> tuple[int, int, list[ArchiveEvent]]:
+    """
+    Same as _unpack_nested but additionally returns the list of events
+    (used in pools of processes).
+    """
 
-    # continue with next layer
-    list_of_archives = list_archives(
-        _extract_dir
+    events = []
+    members, total_size = _unpack_nested(
+        archive_path, budget, chunk_size, depth, events.append, extract_dir
     )
+    return members, total_size, events
 
-    for archive_path in list_of_archives:
-        unpack_archive_recursively(
-            filename=archive_path,
-            extract_dir=archive_path.parent,
-            keep_archive=False,
-            depth=depth - 1 if depth is not None else depth,
-            verbose=verbose
+
+def _merge_directory(source: Path, target: Path, root: Path) -> None:
+    """
+    Move the contents of the directory source into the directory target
+    (within root) and remove source. Existing files are replaced and
+    existing directories are merged, i.e., the result is identical to
+    having extracted into target directly.
+    """
+
+    for item in sorted(source.iterdir()):
+        destination = target / item.name
+        _check_write_target(
+            root, destination, destination.relative_to(root).as_posix()
+        )
+        if item.is_dir() and not item.is_symlink() \
+                and destination.is_dir():
+            _merge_directory(item, destination, root)
+        else:
+            os.replace(item, destination)
+    source.rmdir()
+
+
+def _unpack_archives(
+    archives: list[Path],
+    workers: Optional[int],
+    use_processes: bool,
+    budget: _ExtractionBudget,
+    chunk_size: int,
+    progress: Optional[Callable[[Path], None]] = None,
+    depth: int = 1,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None
+) -> list[tuple[Path, Exception]]:
+    """
+    Unpack archives into their parent directories and delete them
+    afterwards. Events are reported to on_event with the given depth.
+
+    If workers is set, returns a list of pairs of archive path and
+    exception (in the order of archives) for all archives that failed
+    to unpack; an UnsafeArchiveError or ArchiveOperationCancelled is
+    raised immediately. Otherwise, the first error is raised as is (and
+    the returned list is always empty).
+
+    Archives that are unpacked by a pool of workers are extracted into
+    separate temporary directories which are merged into the parent
+    directories in the order of archives; members with the same name
+    are thus replaced in the same order as in sequential processing.
+    """
+
+    errors = []
+    if workers is None:
+        # without a pool, errors are raised as they occur
+        for archive_path in archives:
+            _unpack_nested(archive_path, budget, chunk_size, depth, on_event)
+            if progress is not None:
+                progress(archive_path)
+        return errors
+
+    # with a process pool, every worker operates on a copy of the
+    # budget; consumption is charged to the budget afterwards
+    initial_state = budget.members, budget.total_size
+    pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    tmp_dirs = [
+        Path(
+            tempfile.mkdtemp(
+                prefix=f".{archive_path.name}.", dir=archive_path.parent
+            )
         )
+        for archive_path in archives
+    ]
+    try:
+        with pool(
+            max_workers=max(1, min(workers, len(archives)))
+        ) as executor:
+            errors = _collect_unpacked(
+                archives, tmp_dirs, executor, use_processes, budget,
+                chunk_size, progress, depth, on_event, initial_state
+            )
+    finally:
+        for tmp_dir in tmp_dirs:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return errors
+
+
+def _collect_unpacked(
+    archives: list[Path],
+    tmp_dirs: list[Path],
+    executor: Executor,
+    use_processes: bool,
+    budget: _ExtractionBudget,
+    chunk_size: int,
+    progress: Optional[Callable[[Path], None]],
+    depth: int,
+    on_event: Optional[Callable[[ArchiveEvent], None]],
+    initial_state: tuple[int, int]
+) -> list[tuple[Path, Exception]]:
+    """
+    Submit archives (to be extracted into tmp_dirs) to executor and
+    merge the results in order (see _unpack_archives).
+    """
+
+    errors = []
+    if use_processes and on_event is not None:
+        futures = [
+            executor.submit(
+                _unpack_nested_recorded, archive_path, budget,
+                chunk_size, depth, tmp_dir
+            )
+            for archive_path, tmp_dir in zip(archives, tmp_dirs)
+        ]
+    else:
+        futures = [
+            executor.submit(
+                _unpack_nested, archive_path, budget, chunk_size, depth,
+                None if use_processes else on_event, tmp_dir
+            )
+            for archive_path, tmp_dir in zip(archives, tmp_dirs)
+        ]
+    for archive_path, tmp_dir, future in zip(archives, tmp_dirs, futures):
+        exc_info = future.exception()
+        if exc_info is None and budget.cancel is not None \
+                and budget.cancel.is_set():
+            exc_info = ArchiveOperationCancelled(
+                "Archive operation cancelled."
+            )
+        if exc_info is None:
+            if use_processes:
+                result = future.result()
+                budget.charge(
+                    result[0] - initial_state[0],
+                    result[1] - initial_state[1]
+                )
+                if on_event is not None:
+                    for event in result[2]:
+                        on_event(event)
+            try:
+                _merge_directory(
+                    tmp_dir, archive_path.parent, archive_path.parent
+                )
+            except (UnsafeArchiveError, OSError) as merge_exc_info:
+                exc_info = merge_exc_info
+        if isinstance(
+            exc_info, (UnsafeArchiveError, ArchiveOperationCancelled)
+        ):
+            for f in futures:
+                f.cancel()
+            raise exc_info
+        if exc_info is not None:
+            errors.append((archive_path, exc_info))
+            continue
+        if progress is not None:
+            progress(archive_path)
+    return errors
+
 
 def make_archive(
     path: str | Path,
     archive_format: str = ".zip",
-    dir_name: Optional[Path] = None
+    dir_name: Optional[Path] = None,
+    workers: Optional[int] = None,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+    digests: Optional[Iterable[str]] = None,
+    manifest: Optional[dict[str, dict[str, str]]] = None
 ) -> Path:
     """
     Make an archive from a directory, e.g. serialize a bagit.Bag.
@@ -178,6 +1689,45 @@ def make_archive(
                 example: if path=Path("example/") then the archive-file
                 becomes dir_name / ("example" + archive_format)
                 (default None -> path.parent is used)
+    workers -- number of threads used for compression of tar-based
+               formats; if set, the archive is generated with
+               write_archive (see there for details)
+               (default None -> archive is generated by shutil)
+    on_event -- callback that is called with an ArchiveEvent at the
+                start and finish of the archive and of every member,
+                e.g., an ArchiveStatistics-object; if set, the archive
+                is generated with write_archive
+                (default None)
+    digests -- names of hashlib-algorithms (e.g., "sha256", "sha512",
+               or "md5") that are computed for every packed file while
+               it is read; if set, the archive is generated with
+               write_archive
+               (default None)
+    manifest -- dictionary to which the digests are added (see
+                write_archive for details)
+                (default None)
+    """
+
+    return _make_archive(
+        path, archive_format, dir_name, workers, on_event=on_event,
+        digests=digests, manifest=manifest
+    )
+
+def _make_archive(
+    path: str | Path,
+    archive_format: str,
+    dir_name: Optional[Path],
+    workers: Optional[int],
+    cancel: Optional[threading.Event] = None,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+    digests: Optional[Iterable[str]] = None,
+    manifest: Optional[dict[str, dict[str, str]]] = None
+) -> Path:
+    """
+    Implementation of make_archive; if cancel, on_event, or digests is
+    given, the archive is generated with write_archive and cancel is
+    checked once per item. A partially written archive is removed on
+    error.
     """
 
     _path = make_path(path)
@@ -193,6 +1743,35 @@ def make_archive(
         dir_name = _path.parent
     _dir_name = make_path(dir_name)
 
+    if digests is not None and _archive_format not in _FORMAT_EXTENSIONS:
+        raise ValueError(
+            f"Digests are not supported for '{_archive_format}'."
+        )
+    if (
+        workers is not None or cancel is not None or on_event is not None
+        or digests is not None
+    ) and _archive_format in _FORMAT_EXTENSIONS:
+        archive_path = Path(
+            os.path.abspath(
+                str(_dir_name / _path.stem)
+                + _FORMAT_EXTENSIONS[_archive_format]
+            )
+        )
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(archive_path, "wb") as archive_file:
+                entries = _write_archive(
+                    _path, archive_file, _archive_format, None, _CHUNK_SIZE,
+                    workers, cancel, on_event, archive_path,
+                    None if digests is None else _Manifest(digests)
+                )
+        except BaseException:
+            archive_path.unlink(missing_ok=True)
+            raise
+        if entries is not None and manifest is not None:
+            manifest.update(entries)
+        return archive_path.relative_to(Path.cwd())
+
     # Create the archive and return its Path
     # base_name: path to the generated compressed file, excluding the extension
     # root_dir: directory to be archived
@@ -202,3 +1781,638 @@ def make_archive(
         root_dir=_path,
         base_dir=None
     )).relative_to(Path.cwd())
+
+def _iter_directory(
+    path: Path, cancel: Optional[threading.Event] = None
+) -> Iterator[tuple[Path, str]]:
+    """
+    Yields pairs of path and archive name (relative to path, using "/"
+    as separator) for all items in the directory path in a deterministic
+    order (directories before their contents). Symbolic links to
+    directories are not followed. cancel is checked once per item.
+    """
+
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        root_path = Path(root)
+        for name in sorted(dirs) + sorted(files):
+            _check_cancelled(cancel)
+            item = root_path / name
+            yield item, item.relative_to(path).as_posix()
+
+def _tar_compressor(
+    fileobj: IO[bytes],
+    archive_format: str,
+    compresslevel: Optional[int],
+    workers: Optional[int] = None
+) -> IO[bytes]:
+    """
+    Returns file-like object wrapping fileobj which compresses the
+    written data according to the given tar-based archive_format.
+    Closing the returned object does not close fileobj.
+    """
+
+    if archive_format != "tar" and workers is not None and workers > 1:
+        return _ParallelCompressor(
+            fileobj, archive_format, compresslevel, workers, _BLOCK_SIZE
+        )
+    if archive_format == "gztar":
+        return gzip.GzipFile(
+            fileobj=fileobj, mode="wb",
+            compresslevel=9 if compresslevel is None else compresslevel
+        )
+    if archive_format == "bztar":
+        return bz2.BZ2File(
+            fileobj, mode="wb",
+            compresslevel=9 if compresslevel is None else compresslevel
+        )
+    if archive_format == "xztar":
+        return lzma.LZMAFile(fileobj, mode="wb", preset=compresslevel)
+    return fileobj
+
+class _ParallelCompressor():
+    """
+    Write-only file-like object which splits the written data into
+    blocks that are compressed concurrently by a pool of threads. Every
+    block is written to fileobj as an individual gzip-member, bzip2-
+    stream, or xz-stream (depending on archive_format), i.e., the output
+    is a standard-compatible multi-stream file. Closing this object does
+    not close fileobj.
+    """
+    def __init__(
+        self,
+        fileobj: IO[bytes],
+        archive_format: str,
+        compresslevel: Optional[int],
+        workers: int,
+        block_size: int
+    ) -> None:
+        self._fileobj = fileobj
+        if archive_format == "gztar":
+            self._compress = lambda block: gzip.compress(
+                block,
+                compresslevel=9 if compresslevel is None else compresslevel,
+                mtime=0
+            )
+        elif archive_format == "bztar":
+            self._compress = lambda block: bz2.compress(
+                block, 9 if compresslevel is None else compresslevel
+            )
+        else:
+            self._compress = lambda block: lzma.compress(
+                block, preset=compresslevel
+            )
+        self._block_size = block_size
+        self._buffer = bytearray()
+        self._max_pending = 2 * workers
+        self._pending = deque()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self.closed = False
+
+    def _submit(self, block: bytes) -> None:
+        self._pending.append(self._executor.submit(self._compress, block))
+        while len(self._pending) > self._max_pending:
+            self._fileobj.write(self._pending.popleft().result())
+
+    def write(self, data: bytes) -> int:
+        """Write data; returns the number of bytes written."""
+        self._buffer += data
+        while len(self._buffer) >= self._block_size:
+            self._submit(bytes(self._buffer[:self._block_size]))
+            del self._buffer[:self._block_size]
+        return len(data)
+
+    def close(self) -> None:
+        """Compress remaining data and wait for all pending blocks."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._buffer or not self._pending:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._fileobj.write(self._pending.popleft().result())
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+
+
+def _write_zip_file(
+    archive: zipfile.ZipFile,
+    item: Path,
+    name: str,
+    hashers: Iterable,
+    chunk_size: int
+) -> None:
+    """
+    Write the file item to the zip-archive (equivalent to
+    ZipFile.write) while updating the hash objects hashers.
+    """
+
+    zinfo = zipfile.ZipInfo.from_file(item, arcname=name)
+    zinfo.compress_type = archive.compression
+    # pylint: disable-next=protected-access
+    zinfo._compresslevel = archive.compresslevel
+    with open(item, "rb") as source, archive.open(zinfo, "w") as target:
+        shutil.copyfileobj(_HashingReader(source, hashers), target, chunk_size)
+
+
+def write_archive(
+    path: str | Path,
+    fileobj: IO[bytes],
+    archive_format: str = ".zip",
+    compresslevel: Optional[int] = None,
+    chunk_size: int = _CHUNK_SIZE,
+    workers: Optional[int] = None,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+    digests: Optional[Iterable[str]] = None
+) -> Optional[dict[str, dict[str, str]]]:
+    """
+    Write an archive of a directory to a writable binary stream, e.g.,
+    a file object, a pipe, a socket, or an HTTP response body. The
+    stream is not required to be seekable and is not closed.
+
+    Files are read and written in chunks, i.e., neither the archive nor
+    the individual files are held in memory or written to a temporary
+    file. Archive names of the items are relative to path.
+
+    If workers is set, compression of tar-based formats is performed
+    concurrently by a pool of threads: the tar-stream is split into
+    blocks of 4 MiB which are compressed independently and written as a
+    multi-stream file (gzip-members, bzip2-, or xz-streams) that is
+    compatible with the standard tools. Zip-archives are always
+    compressed in the calling thread since the zipfile-library does not
+    support writing members that have been deflated elsewhere.
+
+    If digests are requested, they are computed while the files are
+    read and a manifest is returned which maps the archive names of all
+    packed files to pairs of algorithm and hex-digest, e.g.,
+    {"data/file.txt": {"sha256": "..."}}.
+
+    Keyword argument:
+    path -- path to the packing-target directory
+    fileobj -- writable binary stream
+
+    Optional arguments:
+    archive_format -- the archive format (default ".zip");
+                      it is expected to be one of "zip", "tar", "gztar",
+                      "bztar", or "xztar".
+    compresslevel -- compression level (zip, gztar, and bztar: 0-9,
+                     xztar: 0-9 preset)
+                     (default None -> default level of the respective
+                     library)
+    chunk_size -- size of chunks in bytes when reading files; for zip,
+                  chunks of the zipfile-library's default size are used
+                  (default 1 MiB)
+    workers -- number of threads used for compression of tar-based
+               formats
+               (default None -> compression in the calling thread)
+    on_event -- callback that is called with an ArchiveEvent at the
+                start and finish of the archive and of every member,
+                e.g., an ArchiveStatistics-object; the archive of the
+                events is path
+                (default None)
+    digests -- names of hashlib-algorithms (e.g., "sha256", "sha512",
+               or "md5") that are computed for every packed file
+               (default None -> no manifest is returned)
+    """
+
+    return _write_archive(
+        path, fileobj, archive_format, compresslevel, chunk_size, workers,
+        on_event=on_event,
+        manifest=None if digests is None else _Manifest(digests)
+    )
+
+def _write_archive(
+    path: str | Path,
+    fileobj: IO[bytes],
+    archive_format: str,
+    compresslevel: Optional[int],
+    chunk_size: int,
+    workers: Optional[int],
+    cancel: Optional[threading.Event] = None,
+    on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+    archive_path: Optional[Path] = None,
+    manifest: Optional[_Manifest] = None
+) -> Optional[dict[str, dict[str, str]]]:
+    """
+    Implementation of write_archive; cancel is checked once per item.
+    Events are reported to on_event with archive_path (default path) as
+    archive. Returns the entries of manifest (if given).
+    """
+
+    _path = make_path(path)
+    _archive_format = archive_format.lstrip(".")
+
+    if _archive_format != "zip" and _archive_format not in _TAR_OPENERS:
+        raise ValueError("Unknown archive format. Available formats: "\
+            + ", ".join(["zip"] + list(_TAR_OPENERS)))
+    if not _path.is_dir():
+        raise ValueError(f"Packing-target '{_path}' is not a directory.")
+
+    _archive_path = archive_path or _path
+    if on_event is not None:
+        on_event(ArchiveEvent("archive_start", "pack", _archive_path, 0))
+    start = time.perf_counter()
+    members, size = _write_members(
+        _path, fileobj, _archive_format, compresslevel, chunk_size, workers,
+        functools.partial(_MemberEvents, on_event, "pack", _archive_path, 0),
+        cancel,
+        manifest
+    )
+    if on_event is not None:
+        on_event(
+            ArchiveEvent(
+                "archive_finish", "pack", _archive_path, 0,
+                size=size,
+                members=members,
+                duration=time.perf_counter() - start
+            )
+        )
+    if manifest is None:
+        return None
+    return manifest.entries
+
+def _write_members(
+    path: Path,
+    fileobj: IO[bytes],
+    archive_format: str,
+    compresslevel: Optional[int],
+    chunk_size: int,
+    workers: Optional[int],
+    events: Callable[[str], _MemberEvents],
+    cancel: Optional[threading.Event],
+    manifest: Optional[_Manifest] = None
+) -> tuple[int, int]:
+    """
+    Write archive of the directory path to fileobj; events is called
+    with the archive name of every member to generate its
+    _MemberEvents. Digests of the files are added to manifest. Returns
+    the number of members and bytes read.
+    """
+
+    members, size = 0, 0
+    if archive_format == "zip":
+        with zipfile.ZipFile(
+            fileobj, mode="w", compression=zipfile.ZIP_DEFLATED,
+            compresslevel=compresslevel
+        ) as archive:
+            for item, name in _iter_directory(path, cancel):
+                with events(name) as member_events:
+                    if manifest is None or item.is_dir():
+                        archive.write(item, arcname=name)
+                    else:
+                        hashers = manifest.hashers()
+                        _write_zip_file(
+                            archive, item, name, hashers, chunk_size
+                        )
+                        manifest.add(name, hashers)
+                    member_events.size = archive.infolist()[-1].file_size
+                members += 1
+                size += member_events.size
+        return members, size
+
+    compressor = _tar_compressor(
+        fileobj, archive_format, compresslevel, workers
+    )
+    try:
+        with tarfile.open(
+            fileobj=compressor, mode="w|", bufsize=chunk_size
+        ) as archive:
+            for item, name in _iter_directory(path, cancel):
+                with events(name) as member_events:
+                    tarinfo = archive.gettarinfo(item, arcname=name)
+                    if tarinfo.isreg():
+                        hashers = (
+                            manifest.hashers() if manifest is not None else []
+                        )
+                        with open(item, "rb") as file:
+                            archive.addfile(
+                                tarinfo, _HashingReader(file, hashers)
+                            )
+                        if manifest is not None:
+                            manifest.add(name, hashers)
+                        member_events.size = tarinfo.size
+                    else:
+                        archive.addfile(tarinfo)
+                members += 1
+                size += member_events.size
+    finally:
+        if compressor is not fileobj:
+            compressor.close()
+    return members, size
+
+
+class AsyncArchiver():
+    """
+    Asyncio-interface for the archive operations of this module.
+
+    Operations are run in an executor such that the event loop is not
+    blocked. The number of concurrently running operations is bounded
+    by max_concurrency; additional operations wait for a free slot.
+    If an awaiting task is cancelled, the underlying operation is
+    cancelled as well (with a granularity of a single chunk of data for
+    unpacking, of a single item for packing, and of a single directory
+    for listing) and ArchiveOperationCancelled is raised in the worker;
+    the awaiting task receives the asyncio.CancelledError. On `close`
+    (and when leaving the context), all running operations are
+    cancelled the same way and (by default) awaited.
+
+    Optional arguments:
+    max_concurrency -- maximum number of concurrently running operations
+                       (default 4)
+    executor -- concurrent.futures.Executor to run the operations in;
+                it is expected to be able to run max_concurrency tasks
+                concurrently and it is not shut down by `close`
+                (default None -> a ThreadPoolExecutor with
+                max_concurrency threads is created)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        executor: Optional[Executor] = None
+    ) -> None:
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_concurrency
+        )
+        # submitted operations and their cancel-events
+        self._operations: dict[Future, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Cancel all submitted operations and shut down the executor (if
+        it has been created by this object).
+
+        Optional arguments:
+        wait -- if True, wait until the cancelled operations have
+                stopped (i.e., no more files are written afterwards)
+                (default True)
+        """
+
+        with self._lock:
+            operations = dict(self._operations)
+        for cancel in operations.values():
+            cancel.set()
+        if self._own_executor:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+        elif wait:
+            concurrent.futures.wait(operations)
+
+    async def __aenter__(self) -> "AsyncArchiver":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def _submit(
+        self, func: Callable[[], Any], cancel: threading.Event
+    ) -> asyncio.Future:
+        """
+        Submit func to the executor and return an asyncio.Future for
+        its result; the operation is tracked (along with its cancel-
+        event) until it is done.
+        """
+
+        future = self._executor.submit(func)
+        with self._lock:
+            self._operations[future] = cancel
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+    def _release(self, future: Future) -> None:
+        """Stop tracking the operation of future."""
+        with self._lock:
+            self._operations.pop(future, None)
+
+    async def _run(
+        self, func: Callable[..., Any], cancel: threading.Event, /, **kwargs
+    ) -> Any:
+        """
+        Run func with kwargs in the executor and return its result; on
+        cancellation of the awaiting task, cancel is set and the
+        operation is awaited before re-raising.
+        """
+
+        async with self._semaphore:
+            future = self._submit(functools.partial(func, **kwargs), cancel)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                cancel.set()
+                await asyncio.wait([future])
+                raise
+
+    async def _iterate(
+        self, func: Callable[..., Any], cancel: threading.Event, /, **kwargs
+    ) -> AsyncIterator[Any]:
+        """
+        Run func with kwargs in the executor and yield the items passed
+        to its `progress`-callback. If the iterator is closed early, the
+        operation is cancelled.
+        """
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def progress(item):
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        async with self._semaphore:
+            future = self._submit(
+                functools.partial(func, progress=progress, **kwargs), cancel
+            )
+            future.add_done_callback(lambda _: queue.put_nowait(done))
+            try:
+                while (item := await queue.get()) is not done:
+                    yield item
+                await future
+            finally:
+                if not future.done():
+                    cancel.set()
+                    await asyncio.wait([future])
+
+    async def unpack_archive(
+        self,
+        filename: str | Path,
+        extract_dir: Optional[str | Path] = None,
+        keep_archive: bool = True,
+        limits: Optional[ExtractionLimits] = None,
+        chunk_size: int = _CHUNK_SIZE,
+        on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+        member_filter: Optional[str | Callable[[str], bool]] = None,
+        digests: Optional[Iterable[str]] = None,
+        verify: bool = False
+    ) -> Optional[dict[str, dict[str, str]]]:
+        """
+        Awaitable version of unpack_archive (see there for details);
+        on_event and member_filter are called in the executor.
+        """
+
+        cancel = threading.Event()
+        return await self._run(
+            _unpack_archive,
+            cancel,
+            filename=filename,
+            extract_dir=extract_dir,
+            keep_archive=keep_archive,
+            budget=_ExtractionBudget(limits or ExtractionLimits(), cancel),
+            chunk_size=chunk_size,
+            on_event=on_event,
+            select=_member_selector(member_filter),
+            manifest=None if digests is None else _Manifest(digests),
+            verify=verify
+        )
+
+    async def list_members(self, filename: str | Path) -> list[ArchiveMember]:
+        """Awaitable version of list_members (see there for details)."""
+
+        return await self._run(
+            list_members, threading.Event(), filename=filename
+        )
+
+    async def unpack_archive_recursively(
+        self,
+        filename: str | Path,
+        extract_dir: Optional[str | Path] = None,
+        keep_archive: bool = True,
+        depth: Optional[int] = None,
+        workers: Optional[int] = None,
+        limits: Optional[ExtractionLimits] = None,
+        chunk_size: int = _CHUNK_SIZE,
+        on_event: Optional[Callable[[ArchiveEvent], None]] = None
+    ) -> None:
+        """
+        Awaitable version of unpack_archive_recursively (see there for
+        details); on_event is called in the executor.
+        """
+
+        async with contextlib.aclosing(
+            self.iter_unpack_archive_recursively(
+                filename, extract_dir, keep_archive, depth, workers, limits,
+                chunk_size, on_event
+            )
+        ) as paths:
+            async for _ in paths:
+                pass
+
+    async def iter_unpack_archive_recursively(
+        self,
+        filename: str | Path,
+        extract_dir: Optional[str | Path] = None,
+        keep_archive: bool = True,
+        depth: Optional[int] = None,
+        workers: Optional[int] = None,
+        limits: Optional[ExtractionLimits] = None,
+        chunk_size: int = _CHUNK_SIZE,
+        on_event: Optional[Callable[[ArchiveEvent], None]] = None
+    ) -> AsyncIterator[Path]:
+        """
+        Version of unpack_archive_recursively (see there for details)
+        that reports progress as asynchronous iterator: the path of
+        every archive is yielded after it has been unpacked. Closing the
+        iterator early (e.g., by using contextlib.aclosing) cancels the
+        operation.
+
+        Only pools of threads are supported for workers. on_event is
+        called in the executor.
+        """
+
+        _filename = make_path(filename)
+        if extract_dir is None:
+            _extract_dir = _filename.parent / _archive_stem(_filename)
+        else:
+            _extract_dir = make_path(extract_dir)
+        cancel = threading.Event()
+        async with contextlib.aclosing(
+            self._iterate(
+                _unpack_archive_recursively,
+                cancel,
+                filename=_filename,
+                extract_dir=_extract_dir,
+                keep_archive=keep_archive,
+                depth=depth,
+                verbose=False,
+                workers=workers,
+                use_processes=False,
+                budget=_ExtractionBudget(
+                    limits or ExtractionLimits(), cancel
+                ),
+                chunk_size=chunk_size,
+                on_event=on_event
+            )
+        ) as paths:
+            async for path in paths:
+                yield path
+
+    async def make_archive(
+        self,
+        path: str | Path,
+        archive_format: str = ".zip",
+        dir_name: Optional[Path] = None,
+        workers: Optional[int] = None,
+        on_event: Optional[Callable[[ArchiveEvent], None]] = None,
+        digests: Optional[Iterable[str]] = None,
+        manifest: Optional[dict[str, dict[str, str]]] = None
+    ) -> Path:
+        """
+        Awaitable version of make_archive (see there for details); the
+        archive is always generated with write_archive and on_event is
+        called in the executor.
+        """
+
+        cancel = threading.Event()
+        return await self._run(
+            _make_archive,
+            cancel,
+            path=path,
+            archive_format=archive_format,
+            dir_name=dir_name,
+            workers=workers,
+            cancel=cancel,
+            on_event=on_event,
+            digests=digests,
+            manifest=manifest
+        )
+
+    async def list_archives(
+        self,
+        path: str | Path,
+        pattern: str = "**/*",
+        condition_function=lambda p: True
+    ) -> list[Path]:
+        """Awaitable version of list_archives (see there for details)."""
+
+        async with contextlib.aclosing(
+            self.iter_archives(path, pattern, condition_function)
+        ) as archives:
+            return [archive async for archive in archives]
+
+    async def iter_archives(
+        self,
+        path: str | Path,
+        pattern: str = "**/*",
+        condition_function=lambda p: True
+    ) -> AsyncIterator[Path]:
+        """
+        Asynchronous iterator version of iter_archives (see there for
+        details). Closing the iterator early (e.g., by using
+        contextlib.aclosing) cancels the operation.
+        """
+
+        def collect(progress, cancel):
+            for archive in _iter_archives(
+                path, pattern, condition_function, cancel
+            ):
+                progress(archive)
+
+        cancel = threading.Event()
+        async with contextlib.aclosing(
+            self._iterate(collect, cancel, cancel=cancel)
+        ) as archives:
+            async for archive in archives:
+                yield archive
@@ -0,0 +1,14 @@
+from .generators import (
+    ArchiveTree, synthetic_class, synthetic_data, nested_archive_tree
+)
+from .runner import (
+    BenchmarkResult, vinegar_case, archives_case, default_cases,
+    run_benchmarks, compare_results
+)
+
+
+__all__ = [
+    "ArchiveTree", "synthetic_class", "synthetic_data",
+    "nested_archive_tree", "BenchmarkResult", "vinegar_case",
+    "archives_case", "default_cases", "run_benchmarks", "compare_results",
+]
@@ -0,0 +1,77 @@
+"""
+Command line interface of the benchmark suite, e.g.,
+`python -m dcm_s11n.benchmarks --output results.json`.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import sys
+
+from .runner import default_cases, run_benchmarks, compare_results
+
+
+def main() -> int:
+    """Run benchmarks; returns 1 if regressions have been found."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m dcm_s11n.benchmarks",
+        description="Benchmarks for Vinegar-backends and archives.",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, default=Path("benchmarks.json"),
+        help="path of the JSON-file for the results",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="run a reduced set of cases"
+    )
+    parser.add_argument(
+        "--suite", choices=["vinegar", "archives"], action="append",
+        help="run only the given suite(s)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--no-isolate", action="store_true",
+        help="run all cases in this process",
+    )
+    parser.add_argument(
+        "--compare", type=Path,
+        help="JSON-file of a previous run to compare the results with",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="tolerated relative increase of the median latency",
+    )
+    args = parser.parse_args()
+
+    cases = [
+        (func, kwargs)
+        for func, kwargs in default_cases(args.quick, args.seed)
+        if args.suite is None
+        or func.__name__.removesuffix("_case") in args.suite
+    ]
+    document = run_benchmarks(
+        cases, args.output, not args.no_isolate,
+        lambda case: print(f"Running {case}", file=sys.stderr),
+    )
+    for skipped in document["skipped"]:
+        print(
+            f"Skipped {skipped['case']}: {skipped['reason']}", file=sys.stderr
+        )
+    if args.compare is None:
+        return 0
+    regressions = compare_results(
+        json.loads(args.compare.read_text(encoding="utf-8")), document,
+        threshold=args.threshold,
+    )
+    for regression in regressions:
+        print(
+            f"Regression in {regression['suite']}.{regression['operation']} "
+            + f"{regression['parameters']}: {regression['change']:+.1%}",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Synthetic data for the benchmarks: Python objects (classes) to be
+pickled and trees of nested archives.
+
+All generators are deterministic for a given seed.
+"""
+
+from typing import Any, NamedTuple
+from pathlib import Path
+import random
+import shutil
+
+from dcm_s11n.archives import make_archive
+
+
+class ArchiveTree(NamedTuple):
+    """
+    Description of a generated tree of nested archives.
+
+    Keyword arguments:
+    path -- path of the top-level archive
+    archives -- total number of archives (including the top-level)
+    files -- total number of regular files
+    size -- total size of regular files in bytes
+    """
+    path: Path
+    archives: int
+    files: int
+    size: int
+
+
+def _random_text(rng: random.Random, size: int) -> str:
+    return "".join(rng.choices("abcdefghijklmnopqrstuvwxyz ", k=size))
+
+
+def synthetic_class(
+    index: int,
+    attributes: int = 10,
+    size: int = 1024,
+    seed: int = 0
+) -> type:
+    """
+    Returns a dynamically created class with data-attributes and
+    methods; since it is not importable, dill serializes the class by
+    value (like classes defined in `__main__`).
+
+    Keyword arguments:
+    index -- index of the class (used in the class name and to derive
+             the random state)
+
+    Optional arguments:
+    attributes -- number of data-attributes
+                  (default 10)
+    size -- approximate total size of the data-attributes in
+            characters
+            (default 1024)
+    seed -- random seed
+            (default 0)
+    """
+
+    rng = random.Random(f"{seed}-{index}")
+    namespace: dict[str, Any] = {
+        f"attribute_{i}": _random_text(rng, max(1, size // attributes))
+        for i in range(attributes)
+    }
+    namespace["__init__"] = lambda self, value=None: setattr(
+        self, "value", value
+    )
+    namespace["describe"] = lambda self: f"{type(self).__name__}: {self.value}"
+    namespace["__module__"] = "__main__"
+    return type(f"Synthetic{index}", (), namespace)
+
+
+def synthetic_data(index: int, size: int = 1024, seed: int = 0) -> dict:
+    """
+    Returns nested plain data (dicts, lists, strings, and numbers) of
+    the given approximate size; unlike synthetic_class, this can be
+    serialized by any pickler.
+
+    Keyword arguments:
+    index -- index of the object (used to derive the random state)
+
+    Optional arguments:
+    size -- approximate size in characters
+            (default 1024)
+    seed -- random seed
+            (default 0)
+    """
+
+    rng = random.Random(f"{seed}-{index}")
+    items = max(1, size // 64)
+    return {
+        "index": index,
+        "items": [
+            {"id": i, "value": rng.random(), "text": _random_text(rng, 48)}
+            for i in range(items)
+        ],
+    }
+
+
+def nested_archive_tree(
+    directory: Path,
+    depth: int,
+    fan_out: int,
+    files: int = 4,
+    file_size: int = 16 * 1024,
+    archive_format: str = "zip",
+    seed: int = 0
+) -> ArchiveTree:
+    """
+    Generate a tree of nested archives in directory and return its
+    description. Every archive contains files regular files and (except
+    for the archives of the deepest level) fan_out nested archives.
+    Since nested archives are unpacked into their parent directory (see
+    unpack_archive_recursively), all names are unique within the tree.
+
+    Keyword arguments:
+    directory -- target directory (created if missing); has to be
+                 located in the current working directory (see
+                 make_archive)
+    depth -- number of levels of nested archives below the top-level
+             archive
+    fan_out -- number of nested archives per archive
+
+    Optional arguments:
+    files -- number of regular files per archive
+             (default 4)
+    file_size -- size of regular files in bytes
+                 (default 16 KiB)
+    archive_format -- one of the formats of make_archive (e.g., "zip",
+                      "tar", or "gztar")
+                      (default "zip")
+    seed -- random seed
+            (default 0)
+    """
+
+    rng = random.Random(seed)
+    counts = {"archives": 0, "files": 0, "size": 0}
+
+    def build(path: Path, level: int) -> Path:
+        path.mkdir(parents=True)
+        node = counts["archives"]
+        counts["archives"] += 1
+        for i in range(files):
+            # half random, half repetitive content to get realistic
+            # compression ratios
+            data = rng.randbytes(file_size // 2) + bytes(
+                file_size - file_size // 2
+            )
+            (path / f"node_{node}_file_{i}.bin").write_bytes(data)
+            counts["files"] += 1
+            counts["size"] += len(data)
+        if level < depth:
+            for _ in range(fan_out):
+                build(path / f"node_{counts['archives']}", level + 1)
+        archive = make_archive(path, archive_format, path.parent)
+        shutil.rmtree(path)
+        return archive
+
+    directory.mkdir(parents=True, exist_ok=True)
+    archive = build(directory / "tree", 0)
+    return ArchiveTree(
+        archive, counts["archives"], counts["files"], counts["size"]
+    )
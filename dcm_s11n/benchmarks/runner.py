@@ -0,0 +1,461 @@
+"""
+Benchmark cases for Vinegar-backends and archive operations, and
+utilities for running them and storing/comparing the results as JSON.
+"""
+
+from typing import Any, Callable, Optional, NamedTuple, Iterable
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+import multiprocessing
+import tempfile
+import platform
+import random
+import json
+import time
+import sys
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+from dcm_s11n.archives import make_archive, unpack_archive_recursively
+from dcm_s11n.vinegar import Vinegar, MemoryDB, LogDB, SQLiteDB
+from .generators import synthetic_class, synthetic_data, nested_archive_tree
+
+
+# version of the JSON-format of the results
+RESULTS_FORMAT = 1
+
+VINEGAR_BACKENDS = ("memory", "log", "sqlite", "tinydb")
+
+
+class BenchmarkResult(NamedTuple):
+    """
+    Result of a single benchmarked operation.
+
+    Keyword arguments:
+    suite -- name of the suite ("vinegar" or "archives")
+    operation -- name of the operation (e.g., "dump" or "unpack")
+    parameters -- parameters of the benchmark case
+    count -- number of measured operations
+    latency -- mean, min, max, and percentiles (p50, p90, p99) of the
+               latency in seconds
+    throughput -- operations per second
+    bytes_per_second -- processed bytes per second (if applicable)
+    peak_rss -- peak resident set size of the process running the case
+                in bytes (None if not supported by the platform)
+    """
+    suite: str
+    operation: str
+    parameters: dict[str, Any]
+    count: int
+    latency: dict[str, float]
+    throughput: float
+    bytes_per_second: Optional[float]
+    peak_rss: Optional[int]
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    """Returns percentile q (0-100) of sorted samples (nearest rank)."""
+    rank = max(1, round(q / 100 * len(samples)))
+    return samples[min(rank, len(samples)) - 1]
+
+
+def _summarize(samples: list[float]) -> dict[str, float]:
+    """Returns latency summary of samples (in seconds)."""
+    _samples = sorted(samples)
+    return {
+        "mean": sum(_samples) / len(_samples),
+        "min": _samples[0],
+        "p50": _percentile(_samples, 50),
+        "p90": _percentile(_samples, 90),
+        "p99": _percentile(_samples, 99),
+        "max": _samples[-1],
+    }
+
+
+def _peak_rss() -> Optional[int]:
+    """Returns the peak resident set size of this process in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in bytes on macOS and in KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _measure(
+    func: Callable[[Any], Any], items: Iterable[Any]
+) -> tuple[list[float], float]:
+    """
+    Call func for every item and return the individual latencies and
+    the total duration in seconds.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - start
+
+
+def _result(
+    suite: str,
+    operation: str,
+    parameters: dict[str, Any],
+    samples: list[float],
+    duration: float,
+    size: Optional[int] = None
+) -> BenchmarkResult:
+    return BenchmarkResult(
+        suite=suite,
+        operation=operation,
+        parameters=parameters,
+        count=len(samples),
+        latency=_summarize(samples),
+        throughput=len(samples) / duration if duration else 0.0,
+        bytes_per_second=(
+            None if size is None or not duration
+            else size * len(samples) / duration
+        ),
+        peak_rss=_peak_rss(),
+    )
+
+
+def _make_db(backend: str, directory: Path):
+    """Returns fresh db of the given backend in directory."""
+    if backend == "memory":
+        return MemoryDB()
+    if backend == "log":
+        return LogDB(directory / "benchmark.log")
+    if backend == "sqlite":
+        return SQLiteDB(directory / "benchmark.sqlite")
+    if backend == "tinydb":
+        # pylint: disable-next=import-outside-toplevel
+        from dcm_s11n.vinegar.db_tinydb import TinyDBInterface
+        return TinyDBInterface(directory / "benchmark.json")
+    raise ValueError(
+        f"Unknown backend '{backend}'. Available backends: "
+        + ", ".join(VINEGAR_BACKENDS)
+    )
+
+
+def vinegar_case(
+    backend: str,
+    records: int,
+    payload: str = "class",
+    object_size: int = 1024,
+    samples: int = 100,
+    seed: int = 0
+) -> list[BenchmarkResult]:
+    """
+    Benchmark Vinegar with the given backend; returns results for the
+    operations "dump" (filling a store with records objects), "load"
+    and "find" (random samples), and "all" (`Vinegar.find()`).
+
+    Keyword arguments:
+    backend -- one of VINEGAR_BACKENDS
+    records -- number of records in the store
+
+    Optional arguments:
+    payload -- kind of pickled objects, "class" (see synthetic_class)
+               or "data" (see synthetic_data)
+               (default "class")
+    object_size -- approximate size of the objects
+                   (default 1024)
+    samples -- number of measured load- and find-operations
+               (default 100)
+    seed -- random seed
+            (default 0)
+    """
+
+    if payload == "class":
+        def generate(i):
+            return synthetic_class(i, size=object_size, seed=seed)
+    elif payload == "data":
+        def generate(i):
+            return synthetic_data(i, size=object_size, seed=seed)
+    else:
+        raise ValueError(f"Unknown payload '{payload}'.")
+
+    parameters = {
+        "backend": backend, "records": records, "payload": payload,
+        "object_size": object_size,
+    }
+    rng = random.Random(seed)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        db = _make_db(backend, Path(directory))
+        vinegar = Vinegar(db)
+        objects = {f"object_{i}": generate(i) for i in range(records)}
+        size = sum(len(vinegar.dumps(obj)) for obj in objects.values())
+
+        latencies, duration = _measure(
+            lambda item: vinegar.dump(item[1], item[0]), objects.items()
+        )
+        results.append(
+            _result(
+                "vinegar", "dump", parameters, latencies, duration,
+                size // records
+            )
+        )
+        tags = rng.choices(list(objects), k=samples)
+        for operation, func in (
+            ("load", vinegar.load), ("find", vinegar.find)
+        ):
+            latencies, duration = _measure(func, tags)
+            results.append(
+                _result("vinegar", operation, parameters, latencies, duration)
+            )
+        latencies, duration = _measure(lambda _: vinegar.find(), range(3))
+        results.append(
+            _result("vinegar", "all", parameters, latencies, duration, size)
+        )
+        if hasattr(db, "close"):
+            db.close()
+    return results
+
+
+def archives_case(
+    depth: int,
+    fan_out: int,
+    files: int = 4,
+    file_size: int = 16 * 1024,
+    archive_format: str = "zip",
+    repeat: int = 3,
+    workers: Optional[int] = None,
+    seed: int = 0
+) -> list[BenchmarkResult]:
+    """
+    Benchmark unpacking (`unpack_archive_recursively`) of a tree of
+    nested archives and packing (`make_archive`) of the unpacked tree;
+    see nested_archive_tree for the parameters of the tree.
+
+    Keyword arguments:
+    depth -- number of levels of nested archives
+    fan_out -- number of nested archives per archive
+
+    Optional arguments:
+    files -- number of regular files per archive
+             (default 4)
+    file_size -- size of regular files in bytes
+                 (default 16 KiB)
+    archive_format -- format of the archives
+                      (default "zip")
+    repeat -- number of repetitions of every operation
+              (default 3)
+    workers -- passed to unpack_archive_recursively and make_archive
+               (default None)
+    seed -- random seed
+            (default 0)
+    """
+
+    parameters = {
+        "depth": depth, "fan_out": fan_out, "files": files,
+        "file_size": file_size, "archive_format": archive_format,
+        "workers": workers,
+    }
+    results = []
+    # make_archive returns paths relative to the working directory
+    with tempfile.TemporaryDirectory(dir=Path.cwd()) as directory:
+        _directory = Path(directory)
+        tree = nested_archive_tree(
+            _directory / "source", depth, fan_out, files, file_size,
+            archive_format, seed
+        )
+        parameters["archives"] = tree.archives
+
+        def unpack(i):
+            target = _directory / f"unpacked_{i}"
+            unpack_archive_recursively(
+                tree.path, target, workers=workers
+            )
+
+        latencies, duration = _measure(unpack, range(repeat))
+        results.append(
+            _result(
+                "archives", "unpack", parameters, latencies, duration,
+                tree.size
+            )
+        )
+
+        def pack(i):
+            target = _directory / f"packed_{i}"
+            target.mkdir()
+            make_archive(
+                _directory / "unpacked_0", archive_format, target,
+                workers=workers
+            )
+
+        latencies, duration = _measure(pack, range(repeat))
+        results.append(
+            _result(
+                "archives", "pack", parameters, latencies, duration,
+                tree.size
+            )
+        )
+    return results
+
+
+def default_cases(
+    quick: bool = False, seed: int = 0
+) -> list[tuple[Callable[..., list[BenchmarkResult]], dict[str, Any]]]:
+    """
+    Returns the default benchmark cases as pairs of case-function and
+    keyword arguments.
+
+    Optional arguments:
+    quick -- if True, a reduced set of small cases is returned
+             (default False)
+    seed -- random seed
+            (default 0)
+    """
+
+    cases = []
+    for backend in VINEGAR_BACKENDS:
+        for records in ((100,) if quick else (100, 1000, 10000)):
+            # TinyDB rewrites the entire file on every insert
+            if backend == "tinydb" and records > 1000:
+                continue
+            cases.append(
+                (
+                    vinegar_case,
+                    {"backend": backend, "records": records, "seed": seed}
+                )
+            )
+    for depth, fan_out in (
+        ((1, 2),) if quick else ((1, 2), (2, 2), (3, 2), (1, 8), (2, 8))
+    ):
+        cases.append(
+            (
+                archives_case,
+                {"depth": depth, "fan_out": fan_out, "seed": seed}
+            )
+        )
+    return cases
+
+
+def _environment() -> dict[str, Any]:
+    """Returns description of the environment."""
+    try:
+        version = metadata.version("dcm-s11n")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        "format": RESULTS_FORMAT,
+        "package_version": version,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": multiprocessing.cpu_count(),
+        "timestamp": time.time(),
+    }
+
+
+def run_benchmarks(
+    cases: Optional[
+        list[tuple[Callable[..., list[BenchmarkResult]], dict[str, Any]]]
+    ] = None,
+    output: Optional[Path] = None,
+    isolate: bool = True,
+    progress: Optional[Callable[[str], None]] = None
+) -> dict[str, Any]:
+    """
+    Run benchmark cases and return the results as JSON-serializable
+    dictionary (optionally written to output).
+
+    Unavailable backends (e.g., TinyDB without the optional dependency)
+    are skipped and listed under "skipped".
+
+    Optional arguments:
+    cases -- pairs of case-function and keyword arguments
+             (default None -> `default_cases()`)
+    output -- path of the JSON-file for the results
+              (default None)
+    isolate -- if True, every case is run in a fresh process such that
+               the peak RSS refers to that case only
+               (default True)
+    progress -- callback that is called with a description of every
+                case before it is run
+                (default None)
+    """
+
+    results = []
+    skipped = []
+    for func, kwargs in cases if cases is not None else default_cases():
+        description = f"{func.__name__}({kwargs})"
+        if progress is not None:
+            progress(description)
+        try:
+            if isolate:
+                with ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn")
+                ) as executor:
+                    case_results = executor.submit(func, **kwargs).result()
+            else:
+                case_results = func(**kwargs)
+        except ImportError as exc_info:
+            skipped.append({"case": description, "reason": str(exc_info)})
+            continue
+        results.extend(result._asdict() for result in case_results)
+
+    document = {
+        "environment": _environment(),
+        "results": results,
+        "skipped": skipped,
+    }
+    if output is not None:
+        output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    return document
+
+
+def _key(result: dict[str, Any]) -> str:
+    return json.dumps(
+        [result["suite"], result["operation"], result["parameters"]],
+        sort_keys=True
+    )
+
+
+def compare_results(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    statistic: str = "p50",
+    threshold: float = 0.1
+) -> list[dict[str, Any]]:
+    """
+    Compare the latencies of two result-documents (see run_benchmarks)
+    and return a list of regressions, i.e., operations whose latency
+    increased by more than threshold (relative).
+
+    Keyword arguments:
+    baseline -- results of the reference run (e.g., previous release)
+    current -- results of the run to be checked
+
+    Optional arguments:
+    statistic -- latency-statistic to compare (e.g., "p50" or "p99")
+                 (default "p50")
+    threshold -- relative increase that is tolerated
+                 (default 0.1)
+    """
+
+    reference = {_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        if _key(result) not in reference:
+            continue
+        before = reference[_key(result)]["latency"][statistic]
+        after = result["latency"][statistic]
+        if before > 0 and after / before - 1 > threshold:
+            regressions.append(
+                {
+                    "suite": result["suite"],
+                    "operation": result["operation"],
+                    "parameters": result["parameters"],
+                    "baseline": before,
+                    "current": after,
+                    "change": after / before - 1,
+                }
+            )
+    return regressions
@@ -1,8 +1,19 @@
 from .vinegar import Vinegar
-from .db_interface import DBInterface, DBRecord
+from .db_interface import (
+    DBInterface, DBRecord, Buffer, RecordMetadata, MetadataFilter,
+    VersionConflictError
+)
 from .db_memory import MemoryDB
+from .db_log import LogDB
+from .db_sqlite import SQLiteDB
+from .db_dedup import DedupDB
+from .db_locked import LockedDB, ReadWriteLock
+from .async_vinegar import AsyncVinegar, AsyncDBInterface, AsyncDBAdapter
 
 
 __all__ = [
-    "Vinegar", "DBRecord", "DBInterface", "MemoryDB",
+    "Vinegar", "DBRecord", "DBInterface", "Buffer", "RecordMetadata",
+    "MetadataFilter", "VersionConflictError", "MemoryDB", "LogDB",
+    "SQLiteDB", "DedupDB", "LockedDB", "ReadWriteLock", "AsyncVinegar",
+    "AsyncDBInterface", "AsyncDBAdapter",
 ]
@@ -0,0 +1,380 @@
+"""
+This module defines the asyncio-interface of vinegar: the AsyncVinegar-
+class, the interface for asynchronous dbs, and an adapter for
+synchronous dbs.
+"""
+
+from typing import Any, Callable, Optional, Mapping, Iterable, Sequence
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+import abc
+import asyncio
+import functools
+
+from .db_interface import DBInterface, DBRecord, Buffer
+from .vinegar import (
+    DEFAULT_SERIALIZERS, _check_buffer_serializers, _dumps, _loads
+)
+from .serializers import Serializer, get_serializer
+from .buffers import BufferStore
+from . import compression
+
+
+class AsyncDBInterface(metaclass=abc.ABCMeta):
+    """
+    This metaclass defines the interface for asynchronous db-definitions
+    compatible for use with AsyncVinegar. The methods are awaitable
+    versions of the methods of the DBInterface (see there for details).
+
+    Required methods are:
+    insert(obj: Buffer, tag: str) -- add/update DBRecord with keyword tag
+    find(tag: str) -- return DBRecord filed with tag or None
+    all() -- return list of all DBRecord
+    remove(tag: str) -- remove DBRecord with keyword tag if it exists
+
+    Optional methods (default implementations loop over the methods
+    above):
+    insert_many(objs: Mapping[str, Buffer]) -- add/update multiple
+                                               DBRecords
+    find_many(tags: Iterable[str]) -- return list of DBRecord or None
+    """
+
+    @abc.abstractmethod
+    async def insert(self, obj: Buffer, tag: str) -> None:
+        """
+        Add new obj to db under the keyword tag; Update record if tag
+        already exists.
+
+        Keyword arguments:
+        obj -- bytes-like object to be stored in db
+        tag -- name tag for this object
+        """
+
+        raise NotImplementedError(
+            f"Class {self.__class__.__name__} does not define method "\
+                "self.insert"
+        )
+
+    @abc.abstractmethod
+    async def find(self, tag: str) -> Optional[DBRecord]:
+        """
+        Find and return DBRecord obj or None.
+
+        Keyword arguments:
+        tag -- name tag for requested DBRecord
+        """
+
+        raise NotImplementedError(
+            f"Class {self.__class__.__name__} does not define method "\
+                "self.find"
+        )
+
+    @abc.abstractmethod
+    async def all(self) -> list[DBRecord]:
+        """
+        Returns list of all DBRecord.
+        """
+
+        raise NotImplementedError(
+            f"Class {self.__class__.__name__} does not define method "\
+                "self.all"
+        )
+
+    @abc.abstractmethod
+    async def remove(self, tag: str) -> None:
+        """
+        Remove DBRecord with keyword tag from db.
+
+        Keyword arguments:
+        tag -- name tag for this object
+        """
+
+        raise NotImplementedError(
+            f"Class {self.__class__.__name__} does not define method "\
+                "self.remove"
+        )
+
+    async def insert_many(self, objs: Mapping[str, Buffer]) -> None:
+        """
+        Add multiple objs to db; Update records if tags already exist.
+
+        Keyword arguments:
+        objs -- mapping of name tags and bytes-like objects to be stored
+                in db
+        """
+
+        for tag, obj in objs.items():
+            await self.insert(obj, tag)
+
+    async def find_many(
+        self, tags: Iterable[str]
+    ) -> list[Optional[DBRecord]]:
+        """
+        Find and return list of DBRecord obj or None (one element for
+        every tag in tags).
+
+        Keyword arguments:
+        tags -- name tags for requested DBRecords
+        """
+
+        return [await self.find(tag) for tag in tags]
+
+
+class AsyncDBAdapter(AsyncDBInterface):
+    """
+    Adapter that implements the AsyncDBInterface for a synchronous db by
+    running its methods in an executor.
+
+    Keyword arguments:
+    db -- object of a class implementing the DBInterface
+
+    Optional arguments:
+    executor -- concurrent.futures.Executor to run the methods of db in;
+                it is not shut down by `close`
+                (default None -> a ThreadPoolExecutor with a single
+                thread is created, i.e., db is never accessed
+                concurrently)
+    """
+
+    def __init__(
+        self, db: DBInterface, executor: Optional[Executor] = None
+    ) -> None:
+        self._db = db
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=1)
+
+    def close(self) -> None:
+        """Shut down the executor (if it has been created by this object)."""
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    async def _run(self, func: Callable[..., Any], /, *args) -> Any:
+        """Run func with args in the executor and return its result."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args)
+        )
+
+    async def insert(self, obj: Buffer, tag: str) -> None:
+        await self._run(self._db.insert, obj, tag)
+
+    async def insert_many(self, objs: Mapping[str, Buffer]) -> None:
+        if hasattr(self._db, "insert_many"):
+            await self._run(self._db.insert_many, objs)
+        else:
+            await super().insert_many(objs)
+
+    async def find(self, tag: str) -> Optional[DBRecord]:
+        return await self._run(self._db.find, tag)
+
+    async def find_many(
+        self, tags: Iterable[str]
+    ) -> list[Optional[DBRecord]]:
+        if hasattr(self._db, "find_many"):
+            return await self._run(self._db.find_many, list(tags))
+        return await super().find_many(tags)
+
+    async def all(self) -> list[DBRecord]:
+        return await self._run(self._db.all)
+
+    async def remove(self, tag: str) -> None:
+        await self._run(self._db.remove, tag)
+
+
+class AsyncVinegar():
+    """
+    Asyncio-interface for the (de-)serialization of python objects with
+    a db.
+
+    (De-)serialization is run in an executor such that the event loop
+    is not blocked. A synchronous db (implementing the DBInterface) is
+    adapted automatically by an AsyncDBAdapter.
+
+    Keyword arguments:
+    db -- object of a class implementing the AsyncDBInterface or the
+          DBInterface
+
+    Optional arguments:
+    executor -- concurrent.futures.Executor to run the (de-)
+                serialization in; it is not shut down by `close`
+                (default None -> a ThreadPoolExecutor is created)
+    codec -- name of a codec (see `compression.CODECS`, e.g., "zlib",
+             "lzma", or "bz2") or `compression.Codec` that is used to
+             compress serialized objects
+             (default None -> no compression)
+    compression_threshold -- minimum size in bytes of a serialized
+                             object to be compressed
+                             (default 1024)
+    serializers -- names of serializers or `serializers.Serializer`
+                   that are tried in the given order (see Vinegar)
+                   (default DEFAULT_SERIALIZERS -> pickle with fallback
+                   to dill)
+    buffer_directory -- pathlib-Path of the directory for out-of-band
+                        buffers (see Vinegar)
+                        (default None -> all data are stored in-band)
+    buffer_threshold -- minimum size in bytes of a buffer to be stored
+                        out-of-band
+                        (default 1 MiB)
+    """
+
+    def __init__(
+        self,
+        db: AsyncDBInterface | DBInterface,
+        executor: Optional[Executor] = None,
+        codec: Optional[str | compression.Codec] = None,
+        compression_threshold: int = 1024,
+        serializers: Sequence[str | Serializer] = DEFAULT_SERIALIZERS,
+        buffer_directory: Optional[Path] = None,
+        buffer_threshold: int = 1024 * 1024
+    ) -> None:
+        if not serializers:
+            raise ValueError("At least one serializer is required.")
+        _serializers = tuple(map(get_serializer, serializers))
+        _check_buffer_serializers(buffer_directory, _serializers)
+        self._own_db = not isinstance(db, AsyncDBInterface)
+        self._db = AsyncDBAdapter(db) if self._own_db else db
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor()
+        self._codec = None if codec is None else compression.get_codec(codec)
+        self._compression_threshold = compression_threshold
+        self._serializers = _serializers
+        self._buffers = None if buffer_directory is None \
+            else BufferStore(buffer_directory)
+        self._buffer_threshold = buffer_threshold
+
+    def close(self) -> None:
+        """
+        Shut down the executors (if they have been created by this
+        object).
+        """
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+        if self._own_db:
+            self._db.close()
+
+    async def __aenter__(self) -> "AsyncVinegar":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        # shutting down the executors blocks until pending work is done
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def _run(self, func: Callable[..., Any], /, *args) -> Any:
+        """Run func with args in the executor and return its result."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args)
+        )
+
+    async def dumps(self, obj: Any) -> bytes:
+        """
+        Serializes the given Python-object obj and returns it as
+        byte-encoded string (out-of-band buffers are written to the
+        buffer_directory, see Vinegar.dumps).
+
+        Keyword arguments:
+        obj -- Python object to be serialized
+        """
+
+        return await self._run(
+            _dumps, obj, self._serializers, self._codec,
+            self._compression_threshold, self._buffers,
+            self._buffer_threshold
+        )
+
+    async def loads(self, obj_string: Buffer) -> Any:
+        """
+        Attempts to deserialize from byte-encoded string obj_string.
+
+        Keyword arguments:
+        obj_string -- byte-encoded string (or other bytes-like object)
+                      representing Python object
+        """
+
+        return await self._run(_loads, obj_string, self._buffers)
+
+    async def dump(self, obj: Any, tag: str) -> None:
+        """
+        Serializes the given Python-object obj and stores it with the
+        given tag.
+
+        Keyword arguments:
+        obj -- Python object to be serialized
+        tag -- tag for Python object
+        """
+
+        await self._db.insert(await self.dumps(obj), tag)
+
+    async def dump_many(self, objs: Mapping[str, Any]) -> None:
+        """
+        Serializes the given Python-objects (concurrently) and stores
+        them with the associated tags in a single batch-operation.
+
+        Keyword arguments:
+        objs -- mapping of tags and Python objects to be serialized
+        """
+
+        serialized_objects = await asyncio.gather(
+            *(self.dumps(obj) for obj in objs.values())
+        )
+        await self._db.insert_many(dict(zip(objs, serialized_objects)))
+
+    async def load(self, tag: str) -> Any:
+        """
+        Attempts to deserialize object from obj string in db.
+
+        Returns None if no entry tagged with tag found in db.
+
+        Keyword arguments:
+        tag -- object's tag
+        """
+
+        record = await self._db.find(tag)
+        if record is None:
+            return None
+        return await self.loads(record["obj"])
+
+    async def load_many(self, tags: Iterable[str]) -> list[Any]:
+        """
+        Attempts to deserialize objects (concurrently) for multiple tags
+        in a single batch-operation.
+
+        Returns a list with one element for every tag in tags; elements
+        are None if no entry tagged with that tag is found in db.
+
+        Keyword arguments:
+        tags -- objects' tags
+        """
+
+        records = await self._db.find_many(list(tags))
+
+        async def _load(record):
+            if record is None:
+                return None
+            return await self.loads(record["obj"])
+
+        return await asyncio.gather(*(_load(record) for record in records))
+
+    async def find(
+        self, tag: Optional[str] = None
+    ) -> Optional[DBRecord] | list[DBRecord]:
+        """
+        Returns the DBRecord for tag or, if tag is None, a list of all
+        DBRecords.
+
+        Keyword arguments:
+        tag -- search tag
+               (default None)
+        """
+
+        if tag is not None:
+            return await self._db.find(tag)
+        return await self._db.all()
+
+    async def remove(self, tag: str) -> None:
+        """
+        Removes record with tag from database.
+
+        Keyword arguments:
+        tag -- record tag to be deleted
+        """
+
+        await self._db.remove(tag)
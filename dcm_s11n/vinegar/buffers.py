@@ -0,0 +1,99 @@
+"""
+Definition of the storage for out-of-band buffers (pickle protocol 5) of
+Vinegar-payloads.
+"""
+
+from typing import Iterable, Iterator
+from pathlib import Path
+import os
+import mmap
+import uuid
+
+from .db_interface import Buffer
+
+
+class BufferStore():
+    """
+    Content-addressed storage of large buffers as individual files in a
+    directory. Files are named by the sha256-digest of their contents
+    such that identical buffers are stored only once.
+
+    Buffers are read via private (copy-on-write) memory-maps of their
+    files, i.e., their contents are only paged in when accessed and
+    changes to loaded objects are never written back.
+
+    Since a file may be referenced by multiple records, files are not
+    removed along with records; unreferenced files can be removed with
+    `collect_garbage`.
+
+    Keyword arguments:
+    directory -- pathlib-Path of the directory (created if missing)
+    """
+
+    def __init__(self, directory: Path):
+        self._directory = directory
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        return self._directory / digest[:2] / digest
+
+    def put(self, digest: str, buffer: Buffer) -> None:
+        """
+        Store buffer under digest (if not stored yet). Files are written
+        to a temporary file first and renamed afterwards, i.e., partially
+        written files are never visible.
+
+        Keyword arguments:
+        digest -- sha256 hex-digest of buffer
+        buffer -- bytes-like object to be stored
+        """
+
+        path = self._path(digest)
+        if path.is_file():
+            return
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f".{digest}.{uuid.uuid4().hex}")
+        try:
+            with open(tmp_path, "wb") as file:
+                file.write(buffer)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def get(self, digest: str) -> memoryview:
+        """
+        Returns memoryview of the buffer stored under digest.
+
+        Keyword arguments:
+        digest -- sha256 hex-digest of buffer
+        """
+
+        with open(self._path(digest), "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return memoryview(bytearray())
+            return memoryview(
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+            )
+
+    def digests(self) -> Iterator[str]:
+        """Returns iterator over the digests of all stored buffers."""
+        for path in self._directory.glob("*/*"):
+            if not path.name.startswith("."):
+                yield path.name
+
+    def collect_garbage(self, referenced: Iterable[str]) -> int:
+        """
+        Remove all buffers that are not referenced and return their
+        number.
+
+        Keyword arguments:
+        referenced -- digests of buffers that are still referenced
+        """
+
+        _referenced = set(referenced)
+        orphans = [
+            digest for digest in self.digests() if digest not in _referenced
+        ]
+        for digest in orphans:
+            self._path(digest).unlink(missing_ok=True)
+        return len(orphans)
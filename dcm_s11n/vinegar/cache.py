@@ -0,0 +1,120 @@
+"""
+Definition of a size-bounded least-recently-used (LRU) cache for
+deserialized objects.
+"""
+
+from typing import Any, Hashable, NamedTuple, Optional
+from collections import OrderedDict
+import threading
+
+
+class CacheInfo(NamedTuple):
+    """
+    Statistics of an LRUCache.
+    """
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache():
+    """
+    A size-bounded mapping which evicts the least recently used entry
+    once maxsize is exceeded. All methods are thread-safe.
+
+    Every invalidation increments the `generation` of the cache. A value
+    that has been read from an external source can be put with the
+    generation obtained before reading; it is then only cached if no
+    entry has been invalidated in the meantime (the value might be
+    outdated otherwise).
+
+    Keyword arguments:
+    maxsize -- maximum number of entries
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError(
+                f"Cache size has to be positive (got {maxsize})."
+            )
+        self._maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Returns the number of invalidations so far."""
+        return self._generation
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """
+        Returns tuple of a boolean (whether key is cached) and the
+        cached value (None if not cached).
+
+        Keyword arguments:
+        key -- key of the entry
+        """
+
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return True, self._data[key]
+            self._misses += 1
+            return False, None
+
+    def put(
+        self, key: Hashable, value: Any, generation: Optional[int] = None
+    ) -> None:
+        """
+        Add or update entry and evict least recently used entries.
+
+        Keyword arguments:
+        key -- key of the entry
+        value -- value of the entry
+
+        Optional arguments:
+        generation -- `generation` of the cache before value has been
+                      read; the entry is not added if the cache has
+                      been invalidated since
+                      (default None -> entry is always added)
+        """
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Remove entry if it exists.
+
+        Keyword arguments:
+        key -- key of the entry
+        """
+
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+            self._generation += 1
+
+    def info(self) -> CacheInfo:
+        """Returns statistics of the cache."""
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._maxsize, len(self._data)
+            )
@@ -0,0 +1,124 @@
+"""
+Definition of the compression stage for serialized Vinegar-payloads.
+
+Compressed payloads are prefixed by a header consisting of the magic
+bytes `MAGIC` and a single byte identifying the codec. Payloads without
+this header are passed through unchanged, i.e., uncompressed records
+remain readable.
+"""
+
+from typing import Callable, NamedTuple
+import zlib
+import lzma
+import bz2
+
+from .db_interface import Buffer
+
+
+# payloads generated by dill/pickle never start with this byte sequence
+MAGIC = b"\xfeVC"
+
+
+class Codec(NamedTuple):
+    """
+    A Codec defines a pair of functions for compression and
+    decompression of bytes-like objects.
+
+    Keyword arguments:
+    name -- name of the codec
+    id -- unique identifier (0-255) which is written to the header of
+          compressed payloads
+    compress -- compression function
+    decompress -- decompression function
+    """
+    name: str
+    id: int
+    compress: Callable[[Buffer], bytes]
+    decompress: Callable[[Buffer], bytes]
+
+
+CODECS: dict[str, Codec] = {}
+_CODECS_BY_ID: dict[int, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """
+    Register codec for use with Vinegar.
+
+    Keyword arguments:
+    codec -- Codec to be registered
+    """
+
+    if not 0 <= codec.id <= 255:
+        raise ValueError(f"Codec id has to be in 0-255 (got {codec.id}).")
+    if codec.id in _CODECS_BY_ID \
+            and _CODECS_BY_ID[codec.id].name != codec.name:
+        raise ValueError(
+            f"Codec id {codec.id} is already used by codec "
+            + f"'{_CODECS_BY_ID[codec.id].name}'."
+        )
+    CODECS[codec.name] = codec
+    _CODECS_BY_ID[codec.id] = codec
+
+
+def get_codec(codec: str | Codec) -> Codec:
+    """
+    Returns registered Codec by name.
+
+    Keyword arguments:
+    codec -- name of a registered codec or Codec
+    """
+
+    if isinstance(codec, Codec):
+        return codec
+    if codec not in CODECS:
+        raise ValueError(
+            f"Unknown codec '{codec}'. Available codecs: "
+            + ", ".join(CODECS)
+        )
+    return CODECS[codec]
+
+
+def compress(data: bytes, codec: Codec, threshold: int = 0) -> bytes:
+    """
+    Returns compressed data including header. If data is smaller than
+    threshold or compression does not reduce the size, data is returned
+    unchanged.
+
+    Keyword arguments:
+    data -- bytes-like object to be compressed
+    codec -- Codec used for compression
+
+    Optional arguments:
+    threshold -- minimum size of data in bytes for compression
+                 (default 0)
+    """
+
+    if len(data) < threshold:
+        return data
+    compressed = MAGIC + bytes((codec.id,)) + codec.compress(data)
+    if len(compressed) >= len(data):
+        return data
+    return compressed
+
+
+def decompress(data: Buffer) -> Buffer:
+    """
+    Returns decompressed data. If data does not have a header, data is
+    returned unchanged (i.e., without copying).
+
+    Keyword arguments:
+    data -- bytes-like object to be decompressed
+    """
+
+    if data[:len(MAGIC)] != MAGIC:
+        return data
+    codec_id = data[len(MAGIC)]
+    if codec_id not in _CODECS_BY_ID:
+        raise ValueError(f"Payload uses unknown codec id {codec_id}.")
+    return _CODECS_BY_ID[codec_id].decompress(data[len(MAGIC) + 1:])
+
+
+register_codec(Codec("zlib", 1, zlib.compress, zlib.decompress))
+register_codec(Codec("lzma", 2, lzma.compress, lzma.decompress))
+register_codec(Codec("bz2", 3, bz2.compress, bz2.decompress))
@@ -0,0 +1,202 @@
+"""
+Implementation of the vinegar-DBInterface for content-addressed storage
+of objs on top of another DBInterface.
+"""
+
+from typing import Optional, Mapping, Iterable, Iterator
+from collections import Counter
+import hashlib
+
+from . import (
+    DBInterface, DBRecord, Buffer, RecordMetadata, MetadataFilter
+)
+from .db_interface import select_tags
+
+
+class DedupDB(DBInterface):
+    """
+    Implementation of the vinegar-DBInterface that stores identical objs
+    only once.
+
+    Every obj is stored in the underlying db under a tag derived from
+    its sha256-digest (prefixed with `PAYLOAD_PREFIX`); the record of
+    the actual tag only holds the digest. References to the payloads are
+    counted such that a payload is removed along with the last tag
+    pointing to it. The reference counts are rebuilt from the underlying
+    db on instantiation; payloads that are left without reference (e.g.,
+    after an interrupted write) can be removed with `collect_garbage`.
+
+    The underlying db should not be used directly (or with a Vinegar
+    without this wrapper) since its records only contain digests.
+    Since the reference counts are only held in memory, a DedupDB must
+    not be shared between processes (or multiple DedupDB-instances
+    for the same underlying db); the resulting counts may remove
+    payloads that are still referenced.
+
+    Keyword arguments:
+    db -- underlying DBInterface
+    """
+
+    PAYLOAD_PREFIX = "__payload__/sha256/"
+
+    def __init__(self, db: DBInterface):
+        self._db = db
+        # tag -> digest of payload
+        self._references: dict[str, str] = {}
+        # digest -> number of tags referencing payload
+        self._counts: Counter[str] = Counter()
+        tags = [
+            tag for tag in self._db.tags()
+            if not tag.startswith(self.PAYLOAD_PREFIX)
+        ]
+        for record in self._db.find_many(tags):
+            if record is not None:
+                digest = bytes(record["obj"]).decode("ascii")
+                self._references[record["tag"]] = digest
+                self._counts[digest] += 1
+
+    @property
+    def supports_metadata(self) -> bool:
+        """Returns True if the underlying db supports metadata."""
+        return getattr(self._db, "supports_metadata", False)
+
+    @property
+    def payloads(self) -> int:
+        """Returns the number of distinct payloads."""
+        return len(self._counts)
+
+    def _payload_tag(self, digest: str) -> str:
+        return self.PAYLOAD_PREFIX + digest
+
+    def _validate_tag(self, tag: str) -> None:
+        if tag.startswith(self.PAYLOAD_PREFIX):
+            raise ValueError(
+                f"Tags starting with '{self.PAYLOAD_PREFIX}' are reserved."
+            )
+
+    def _release(self, digests: Iterable[str]) -> None:
+        """Drop one reference per digest and remove unused payloads."""
+        for digest in digests:
+            self._counts[digest] -= 1
+            if self._counts[digest] <= 0:
+                del self._counts[digest]
+                self._db.remove(self._payload_tag(digest))
+
+    def insert(self, obj: Buffer, tag: str) -> None:
+        self.insert_many({tag: obj})
+
+    def insert_many(self, objs: Mapping[str, Buffer]) -> None:
+        for tag in objs:
+            self._validate_tag(tag)
+        payloads = {}
+        pointers = {}
+        released = []
+        for tag, obj in objs.items():
+            digest = hashlib.sha256(obj).hexdigest()
+            previous = self._references.get(tag)
+            # the pointer is rewritten even if the payload is unchanged
+            # such that the metadata of tag are cleared like on insert
+            pointers[tag] = digest.encode("ascii")
+            if previous == digest:
+                continue
+            if self._counts[digest] == 0:
+                payloads[self._payload_tag(digest)] = obj
+            self._counts[digest] += 1
+            self._references[tag] = digest
+            if previous is not None:
+                released.append(previous)
+        # payloads are written before the tags that point to them
+        if payloads:
+            self._db.insert_many(payloads)
+        if pointers:
+            self._db.insert_many(pointers)
+        self._release(released)
+
+    def find(self, tag: str) -> Optional[DBRecord]:
+        if tag not in self._references:
+            return None
+        record = self._db.find(self._payload_tag(self._references[tag]))
+        if record is None:
+            return None
+        return {"tag": tag, "obj": record["obj"]}
+
+    def find_many(self, tags: Iterable[str]) -> list[Optional[DBRecord]]:
+        _tags = list(tags)
+        digests = {
+            self._references[tag] for tag in _tags
+            if tag in self._references
+        }
+        payloads = {
+            digest: record["obj"]
+            for digest, record in zip(
+                digests,
+                self._db.find_many(
+                    [self._payload_tag(digest) for digest in digests]
+                )
+            )
+            if record is not None
+        }
+        return [
+            {"tag": tag, "obj": payloads[self._references[tag]]}
+            if self._references.get(tag) in payloads else None
+            for tag in _tags
+        ]
+
+    def all(self) -> list[DBRecord]:
+        return [
+            record for record in self.find_many(self._references)
+            if record is not None
+        ]
+
+    def tags(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[str]:
+        return select_tags(self._references, prefix, start_after, limit)
+
+    def remove(self, tag: str) -> None:
+        digest = self._references.pop(tag, None)
+        if digest is None:
+            return
+        self._db.remove(tag)
+        self._release([digest])
+
+    def set_metadata(self, tag: str, metadata: RecordMetadata) -> None:
+        if tag in self._references:
+            self._db.set_metadata(tag, metadata)
+
+    def get_metadata(self, tag: str) -> Optional[RecordMetadata]:
+        if tag not in self._references:
+            return None
+        return self._db.get_metadata(tag)
+
+    def query(
+        self,
+        conditions: MetadataFilter,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[tuple[str, RecordMetadata]]:
+        # payload-records do not carry metadata
+        return self._db.query(conditions, prefix, start_after, limit)
+
+    def collect_garbage(self) -> int:
+        """
+        Remove payloads that are not referenced by any tag and return
+        their number.
+        """
+
+        orphans = [
+            tag for tag in self._db.tags(self.PAYLOAD_PREFIX)
+            if tag[len(self.PAYLOAD_PREFIX):] not in self._counts
+        ]
+        for tag in orphans:
+            self._db.remove(tag)
+        return len(orphans)
+
+    def close(self) -> None:
+        """Close the underlying db (if supported)."""
+        if hasattr(self._db, "close"):
+            self._db.close()
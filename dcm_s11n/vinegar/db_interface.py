@@ -2,15 +2,164 @@
 Definition of the interface for Vinegar db.
 """
 
-from typing import TypedDict, Optional
+from typing import (
+    TypedDict, NamedTuple, Optional, Mapping, Iterable, Iterator
+)
 import abc
+import bisect
+import itertools
+
+# bytes-like objects supporting the buffer protocol (e.g., bytes,
+# bytearray, memoryview, or mmap-slices as memoryview)
+Buffer = bytes | bytearray | memoryview
 
 class DBRecord(TypedDict):
     """
     DBRecords are structured as pairs of a tag and a bytes-like object.
+
+    The obj may be any object supporting the buffer protocol (see
+    Buffer); backends can return views on their storage (e.g., a
+    memoryview of a memory-mapped file) instead of copies. These views
+    are read-only and remain valid after the record has been updated or
+    removed.
     """
     tag: str
-    obj: bytes
+    obj: Buffer
+
+class RecordMetadata(TypedDict):
+    """
+    Metadata of a DBRecord that is generated by Vinegar on dump (see
+    `DBInterface.set_metadata`).
+
+    size -- size of the stored obj in bytes
+    created -- time of the first dump of the tag (seconds since epoch)
+    updated -- time of the latest dump of the tag (seconds since epoch)
+    protocol -- pickle protocol used for serialization
+    hash -- sha256 hex-digest of the serialized (uncompressed) object
+    type -- qualified name of the type of the serialized object
+    labels -- user-defined labels
+    """
+    size: int
+    created: float
+    updated: float
+    protocol: int
+    hash: str
+    type: str
+    labels: dict[str, str]
+
+class MetadataFilter(NamedTuple):
+    """
+    Conditions on RecordMetadata that are used with `DBInterface.query`.
+    Conditions that are None are ignored; all other conditions have to
+    be met.
+
+    Optional arguments:
+    type -- qualified type name
+            (default None)
+    labels -- labels that have to be set to the given values
+              (default None)
+    hash -- content hash
+            (default None)
+    min_size -- minimum size in bytes
+                (default None)
+    max_size -- maximum size in bytes
+                (default None)
+    created_after -- lower (exclusive) bound for creation time
+                     (default None)
+    created_before -- upper (exclusive) bound for creation time
+                      (default None)
+    updated_after -- lower (exclusive) bound for time of last update
+                     (default None)
+    updated_before -- upper (exclusive) bound for time of last update
+                      (default None)
+    """
+    type: Optional[str] = None
+    labels: Optional[Mapping[str, str]] = None
+    hash: Optional[str] = None
+    min_size: Optional[int] = None
+    max_size: Optional[int] = None
+    created_after: Optional[float] = None
+    created_before: Optional[float] = None
+    updated_after: Optional[float] = None
+    updated_before: Optional[float] = None
+
+    def matches(self, metadata: RecordMetadata) -> bool:
+        """
+        Returns True if metadata meets all conditions.
+
+        Keyword arguments:
+        metadata -- metadata to be tested
+        """
+
+        return (
+            (self.type is None or metadata["type"] == self.type)
+            and (
+                self.labels is None
+                or all(
+                    metadata["labels"].get(key) == value
+                    for key, value in self.labels.items()
+                )
+            )
+            and (self.hash is None or metadata["hash"] == self.hash)
+            and (self.min_size is None or metadata["size"] >= self.min_size)
+            and (self.max_size is None or metadata["size"] <= self.max_size)
+            and (
+                self.created_after is None
+                or metadata["created"] > self.created_after
+            )
+            and (
+                self.created_before is None
+                or metadata["created"] < self.created_before
+            )
+            and (
+                self.updated_after is None
+                or metadata["updated"] > self.updated_after
+            )
+            and (
+                self.updated_before is None
+                or metadata["updated"] < self.updated_before
+            )
+        )
+
+def select_tags(
+    tags: Iterable[str],
+    prefix: str = "",
+    start_after: Optional[str] = None,
+    limit: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Returns iterator over the sorted tags that start with prefix and
+    come after start_after (at most limit tags).
+
+    Keyword arguments:
+    tags -- unsorted collection of tags
+
+    Optional arguments:
+    prefix -- only tags starting with this prefix are selected
+              (default "")
+    start_after -- only tags that are lexicographically greater are
+                   selected; used to continue from the last tag of the
+                   previous page
+                   (default None)
+    limit -- maximum number of tags
+             (default None -> no limit)
+    """
+
+    _tags = sorted(tags)
+    start = bisect.bisect_left(_tags, prefix)
+    if start_after is not None:
+        start = max(start, bisect.bisect_right(_tags, start_after))
+    end = len(_tags) if limit is None else min(len(_tags), start + limit)
+    for i in range(start, end):
+        if not _tags[i].startswith(prefix):
+            break
+        yield _tags[i]
+
+class VersionConflictError(Exception):
+    """
+    Raised if a record is changed concurrently, i.e., it does not have
+    the expected version anymore.
+    """
 
 class DBInterface(metaclass=abc.ABCMeta):
     """
@@ -18,12 +167,37 @@ class DBInterface(metaclass=abc.ABCMeta):
     for use with vinegar.
 
     Required methods are:
-    insert(obj: bytes, tag: str) -- add/update DBRecord with keyword tag
+    insert(obj: Buffer, tag: str) -- add/update DBRecord with keyword tag
     find(tag: str) -- return DBRecord filed with tag or None
     all() -- return list of all DBRecord
     remove(tag: str) -- remove DBRecord with keyword tag if it exists
+
+    Optional methods (default implementations loop over the methods
+    above; backends should override these if they support a more
+    efficient batch-operation):
+    insert_many(objs: Mapping[str, Buffer]) -- add/update multiple
+                                               DBRecords
+    find_many(tags: Iterable[str]) -- return list of DBRecord or None
+    tags(prefix, start_after, limit) -- return iterator over sorted tags
+    iterate(prefix, start_after, limit) -- return iterator over
+                                           DBRecords sorted by tag
+
+    Backends that store RecordMetadata set `supports_metadata` and
+    implement the methods
+    set_metadata(tag: str, metadata: RecordMetadata) -- attach metadata
+                                                       to DBRecord
+    get_metadata(tag: str) -- return RecordMetadata or None
+    query(conditions, prefix, start_after, limit) -- return iterator
+        over pairs of tag and RecordMetadata that meet conditions
+    Metadata are discarded by `insert` and `remove`, i.e., they always
+    refer to the current obj of a record.
+
+    Backends that support atomic sequences of operations implement
+    transaction() -- return context manager for atomic operations
     """
 
+    supports_metadata = False
+
     # setup requirements for an object to be regarded as implementing
     # the DBInterface
     @classmethod
@@ -41,11 +215,14 @@ class DBInterface(metaclass=abc.ABCMeta):
         )
 
     @abc.abstractmethod
-    def insert(self, obj: bytes, tag: str) -> None:
+    def insert(self, obj: Buffer, tag: str) -> None:
         """
         Add new obj to db under the keyword tag; Update record if tag
         already exists.
 
+        The caller must not modify obj afterwards (backends may keep a
+        reference instead of a copy).
+
         Keyword arguments:
         obj -- bytes-like object to be stored in db
         tag -- name tag for this object
@@ -94,3 +271,136 @@ class DBInterface(metaclass=abc.ABCMeta):
             f"Class {self.__class__.__name__} does not define method "\
                 "self.remove"
         )
+
+    def insert_many(self, objs: Mapping[str, Buffer]) -> None:
+        """
+        Add multiple objs to db; Update records if tags already exist.
+
+        Keyword arguments:
+        objs -- mapping of name tags and bytes-like objects to be stored
+                in db
+        """
+
+        for tag, obj in objs.items():
+            self.insert(obj, tag)
+
+    def find_many(self, tags: Iterable[str]) -> list[Optional[DBRecord]]:
+        """
+        Find and return list of DBRecord obj or None (one element for
+        every tag in tags).
+
+        Keyword arguments:
+        tags -- name tags for requested DBRecords
+        """
+
+        return [self.find(tag) for tag in tags]
+
+    def tags(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Returns iterator over tags in lexicographic order.
+
+        Optional arguments:
+        prefix -- only tags starting with this prefix are returned
+                  (default "")
+        start_after -- only tags that are lexicographically greater are
+                       returned; used for pagination
+                       (default None)
+        limit -- maximum number of tags
+                 (default None -> no limit)
+        """
+
+        return select_tags(
+            (record["tag"] for record in self.all()),
+            prefix, start_after, limit
+        )
+
+    def iterate(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[DBRecord]:
+        """
+        Returns iterator over DBRecords in lexicographic order of their
+        tags; objs are fetched lazily while iterating.
+
+        Optional arguments:
+        prefix -- only records with tags starting with this prefix are
+                  returned
+                  (default "")
+        start_after -- only records with tags that are lexicographically
+                       greater are returned; used for pagination
+                       (default None)
+        limit -- maximum number of records
+                 (default None -> no limit)
+        """
+
+        for tag in self.tags(prefix, start_after, limit):
+            record = self.find(tag)
+            if record is not None:
+                yield record
+
+    def set_metadata(self, tag: str, metadata: RecordMetadata) -> None:
+        """
+        Attach metadata to the DBRecord with keyword tag; replaces
+        existing metadata. Has no effect if there is no such DBRecord.
+
+        Keyword arguments:
+        tag -- name tag of the DBRecord
+        metadata -- metadata of the DBRecord
+        """
+
+        raise NotImplementedError(
+            f"Class {self.__class__.__name__} does not support metadata."
+        )
+
+    def get_metadata(self, tag: str) -> Optional[RecordMetadata]:
+        """
+        Returns metadata of the DBRecord with keyword tag or None.
+
+        Keyword arguments:
+        tag -- name tag of the DBRecord
+        """
+
+        return None
+
+    def query(
+        self,
+        conditions: MetadataFilter,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[tuple[str, RecordMetadata]]:
+        """
+        Returns iterator over pairs of tag and metadata (in
+        lexicographic order of tags) for all DBRecords whose metadata
+        meet the given conditions. DBRecords without metadata are
+        skipped.
+
+        Keyword arguments:
+        conditions -- conditions on the metadata
+
+        Optional arguments:
+        prefix -- only tags starting with this prefix are returned
+                  (default "")
+        start_after -- only tags that are lexicographically greater are
+                       returned; used for pagination
+                       (default None)
+        limit -- maximum number of results
+                 (default None -> no limit)
+        """
+
+        return itertools.islice(
+            (
+                (tag, metadata)
+                for tag in self.tags(prefix, start_after)
+                if (metadata := self.get_metadata(tag)) is not None
+                and conditions.matches(metadata)
+            ),
+            limit
+        )
@@ -0,0 +1,273 @@
+"""
+Implementation of the vinegar-DBInterface that guards another
+DBInterface with a reader-writer lock (optionally shared across
+processes via file locks).
+"""
+
+from typing import Optional, Mapping, Iterable, Iterator
+from pathlib import Path
+from collections import Counter
+from contextlib import contextmanager
+import os
+import threading
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from . import (
+    DBInterface, DBRecord, Buffer, RecordMetadata, MetadataFilter
+)
+
+
+class ReadWriteLock():
+    """
+    Reader-writer lock for threads which can additionally be shared
+    across processes by means of `fcntl.flock` on a lock-file.
+
+    Any number of readers or a single writer can hold the lock at a
+    time; waiting writers take precedence over new readers. The lock is
+    reentrant, i.e., a thread holding the write-lock may acquire the
+    read- or write-lock again. Upgrading a read-lock raises a
+    RuntimeError.
+
+    Optional arguments:
+    path -- pathlib-Path of the lock-file; if None, the lock only works
+            within the current process
+            (default None)
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self._condition = threading.Condition()
+        self._readers: Counter[int] = Counter()
+        self._writer: Optional[int] = None
+        self._depth = 0
+        self._waiting_writers = 0
+        # whether the first reader is acquiring the shared file lock
+        self._locking = False
+        self._path = path
+        # the lock-file is opened per process (see _flock)
+        self._file = None
+        self._pid: Optional[int] = None
+        if path is not None:
+            if fcntl is None:
+                raise OSError("File locks are not supported on this system.")
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _flock(self, operation: str) -> None:
+        """
+        Apply operation ("LOCK_SH", "LOCK_EX", or "LOCK_UN") to the
+        lock-file (if any).
+
+        The lock-file is opened lazily by every process: processes that
+        are forked afterwards would otherwise share the open file
+        description and thereby the lock. Only a single thread calls
+        this method at a time.
+        """
+        if self._path is None:
+            return
+        if self._pid != os.getpid():
+            if self._file is not None:
+                self._file.close()
+            self._file = open(  # pylint: disable=consider-using-with
+                self._path, "a+b"
+            )
+            self._pid = os.getpid()
+        fcntl.flock(self._file.fileno(), getattr(fcntl, operation))
+
+    def _release_read(self, thread: int) -> None:
+        """Release read-lock of thread (with the condition held)."""
+        self._readers[thread] -= 1
+        if not self._readers[thread]:
+            del self._readers[thread]
+        if not self._readers:
+            self._flock("LOCK_UN")
+            self._condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        """Context manager that holds the read-lock."""
+        thread = threading.get_ident()
+        first = False
+        with self._condition:
+            nested = self._writer == thread
+            if nested:
+                self._depth += 1
+            else:
+                if not self._readers[thread]:
+                    while self._writer is not None or self._waiting_writers \
+                            or self._locking:
+                        self._condition.wait()
+                    first = not self._readers
+                    self._locking = first
+                self._readers[thread] += 1
+        if first:
+            # the file lock is acquired without holding the condition
+            # such that other threads are not blocked meanwhile
+            try:
+                self._flock("LOCK_SH")
+            except BaseException:
+                with self._condition:
+                    self._locking = False
+                    self._release_read(thread)
+                raise
+            with self._condition:
+                self._locking = False
+                self._condition.notify_all()
+        try:
+            yield
+        finally:
+            with self._condition:
+                if nested:
+                    self._depth -= 1
+                else:
+                    self._release_read(thread)
+
+    def _release_write(self) -> None:
+        """Release write-lock (with the condition held)."""
+        self._depth -= 1
+        if self._depth == 0:
+            self._flock("LOCK_UN")
+            self._writer = None
+            self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """Context manager that holds the write-lock."""
+        thread = threading.get_ident()
+        first = False
+        with self._condition:
+            if self._writer != thread:
+                if self._readers[thread]:
+                    raise RuntimeError(
+                        "Cannot upgrade a read-lock to a write-lock."
+                    )
+                self._waiting_writers += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._condition.wait()
+                finally:
+                    self._waiting_writers -= 1
+                self._writer = thread
+                first = True
+            self._depth += 1
+        if first:
+            # see read
+            try:
+                self._flock("LOCK_EX")
+            except BaseException:
+                with self._condition:
+                    self._release_write()
+                raise
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._release_write()
+
+    def close(self) -> None:
+        """Close the lock-file (if opened by the current process)."""
+        if self._file is not None and self._pid == os.getpid():
+            self._file.close()
+            self._file = None
+            self._pid = None
+
+
+class LockedDB(DBInterface):
+    """
+    Implementation of the vinegar-DBInterface that makes another
+    DBInterface safe for concurrent use.
+
+    Reading operations hold a shared lock and writing operations an
+    exclusive lock. If a lock_path is given, the lock is also shared
+    between processes (POSIX only). This is only sufficient for backends
+    that re-read their storage on every operation (e.g., the
+    TinyDBInterface or SQLiteDB); the in-memory indices of LogDB and
+    DedupDB are not synchronized between processes.
+
+    Sequences of operations (e.g., read-modify-write) can be performed
+    atomically within `transaction`.
+
+    Keyword arguments:
+    db -- underlying DBInterface
+
+    Optional arguments:
+    lock_path -- pathlib-Path of the lock-file
+                 (default None -> lock within the current process only)
+    """
+
+    def __init__(self, db: DBInterface, lock_path: Optional[Path] = None):
+        self._db = db
+        self._lock = ReadWriteLock(lock_path)
+
+    @property
+    def supports_metadata(self) -> bool:
+        """Returns True if the underlying db supports metadata."""
+        return getattr(self._db, "supports_metadata", False)
+
+    def transaction(self):
+        """
+        Returns context manager which holds the exclusive lock such that
+        multiple operations are performed atomically.
+        """
+        return self._lock.write()
+
+    def insert(self, obj: Buffer, tag: str) -> None:
+        with self._lock.write():
+            self._db.insert(obj, tag)
+
+    def insert_many(self, objs: Mapping[str, Buffer]) -> None:
+        with self._lock.write():
+            self._db.insert_many(objs)
+
+    def find(self, tag: str) -> Optional[DBRecord]:
+        with self._lock.read():
+            return self._db.find(tag)
+
+    def find_many(self, tags: Iterable[str]) -> list[Optional[DBRecord]]:
+        with self._lock.read():
+            return self._db.find_many(tags)
+
+    def all(self) -> list[DBRecord]:
+        with self._lock.read():
+            return self._db.all()
+
+    def tags(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[str]:
+        # the lock is not held while the iterator is suspended
+        with self._lock.read():
+            return iter(list(self._db.tags(prefix, start_after, limit)))
+
+    def remove(self, tag: str) -> None:
+        with self._lock.write():
+            self._db.remove(tag)
+
+    def set_metadata(self, tag: str, metadata: RecordMetadata) -> None:
+        with self._lock.write():
+            self._db.set_metadata(tag, metadata)
+
+    def get_metadata(self, tag: str) -> Optional[RecordMetadata]:
+        with self._lock.read():
+            return self._db.get_metadata(tag)
+
+    def query(
+        self,
+        conditions: MetadataFilter,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[tuple[str, RecordMetadata]]:
+        with self._lock.read():
+            return iter(
+                list(self._db.query(conditions, prefix, start_after, limit))
+            )
+
+    def close(self) -> None:
+        """Close the lock-file and the underlying db (if supported)."""
+        self._lock.close()
+        if hasattr(self._db, "close"):
+            self._db.close()
@@ -0,0 +1,283 @@
+"""
+Implementation of the vinegar-DBInterface for a file-based db using an
+append-only log and an in-memory index.
+"""
+
+from typing import Optional, Mapping, Iterator
+from pathlib import Path
+import os
+import mmap
+import struct
+import json
+
+from . import DBInterface, DBRecord, Buffer, RecordMetadata
+from .db_interface import select_tags
+
+
+class LogDB(DBInterface):
+    """
+    Implementation of the vinegar-DBInterface for a file-based db using
+    an append-only log.
+
+    Every call to `insert` or `remove` appends a single entry to the
+    log-file; previous versions of a record are only dropped by calling
+    `compact`. An in-memory index maps tags to the location of their
+    latest version in the log-file. The index is rebuilt by a single
+    sequential read of the log-file on instantiation.
+
+    Records are read via a memory-map of the log-file, i.e., `find` and
+    `all` return read-only memoryviews of the mapped file instead of
+    copies. Since the log is append-only (and `compact` replaces the
+    file), these views remain valid after the record has been changed.
+
+    Metadata are written as separate log-entries (JSON) and are kept
+    in memory alongside the index.
+
+    Keyword arguments:
+    path -- pathlib-Path of the log-file
+    """
+
+    # entry header: flag, tag length, obj length
+    _HEADER = struct.Struct("<BII")
+    _FLAG_RECORD = 0
+    _FLAG_TOMBSTONE = 1
+    _FLAG_METADATA = 2
+
+    supports_metadata = True
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        # index of tag -> (obj offset, obj length)
+        self._index: dict[str, tuple[int, int]] = {}
+        # metadata index of tag -> (metadata, length of log-entry obj)
+        self._metadata: dict[str, tuple[RecordMetadata, int]] = {}
+        # total number of bytes occupied by outdated entries (including
+        # their headers and tags, tombstones, and superseded metadata)
+        self._garbage = 0
+        self._file = open(  # pylint: disable=consider-using-with
+            self._path, "a+b"
+        )
+        # read-only memory-map of the log-file (remapped once the file
+        # has grown beyond its size)
+        self._mmap: Optional[mmap.mmap] = None
+        self._view = memoryview(b"")
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """
+        Build index from log-file; a trailing incomplete entry (e.g.,
+        from an interrupted write) is truncated.
+        """
+
+        size = os.fstat(self._file.fileno()).st_size
+        self._file.seek(0)
+        offset = 0
+        while True:
+            header = self._file.read(self._HEADER.size)
+            if len(header) < self._HEADER.size:
+                break
+            flag, tag_length, obj_length = self._HEADER.unpack(header)
+            tag = self._file.read(tag_length)
+            if len(tag) < tag_length:
+                break
+            obj_offset = offset + self._HEADER.size + tag_length
+            end = obj_offset + obj_length
+            if end > size:
+                break
+            if flag == self._FLAG_METADATA:
+                obj = self._file.read(obj_length)
+            else:
+                obj = None
+                self._file.seek(end)
+            self._index_entry(
+                flag, tag.decode("utf-8"), obj_offset, obj_length, obj
+            )
+            offset = end
+        if offset < size:
+            self._file.truncate(offset)
+        self._file.seek(0, os.SEEK_END)
+
+    def _index_entry(
+        self,
+        flag: int,
+        tag: str,
+        obj_offset: int,
+        obj_length: int,
+        obj: Optional[Buffer] = None
+    ) -> None:
+        """
+        Update index for a single log-entry (obj is only required for
+        metadata-entries).
+        """
+        previous_metadata = self._metadata.pop(tag, None)
+        if previous_metadata is not None:
+            self._garbage += self._entry_size(tag, previous_metadata[1])
+        if flag == self._FLAG_METADATA:
+            if tag in self._index:
+                self._metadata[tag] = (json.loads(bytes(obj)), obj_length)
+            else:
+                self._garbage += self._entry_size(tag, obj_length)
+            return
+        previous = self._index.pop(tag, None)
+        if previous is not None:
+            self._garbage += self._entry_size(tag, previous[1])
+        if flag == self._FLAG_RECORD:
+            self._index[tag] = (obj_offset, obj_length)
+        else:
+            # tombstones are outdated right away
+            self._garbage += self._entry_size(tag, obj_length)
+
+    def _entry_size(self, tag: str, obj_length: int) -> int:
+        """Returns size of a log-entry (header, tag, and obj) in bytes."""
+        return self._HEADER.size + len(tag.encode("utf-8")) + obj_length
+
+    def _append(self, entries: list[tuple[int, str, Buffer]]) -> None:
+        """
+        Append entries (flag, tag, obj) to the log-file with a single
+        write and update index.
+        """
+        offset = self._file.seek(0, os.SEEK_END)
+        chunks = []
+        for flag, tag, obj in entries:
+            _tag = tag.encode("utf-8")
+            _obj = memoryview(obj).cast("B")
+            chunks.append(self._HEADER.pack(flag, len(_tag), len(_obj)))
+            chunks.append(_tag)
+            chunks.append(_obj)
+            self._index_entry(
+                flag, tag, offset + self._HEADER.size + len(_tag), len(_obj),
+                _obj
+            )
+            offset += self._HEADER.size + len(_tag) + len(_obj)
+        self._file.writelines(chunks)
+        self._file.flush()
+
+    def _read(self, obj_offset: int, obj_length: int) -> memoryview:
+        """
+        Returns read-only view of obj_length bytes at obj_offset of the
+        log-file.
+        """
+        end = obj_offset + obj_length
+        if end > len(self._view):
+            # map the current file; previous maps are released once
+            # all views have been released
+            self._view = memoryview(b"")
+            self._mmap = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+            self._view = memoryview(self._mmap)
+        return self._view[obj_offset:end]
+
+    def insert(self, obj: Buffer, tag: str) -> None:
+        self._append([(self._FLAG_RECORD, tag, obj)])
+
+    def insert_many(self, objs: Mapping[str, Buffer]) -> None:
+        self._append(
+            [(self._FLAG_RECORD, tag, obj) for tag, obj in objs.items()]
+        )
+
+    def find(self, tag: str) -> Optional[DBRecord]:
+        if tag not in self._index:
+            return None
+        return {"tag": tag, "obj": self._read(*self._index[tag])}
+
+    def all(self) -> list[DBRecord]:
+        return [self.find(tag) for tag in list(self._index)]
+
+    def tags(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[str]:
+        return select_tags(list(self._index), prefix, start_after, limit)
+
+    def set_metadata(self, tag: str, metadata: RecordMetadata) -> None:
+        if tag in self._index:
+            self._append(
+                [
+                    (
+                        self._FLAG_METADATA, tag,
+                        json.dumps(metadata).encode("utf-8")
+                    )
+                ]
+            )
+
+    def get_metadata(self, tag: str) -> Optional[RecordMetadata]:
+        if tag not in self._metadata:
+            return None
+        return self._metadata[tag][0]
+
+    def remove(self, tag: str) -> None:
+        if tag in self._index:
+            self._append([(self._FLAG_TOMBSTONE, tag, b"")])
+
+    @property
+    def garbage(self) -> int:
+        """
+        Returns the number of bytes in the log-file that are occupied by
+        outdated entries (including headers, tags, tombstones, and
+        superseded metadata) and can be reclaimed with `compact`.
+        """
+        return self._garbage
+
+    def compact(self) -> None:
+        """
+        Rewrite the log-file such that it only contains the latest
+        version of every record (and its metadata).
+
+        The compacted log is written to a temporary file first which
+        then replaces the original file.
+        """
+
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        index = {}
+        with open(tmp_path, "wb") as tmp_file:
+            offset = 0
+            for tag, (obj_offset, obj_length) in self._index.items():
+                obj = self._read(obj_offset, obj_length)
+                _tag = tag.encode("utf-8")
+                tmp_file.write(
+                    self._HEADER.pack(self._FLAG_RECORD, len(_tag), len(obj))
+                    + _tag
+                )
+                tmp_file.write(obj)
+                index[tag] = (offset + self._HEADER.size + len(_tag), len(obj))
+                offset += self._HEADER.size + len(_tag) + len(obj)
+                if tag in self._metadata:
+                    _metadata = json.dumps(self._metadata[tag][0]).encode(
+                        "utf-8"
+                    )
+                    tmp_file.write(
+                        self._HEADER.pack(
+                            self._FLAG_METADATA, len(_tag), len(_metadata)
+                        )
+                        + _tag
+                        + _metadata
+                    )
+                    offset += self._HEADER.size + len(_tag) + len(_metadata)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        self._release_map()
+        self._file.close()
+        os.replace(tmp_path, self._path)
+        self._file = open(  # pylint: disable=consider-using-with
+            self._path, "a+b"
+        )
+        self._index = index
+        self._garbage = 0
+
+    def _release_map(self) -> None:
+        """
+        Drop the memory-map; it is closed once all views returned by
+        `find` or `all` have been released.
+        """
+        self._view.release()
+        self._view = memoryview(b"")
+        self._mmap = None
+
+    def close(self) -> None:
+        """Close the underlying log-file."""
+        self._release_map()
+        self._file.close()
@@ -2,20 +2,33 @@
 Implementation of the vinegar-DBInterface for a memory-based db.
 """
 
-from typing import Optional
+from typing import Optional, Mapping, Iterator
 
-from . import DBInterface, DBRecord
+from . import DBInterface, DBRecord, Buffer, RecordMetadata
+from .db_interface import select_tags
 
 
 class MemoryDB(DBInterface):
     """
     Implementation of the vinegar-DBInterface for a memory-based db.
+
+    Inserted objects are stored by reference (without copying).
     """
+
+    supports_metadata = True
+
     def __init__(self):
         self._db = {}
+        self._metadata: dict[str, RecordMetadata] = {}
 
-    def insert(self, obj: bytes, tag: str) -> None:
+    def insert(self, obj: Buffer, tag: str) -> None:
         self._db[tag] = obj
+        self._metadata.pop(tag, None)
+
+    def insert_many(self, objs: Mapping[str, Buffer]) -> None:
+        self._db.update(objs)
+        for tag in objs:
+            self._metadata.pop(tag, None)
 
     def find(self, tag: str) -> Optional[DBRecord]:
         if tag in self._db:
@@ -25,6 +38,22 @@ class MemoryDB(DBInterface):
     def all(self) -> list[DBRecord]:
         return [{"tag": key, "obj": value} for key, value in self._db.items()]
 
+    def tags(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[str]:
+        return select_tags(self._db, prefix, start_after, limit)
+
+    def set_metadata(self, tag: str, metadata: RecordMetadata) -> None:
+        if tag in self._db:
+            self._metadata[tag] = metadata
+
+    def get_metadata(self, tag: str) -> Optional[RecordMetadata]:
+        return self._metadata.get(tag)
+
     def remove(self, tag: str) -> None:
         if tag in self._db:
             del self._db[tag]
+        self._metadata.pop(tag, None)
@@ -0,0 +1,368 @@
+"""
+Implementation of the vinegar-DBInterface based on the sqlite3-library.
+"""
+
+from typing import Optional, Mapping, Iterable, Iterator
+from pathlib import Path
+import sqlite3
+import threading
+import weakref
+
+from . import (
+    DBInterface, DBRecord, Buffer, RecordMetadata, MetadataFilter
+)
+
+
+class _ThreadConnection():
+    """
+    Holds the connection of a single thread; the connection is closed
+    once the holder is collected, i.e., after the thread has ended.
+    """
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+        weakref.finalize(self, connection.close)
+
+
+class SQLiteDB(DBInterface):
+    """
+    Implementation of the vinegar-DBInterface based on the sqlite3-
+    library.
+
+    The database is operated in write-ahead-logging (WAL) mode. This
+    allows multiple processes to read from the same database file while
+    another process is writing.
+
+    Objects of any buffer-type are accepted by `insert`; `find` and
+    `all` return the BLOBs as bytes.
+
+    Every thread uses a separate connection to the database file such
+    that a SQLiteDB can be shared between threads. A connection is
+    closed once its thread has ended; `close` closes the connections of
+    all threads.
+
+    Metadata are stored in separate tables with indices on all fields
+    (and labels) such that `query` is answered by the database.
+
+    Keyword arguments:
+    path -- pathlib-Path of the database file
+
+    Optional arguments:
+    timeout -- time in seconds that a connection waits for a lock to be
+               released before raising an error
+               (default 30.0)
+    """
+
+    # lower limit for SQLITE_MAX_VARIABLE_NUMBER in older sqlite-versions
+    _MAX_PARAMETERS = 999
+    # number of rows that are fetched per query by `tags` and `iterate`
+    _PAGE_SIZE = 100
+    # columns of the metadata-table (besides tag)
+    _METADATA_COLUMNS = (
+        "size", "created", "updated", "protocol", "hash", "type"
+    )
+
+    supports_metadata = True
+
+    def __init__(self, path: Path, timeout: float = 30.0):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._path = path
+        self._timeout = timeout
+        # every thread uses its own connection; the connections of
+        # running threads are tracked such that `close` can close them
+        self._local = threading.local()
+        self._connections: weakref.WeakSet[_ThreadConnection] = \
+            weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                + "tag TEXT PRIMARY KEY, obj BLOB NOT NULL"
+                + ") WITHOUT ROWID"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                + "tag TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                + "created REAL NOT NULL, updated REAL NOT NULL, "
+                + "protocol INTEGER NOT NULL, hash TEXT NOT NULL, "
+                + "type TEXT NOT NULL"
+                + ") WITHOUT ROWID"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS labels ("
+                + "tag TEXT NOT NULL, key TEXT NOT NULL, "
+                + "value TEXT NOT NULL, PRIMARY KEY (tag, key)"
+                + ") WITHOUT ROWID"
+            )
+            for column in ("size", "created", "updated", "hash", "type"):
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS metadata_{column} "
+                    + f"ON metadata ({column})"
+                )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS labels_key_value "
+                + "ON labels (key, value)"
+            )
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns the connection of the current thread (opened on first
+        use).
+        """
+        holder = getattr(self._local, "connection", None)
+        if holder is None:
+            with self._lock:
+                if self._closed:
+                    raise sqlite3.ProgrammingError(
+                        "Cannot operate on a closed database."
+                    )
+                # connections are only used by the thread that opened
+                # them; check_same_thread is disabled for `close`
+                connection = sqlite3.connect(
+                    str(self._path), timeout=self._timeout,
+                    check_same_thread=False
+                )
+                connection.execute("PRAGMA synchronous=NORMAL")
+                holder = _ThreadConnection(connection)
+                self._connections.add(holder)
+            self._local.connection = holder
+        return holder.connection
+
+    def _delete_metadata(self, tags: Iterable[str]) -> None:
+        """Delete metadata for tags (within the current transaction)."""
+        _tags = [(tag,) for tag in tags]
+        self._connection.executemany(
+            "DELETE FROM metadata WHERE tag = ?", _tags
+        )
+        self._connection.executemany(
+            "DELETE FROM labels WHERE tag = ?", _tags
+        )
+
+    def insert(self, obj: Buffer, tag: str) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO records (tag, obj) VALUES (?, ?) "
+                + "ON CONFLICT(tag) DO UPDATE SET obj = excluded.obj",
+                (tag, obj)
+            )
+            self._delete_metadata([tag])
+
+    def insert_many(self, objs: Mapping[str, Buffer]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO records (tag, obj) VALUES (?, ?) "
+                + "ON CONFLICT(tag) DO UPDATE SET obj = excluded.obj",
+                ((tag, obj) for tag, obj in objs.items())
+            )
+            self._delete_metadata(objs)
+
+    def find(self, tag: str) -> Optional[DBRecord]:
+        row = self._connection.execute(
+            "SELECT obj FROM records WHERE tag = ?", (tag,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"tag": tag, "obj": row[0]}
+
+    def find_many(self, tags: Iterable[str]) -> list[Optional[DBRecord]]:
+        _tags = list(tags)
+        objs = {}
+        # query in chunks to respect the limit on the number of
+        # host parameters in a single statement
+        for i in range(0, len(_tags), self._MAX_PARAMETERS):
+            chunk = _tags[i:i + self._MAX_PARAMETERS]
+            objs.update(
+                self._connection.execute(
+                    "SELECT tag, obj FROM records WHERE tag IN ("
+                    + ", ".join("?" * len(chunk))
+                    + ")",
+                    chunk
+                )
+            )
+        return [
+            {"tag": tag, "obj": objs[tag]} if tag in objs else None
+            for tag in _tags
+        ]
+
+    def all(self) -> list[DBRecord]:
+        return [
+            {"tag": tag, "obj": obj}
+            for tag, obj in self._connection.execute(
+                "SELECT tag, obj FROM records"
+            )
+        ]
+
+    @staticmethod
+    def _prefix_end(prefix: str) -> Optional[str]:
+        """
+        Returns the smallest string that is greater than all strings
+        starting with prefix or None if there is no such string.
+        """
+        _prefix = prefix.rstrip(chr(0x10FFFF))
+        if not _prefix:
+            return None
+        return _prefix[:-1] + chr(ord(_prefix[-1]) + 1)
+
+    def _select_pages(
+        self,
+        columns: str,
+        prefix: str,
+        start_after: Optional[str],
+        limit: Optional[int],
+        table: str = "records",
+        conditions: Optional[list[str]] = None,
+        parameters: Optional[list] = None
+    ) -> Iterator[tuple]:
+        """
+        Returns iterator over rows (in order of tags) that are fetched
+        in pages of `_PAGE_SIZE` rows. Every page is selected by a range
+        query on the primary key such that no cursor remains open while
+        the iterator is suspended. The first column has to be the tag.
+        """
+
+        conditions = ["tag >= ?"] + (conditions or [])
+        parameters = [prefix] + (parameters or [])
+        end = self._prefix_end(prefix)
+        if end is not None:
+            conditions.append("tag < ?")
+            parameters.append(end)
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = (
+                self._PAGE_SIZE if remaining is None
+                else min(self._PAGE_SIZE, remaining)
+            )
+            rows = self._connection.execute(
+                f"SELECT {columns} FROM {table} WHERE "
+                + " AND ".join(
+                    conditions
+                    + ([] if start_after is None else ["tag > ?"])
+                )
+                + " ORDER BY tag LIMIT ?",
+                parameters
+                + ([] if start_after is None else [start_after])
+                + [page_size]
+            ).fetchall()
+            yield from rows
+            if len(rows) < page_size:
+                break
+            start_after = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def tags(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[str]:
+        for row in self._select_pages("tag", prefix, start_after, limit):
+            yield row[0]
+
+    def iterate(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[DBRecord]:
+        for tag, obj in self._select_pages(
+            "tag, obj", prefix, start_after, limit
+        ):
+            yield {"tag": tag, "obj": obj}
+
+    def set_metadata(self, tag: str, metadata: RecordMetadata) -> None:
+        with self._connection:
+            if self._connection.execute(
+                "SELECT 1 FROM records WHERE tag = ?", (tag,)
+            ).fetchone() is None:
+                return
+            self._delete_metadata([tag])
+            self._connection.execute(
+                "INSERT INTO metadata (tag, "
+                + ", ".join(self._METADATA_COLUMNS)
+                + ") VALUES (?, "
+                + ", ".join("?" * len(self._METADATA_COLUMNS))
+                + ")",
+                [tag] + [metadata[c] for c in self._METADATA_COLUMNS]
+            )
+            self._connection.executemany(
+                "INSERT INTO labels (tag, key, value) VALUES (?, ?, ?)",
+                (
+                    (tag, key, value)
+                    for key, value in metadata["labels"].items()
+                )
+            )
+
+    def _metadata_from_row(self, row: tuple) -> RecordMetadata:
+        """
+        Returns metadata from row of metadata-table (tag followed by
+        `_METADATA_COLUMNS`).
+        """
+        metadata = dict(zip(self._METADATA_COLUMNS, row[1:]))
+        metadata["labels"] = dict(
+            self._connection.execute(
+                "SELECT key, value FROM labels WHERE tag = ?", (row[0],)
+            )
+        )
+        return metadata
+
+    def get_metadata(self, tag: str) -> Optional[RecordMetadata]:
+        row = self._connection.execute(
+            "SELECT tag, "
+            + ", ".join(self._METADATA_COLUMNS)
+            + " FROM metadata WHERE tag = ?",
+            (tag,)
+        ).fetchone()
+        if row is None:
+            return None
+        return self._metadata_from_row(row)
+
+    def query(
+        self,
+        conditions: MetadataFilter,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[tuple[str, RecordMetadata]]:
+        _conditions = []
+        parameters = []
+        for column, operator, value in (
+            ("type", "=", conditions.type),
+            ("hash", "=", conditions.hash),
+            ("size", ">=", conditions.min_size),
+            ("size", "<=", conditions.max_size),
+            ("created", ">", conditions.created_after),
+            ("created", "<", conditions.created_before),
+            ("updated", ">", conditions.updated_after),
+            ("updated", "<", conditions.updated_before),
+        ):
+            if value is not None:
+                _conditions.append(f"{column} {operator} ?")
+                parameters.append(value)
+        for key, value in (conditions.labels or {}).items():
+            _conditions.append(
+                "tag IN (SELECT tag FROM labels WHERE key = ? AND value = ?)"
+            )
+            parameters.extend((key, value))
+        for row in self._select_pages(
+            "tag, " + ", ".join(self._METADATA_COLUMNS),
+            prefix, start_after, limit, "metadata", _conditions, parameters
+        ):
+            yield row[0], self._metadata_from_row(row)
+
+    def remove(self, tag: str) -> None:
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM records WHERE tag = ?", (tag,)
+            )
+            self._delete_metadata([tag])
+
+    def close(self) -> None:
+        """Close the database connections of all threads."""
+        with self._lock:
+            self._closed = True
+            for holder in list(self._connections):
+                holder.connection.close()
+            self._connections.clear()
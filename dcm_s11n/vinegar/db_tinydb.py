@@ -2,10 +2,20 @@
 Implementation of the vinegar-DBInterface based on the tinydb-library.
 """
 
-from typing import TypedDict, Optional
+from typing import Any, TypedDict, Optional, Mapping, Iterable, Iterator
 from pathlib import Path
+import os
+import json
+import time
+import uuid
+import weakref
 from tinydb import TinyDB, Query
-from . import DBInterface, DBRecord
+from tinydb.storages import Storage
+from tinydb.middlewares import Middleware
+from . import (
+    DBInterface, DBRecord, Buffer, RecordMetadata, MetadataFilter
+)
+from .db_interface import select_tags
 
 
 class DDBRecord(TypedDict):
@@ -17,16 +27,196 @@ class DDBRecord(TypedDict):
     obj: str
 
 
+class AtomicJSONStorage(Storage):
+    """
+    TinyDB-storage for JSON-files (like `tinydb.storages.JSONStorage`)
+    that writes to a temporary file which then replaces the original
+    file, i.e., the file is never left half-written (e.g., on a crash).
+
+    Keyword arguments:
+    path -- path of the JSON-file
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self._path = Path(path)
+
+    def read(self) -> Optional[dict[str, dict[str, Any]]]:
+        try:
+            with open(self._path, "r", encoding="utf-8") as file:
+                content = file.read()
+        except FileNotFoundError:
+            return None
+        if not content:
+            return None
+        return json.loads(content)
+
+    def write(self, data: dict[str, dict[str, Any]]) -> None:
+        tmp_path = self._path.with_name(
+            f".{self._path.name}.{uuid.uuid4().hex}"
+        )
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self._path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+
+class WriteBehindMiddleware(Middleware):
+    """
+    TinyDB-middleware that keeps the data in memory and writes changes
+    to the storage only when `flush` is called or a write-policy
+    applies (similar to `tinydb.middlewares.CachingMiddleware`).
+
+    The age of changes is checked whenever the db is accessed, i.e.,
+    there is no background writer.
+
+    Keyword arguments:
+    storage_cls -- class of the underlying storage
+
+    Optional arguments:
+    max_dirty_records -- number of changed records (see `add_dirty`)
+                         after which changes are written
+                         (default None -> no limit)
+    max_age -- age of the oldest unwritten change in seconds after
+               which changes are written
+               (default None -> no limit)
+    """
+
+    def __init__(
+        self,
+        storage_cls,
+        max_dirty_records: Optional[int] = None,
+        max_age: Optional[float] = None
+    ):
+        super().__init__(storage_cls)
+        self.max_dirty_records = max_dirty_records
+        self.max_age = max_age
+        self.cache = None
+        self.dirty = False
+        self.dirty_records = 0
+        self._dirty_since = 0.0
+
+    def _check_age(self) -> None:
+        if self.dirty and self.max_age is not None \
+                and time.monotonic() - self._dirty_since >= self.max_age:
+            self.flush()
+
+    def read(self):
+        self._check_age()
+        if self.cache is None:
+            self.cache = self.storage.read()
+        return self.cache
+
+    def write(self, data):
+        self.cache = data
+        if not self.dirty:
+            self.dirty = True
+            self._dirty_since = time.monotonic()
+        self._check_age()
+
+    def add_dirty(self, records: int) -> None:
+        """
+        Register number of changed records for the write-policy.
+
+        Keyword arguments:
+        records -- number of changed records
+        """
+        self.dirty_records += records
+        if self.dirty and self.max_dirty_records is not None \
+                and self.dirty_records >= self.max_dirty_records:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write unwritten changes to the storage."""
+        if self.dirty:
+            self.storage.write(self.cache)
+        self.dirty = False
+        self.dirty_records = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.storage.close()
+
+
 class TinyDBInterface(DBInterface):
     """
     Implementation of the vinegar-DBInterface based on the tinydb-library.
 
+    Metadata are stored in the field "meta" of the documents; `query`
+    scans all documents.
+
+    The JSON-file is always replaced atomically (see AtomicJSONStorage).
+    By default, every change rewrites the entire file. With
+    `write_behind=True`, changes are kept in memory and written only
+    after max_dirty_records changed records, once the oldest change is
+    older than max_age seconds, on `flush` or `close` (also when leaving
+    the context of the object), and when the object is garbage-collected
+    or the interpreter exits. Changes that have not been written are
+    lost on a crash. Since the data are also read from memory, a
+    write-behind db should not be shared between processes.
+
     Keyword arguments:
     path -- pathlib-Path of the db.json
+
+    Optional arguments:
+    write_behind -- whether changes are buffered in memory
+                    (default False)
+    max_dirty_records -- maximum number of buffered changed records
+                         (default 1000; None -> no limit)
+    max_age -- maximum age in seconds of buffered changes; checked
+               whenever the db is accessed
+               (default 5; None -> no limit)
     """
-    def __init__(self, path: Path):
+
+    supports_metadata = True
+
+    def __init__(
+        self,
+        path: Path,
+        write_behind: bool = False,
+        max_dirty_records: Optional[int] = 1000,
+        max_age: Optional[float] = 5
+    ):
         path.parent.mkdir(parents=True, exist_ok=True)
-        self._db = TinyDB(str(path.with_suffix(".json")))
+        if write_behind:
+            self._db = TinyDB(
+                str(path.with_suffix(".json")),
+                storage=WriteBehindMiddleware(
+                    AtomicJSONStorage, max_dirty_records, max_age
+                )
+            )
+            self._buffer = self._db.storage
+        else:
+            self._db = TinyDB(
+                str(path.with_suffix(".json")), storage=AtomicJSONStorage
+            )
+            self._buffer = None
+        # closes (and thereby flushes) the db on garbage collection or
+        # at interpreter exit
+        self._finalizer = weakref.finalize(self, self._db.close)
+
+    def _add_dirty(self, records: int) -> None:
+        if self._buffer is not None:
+            self._buffer.add_dirty(records)
+
+    def flush(self) -> None:
+        """Write buffered changes to the JSON-file."""
+        if self._buffer is not None:
+            self._buffer.flush()
+
+    def close(self) -> None:
+        """Write buffered changes and close the db."""
+        self._finalizer()
+
+    def __enter__(self) -> "TinyDBInterface":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
 
     # Internal methods for encoding and decoding of bytes-like objects.
     # This is required for use of JSON db-format.
@@ -34,8 +224,8 @@ class TinyDBInterface(DBInterface):
     def _encode_o(obj: str) -> bytes:
         return obj.encode("latin1")
     @staticmethod
-    def _decode_o(obj: bytes) -> str:
-        return obj.decode("latin1")
+    def _decode_o(obj: Buffer) -> str:
+        return str(obj, "latin1")
     @classmethod
     def _encode(cls, obj: DDBRecord) -> DBRecord:
         return {"tag": obj["tag"], "obj": cls._encode_o(obj["obj"])}
@@ -43,7 +233,7 @@ class TinyDBInterface(DBInterface):
     def _decode(cls, obj: DBRecord) -> DDBRecord:
         return {"tag": obj["tag"], "obj": cls._decode_o(obj["obj"])}
 
-    def insert(self, obj: bytes, tag: str) -> None:
+    def insert(self, obj: Buffer, tag: str) -> None:
         match = self.find(tag)
         if match is None:
             # new entry
@@ -53,8 +243,33 @@ class TinyDBInterface(DBInterface):
         else:
             # update existing
             self._db.update(
-                {"obj": self._decode_o(obj)}, Query().tag == tag
+                {"obj": self._decode_o(obj), "meta": None}, Query().tag == tag
+            )
+        self._add_dirty(1)
+
+    def insert_many(self, objs: Mapping[str, Buffer]) -> None:
+        existing = {
+            r["tag"] for r in self._db.search(Query().tag.one_of(list(objs)))
+        }
+        # update existing
+        if existing:
+            self._db.update_multiple(
+                [
+                    (
+                        {"obj": self._decode_o(obj), "meta": None},
+                        Query().tag == tag
+                    )
+                    for tag, obj in objs.items() if tag in existing
+                ]
             )
+        # new entries
+        new = [
+            self._decode({"tag": tag, "obj": obj})
+            for tag, obj in objs.items() if tag not in existing
+        ]
+        if new:
+            self._db.insert_multiple(new)
+        self._add_dirty(len(objs))
 
     def find(self, tag: str) -> Optional[DBRecord]:
         matches = self._db.search(Query().tag == tag)
@@ -62,8 +277,66 @@ class TinyDBInterface(DBInterface):
             return self._encode(matches[0])
         return None
 
+    def find_many(self, tags: Iterable[str]) -> list[Optional[DBRecord]]:
+        _tags = list(tags)
+        matches = {}
+        for r in self._db.search(Query().tag.one_of(_tags)):
+            matches.setdefault(r["tag"], r)
+        return [
+            self._encode(matches[tag]) if tag in matches else None
+            for tag in _tags
+        ]
+
     def all(self) -> list[DBRecord]:
         return [self._encode(r) for r in self._db.all()]
 
+    def tags(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[str]:
+        return select_tags(
+            (r["tag"] for r in self._db), prefix, start_after, limit
+        )
+
+    def iterate(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[DBRecord]:
+        # documents are only encoded when the iterator advances
+        documents = {}
+        for r in self._db:
+            documents.setdefault(r["tag"], r)
+        for tag in select_tags(documents, prefix, start_after, limit):
+            yield self._encode(documents[tag])
+
+    def set_metadata(self, tag: str, metadata: RecordMetadata) -> None:
+        self._db.update({"meta": metadata}, Query().tag == tag)
+        self._add_dirty(1)
+
+    def get_metadata(self, tag: str) -> Optional[RecordMetadata]:
+        matches = self._db.search(Query().tag == tag)
+        if len(matches) > 0:
+            return matches[0].get("meta")
+        return None
+
+    def query(
+        self,
+        conditions: MetadataFilter,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[tuple[str, RecordMetadata]]:
+        metadata = {}
+        for r in self._db:
+            if r.get("meta") is not None and conditions.matches(r["meta"]):
+                metadata.setdefault(r["tag"], r["meta"])
+        for tag in select_tags(metadata, prefix, start_after, limit):
+            yield tag, metadata[tag]
+
     def remove(self, tag: str) -> None:
         self._db.remove(Query().tag == tag)
+        self._add_dirty(1)
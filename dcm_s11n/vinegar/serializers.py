@@ -0,0 +1,357 @@
+"""
+Definition of the serialization stage for Vinegar-payloads.
+
+Serialized payloads are prefixed by a header consisting of the magic
+bytes `MAGIC` and a single byte identifying the serializer that has
+been used. Payloads without this header have been generated by dill
+(before serializers were introduced) and are loaded with dill.
+
+The serializer id `OUT_OF_BAND_ID` is reserved for pickle-payloads with
+out-of-band buffers (see `dumps_out_of_band`); their header additionally
+lists the sha256-digests of these buffers.
+"""
+
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+from types import FunctionType
+import io
+import struct
+import hashlib
+import pickle
+import dill
+
+from .db_interface import Buffer
+
+
+# payloads generated by dill/pickle never start with this byte sequence
+MAGIC = b"\xfeVS"
+OUT_OF_BAND_ID = 0
+# number of out-of-band buffers and their digests
+_OUT_OF_BAND_HEADER = struct.Struct(">I")
+_DIGEST_SIZE = hashlib.sha256().digest_size
+# errors that indicate that a serializer cannot handle an object
+ERRORS = (pickle.PicklingError, TypeError, AttributeError)
+
+
+class Serializer(NamedTuple):
+    """
+    A Serializer defines a pair of functions for serialization and
+    deserialization of Python objects. The serialization function should
+    raise a `pickle.PicklingError`, `TypeError`, or `AttributeError` if
+    it cannot (or should not) handle an object such that the next
+    serializer is tried.
+
+    Keyword arguments:
+    name -- name of the serializer
+    id -- unique identifier (1-255) which is written to the header of
+          serialized payloads
+    dumps -- serialization function
+    loads -- deserialization function
+    """
+    name: str
+    id: int
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[Buffer], Any]
+
+
+SERIALIZERS: dict[str, Serializer] = {}
+_SERIALIZERS_BY_ID: dict[int, Serializer] = {}
+
+
+def register_serializer(serializer: Serializer) -> None:
+    """
+    Register serializer for use with Vinegar.
+
+    Keyword arguments:
+    serializer -- Serializer to be registered
+    """
+
+    if not 1 <= serializer.id <= 255:
+        raise ValueError(
+            f"Serializer id has to be in 1-255 (got {serializer.id})."
+        )
+    if serializer.id in _SERIALIZERS_BY_ID \
+            and _SERIALIZERS_BY_ID[serializer.id].name != serializer.name:
+        raise ValueError(
+            f"Serializer id {serializer.id} is already used by serializer "
+            + f"'{_SERIALIZERS_BY_ID[serializer.id].name}'."
+        )
+    SERIALIZERS[serializer.name] = serializer
+    _SERIALIZERS_BY_ID[serializer.id] = serializer
+
+
+def get_serializer(serializer: str | Serializer) -> Serializer:
+    """
+    Returns registered Serializer by name.
+
+    Keyword arguments:
+    serializer -- name of a registered serializer or Serializer
+    """
+
+    if isinstance(serializer, Serializer):
+        return serializer
+    if serializer not in SERIALIZERS:
+        raise ValueError(
+            f"Unknown serializer '{serializer}'. Available serializers: "
+            + ", ".join(SERIALIZERS)
+        )
+    return SERIALIZERS[serializer]
+
+
+def dumps(obj: Any, serializers: Sequence[Serializer]) -> bytes:
+    """
+    Returns obj serialized by the first of the given serializers that
+    can handle obj (including header).
+
+    Keyword arguments:
+    obj -- Python object to be serialized
+    serializers -- Serializers in the order in which they are tried
+    """
+
+    error: Optional[Exception] = None
+    for serializer in serializers:
+        try:
+            data = serializer.dumps(obj)
+        except ERRORS as exc_info:
+            error = exc_info
+            continue
+        return MAGIC + bytes((serializer.id,)) + data
+    if error is None:
+        raise ValueError("No serializer given.")
+    raise error
+
+
+def dumps_out_of_band(
+    obj: Any, threshold: int
+) -> tuple[bytes, list[tuple[str, memoryview]]]:
+    """
+    Returns obj pickled with protocol 5 where large buffers (bytes,
+    bytearrays, and `pickle.PickleBuffer`s, e.g., of numpy-arrays) of at
+    least threshold bytes are passed out-of-band, and a list of pairs of
+    sha256 hex-digest and buffer; the buffers have to be stored by the
+    caller and passed to `loads`. If there are no such buffers, the
+    result is identical to the "pickle"-serializer.
+
+    On `loads`, bytes and bytearrays are copied from their buffers while
+    PickleBuffers are restored as the given buffers (such that, e.g.,
+    numpy-arrays directly use memory-mapped files).
+
+    Keyword arguments:
+    obj -- Python object to be serialized
+    threshold -- minimum size of buffers in bytes to be passed
+                 out-of-band
+    """
+
+    file = io.BytesIO()
+    pickler = _OutOfBandPickler(file, threshold)
+    pickler.dump(obj)
+    buffers = pickler.buffers
+    if not buffers:
+        return MAGIC + bytes((SERIALIZERS["pickle"].id,)) \
+            + file.getvalue(), []
+    digests = [hashlib.sha256(buffer).digest() for buffer in buffers]
+    return (
+        MAGIC + bytes((OUT_OF_BAND_ID,))
+        + _OUT_OF_BAND_HEADER.pack(len(digests)) + b"".join(digests)
+        + file.getvalue(),
+        [(digest.hex(), buffer) for digest, buffer in zip(digests, buffers)]
+    )
+
+
+def _split_out_of_band(data: Buffer) -> tuple[list[str], memoryview]:
+    """
+    Returns digests of out-of-band buffers and pickle data of an
+    out-of-band payload (without MAGIC and id).
+    """
+    view = memoryview(data)
+    (count,) = _OUT_OF_BAND_HEADER.unpack_from(view)
+    start = _OUT_OF_BAND_HEADER.size
+    end = start + count * _DIGEST_SIZE
+    return [
+        view[i:i + _DIGEST_SIZE].hex()
+        for i in range(start, end, _DIGEST_SIZE)
+    ], view[end:]
+
+
+def buffer_digests(data: Buffer) -> list[str]:
+    """
+    Returns the sha256 hex-digests of the out-of-band buffers referenced
+    by data.
+
+    Keyword arguments:
+    data -- bytes-like object generated by `dumps` or
+            `dumps_out_of_band`
+    """
+
+    if data[:len(MAGIC) + 1] != MAGIC + bytes((OUT_OF_BAND_ID,)):
+        return []
+    return _split_out_of_band(memoryview(data)[len(MAGIC) + 1:])[0]
+
+
+def loads(
+    data: Buffer, buffers: Optional[Callable[[str], Buffer]] = None
+) -> Any:
+    """
+    Returns object deserialized from data with the serializer given in
+    its header; data without header are deserialized with dill.
+
+    Keyword arguments:
+    data -- bytes-like object to be deserialized
+
+    Optional arguments:
+    buffers -- function that returns the out-of-band buffer for a
+               sha256 hex-digest; required for payloads generated by
+               `dumps_out_of_band`
+               (default None)
+    """
+
+    if data[:len(MAGIC)] != MAGIC:
+        return _dill_loads(data)
+    serializer_id = data[len(MAGIC)]
+    if serializer_id == OUT_OF_BAND_ID:
+        if buffers is None:
+            raise ValueError(
+                "Payload references out-of-band buffers but no buffers "
+                + "are available."
+            )
+        digests, pickled = _split_out_of_band(
+            memoryview(data)[len(MAGIC) + 1:]
+        )
+        return _OutOfBandUnpickler(
+            io.BufferedReader(_BufferIO(pickled)),
+            [buffers(digest) for digest in digests]
+        ).load()
+    if serializer_id not in _SERIALIZERS_BY_ID:
+        raise ValueError(
+            f"Payload uses unknown serializer id {serializer_id}."
+        )
+    return _SERIALIZERS_BY_ID[serializer_id].loads(
+        memoryview(data)[len(MAGIC) + 1:]
+    )
+
+
+def protocol(data: Buffer) -> int:
+    """
+    Returns the pickle protocol of data (0 for protocols without
+    explicit marker, i.e., 0 and 1).
+
+    Keyword arguments:
+    data -- bytes-like object generated by `dumps` or
+            `dumps_out_of_band`
+    """
+
+    if data[:len(MAGIC)] == MAGIC:
+        if data[len(MAGIC)] == OUT_OF_BAND_ID:
+            data = _split_out_of_band(memoryview(data)[len(MAGIC) + 1:])[1]
+        else:
+            data = memoryview(data)[len(MAGIC) + 1:]
+    # protocols 2 and higher start with the PROTO-opcode
+    if data[:1] == pickle.PROTO:
+        return data[1]
+    return 0
+
+
+class _BufferIO(io.RawIOBase):
+    """
+    Read-only raw binary stream over a buffer; data is copied only when
+    it is read.
+    """
+    def __init__(self, buffer: Buffer) -> None:
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        size = min(len(b), len(self._view) - self._position)
+        b[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+
+
+def _dill_loads(data: Buffer) -> Any:
+    """
+    Returns object deserialized from data with dill; bytes-like objects
+    other than bytes are read without copying them as a whole.
+    """
+    if isinstance(data, bytes):
+        return dill.loads(data)
+    return dill.load(io.BufferedReader(_BufferIO(data)))
+
+
+class _Pickler(pickle.Pickler):
+    """
+    Pickler that refuses classes and functions defined in `__main__`;
+    pickle stores these by reference while dill stores them by value.
+    """
+    def reducer_override(self, obj):
+        if isinstance(obj, (type, FunctionType)) \
+                and getattr(obj, "__module__", None) == "__main__":
+            raise pickle.PicklingError(
+                f"Refusing to pickle {obj!r} from '__main__' by reference."
+            )
+        return NotImplemented
+
+
+class _OutOfBandPickler(_Pickler):
+    """
+    _Pickler that collects large buffers in `buffers` and references
+    them by persistent ids (type and index in `buffers`). Unlike
+    `buffer_callback`, this also applies to bytes and bytearrays.
+    """
+    def __init__(self, file, threshold: int) -> None:
+        super().__init__(file, protocol=5)
+        self._threshold = threshold
+        self.buffers: list[memoryview] = []
+        # id of object -> persistent id; objects are kept alive in
+        # `_objects` such that ids are not reused
+        self._ids: dict[int, tuple[str, int]] = {}
+        self._objects: list[Any] = []
+
+    def persistent_id(self, obj):
+        if type(obj) in (bytes, bytearray):
+            if len(obj) < self._threshold:
+                return None
+            view = memoryview(obj)
+        elif type(obj) is pickle.PickleBuffer:
+            try:
+                view = obj.raw()
+            except BufferError:  # non-contiguous buffer
+                return None
+            if view.nbytes < self._threshold:
+                return None
+        else:
+            return None
+        if id(obj) not in self._ids:
+            self._ids[id(obj)] = (type(obj).__name__, len(self.buffers))
+            self._objects.append(obj)
+            self.buffers.append(view)
+        return self._ids[id(obj)]
+
+
+class _OutOfBandUnpickler(pickle.Unpickler):
+    """Unpickler for payloads of the _OutOfBandPickler."""
+    def __init__(self, file, buffers: list[Buffer]) -> None:
+        super().__init__(file)
+        self._buffers = buffers
+
+    def persistent_load(self, pid):
+        kind, index = pid
+        if kind == "bytes":
+            return bytes(self._buffers[index])
+        if kind == "bytearray":
+            return bytearray(self._buffers[index])
+        if kind == "PickleBuffer":
+            return self._buffers[index]
+        raise pickle.UnpicklingError(f"Unknown persistent id {pid!r}.")
+
+
+def _pickle_dumps(obj: Any) -> bytes:
+    """Returns obj pickled with protocol 5 by the _Pickler."""
+    buffer = io.BytesIO()
+    _Pickler(buffer, protocol=5).dump(obj)
+    return buffer.getvalue()
+
+
+register_serializer(Serializer("pickle", 1, _pickle_dumps, pickle.loads))
+register_serializer(Serializer("dill", 2, dill.dumps, _dill_loads))
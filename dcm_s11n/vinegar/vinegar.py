@@ -1,12 +1,112 @@
 """
 This module defines the Vinegar-class which handles (de-)serialization
-of python classes using the dill-library and manages a database of
-objects.
+of python classes using the pickle- and dill-libraries and manages a
+database of objects.
 """
 
-from typing import Any, Optional
-import dill
-from .db_interface import DBInterface, DBRecord
+from typing import Any, Optional, Mapping, Iterable, Iterator, Sequence
+from pathlib import Path
+import copy
+import contextlib
+import hashlib
+import time
+from .db_interface import (
+    DBInterface, DBRecord, Buffer, RecordMetadata, MetadataFilter,
+    VersionConflictError, select_tags
+)
+from .cache import LRUCache, CacheInfo
+from .serializers import Serializer, get_serializer
+from .buffers import BufferStore
+from . import compression, serializers
+
+DEFAULT_SERIALIZERS = ("pickle", "dill")
+
+def _compress(
+    serialized_object: bytes,
+    codec: Optional[compression.Codec],
+    compression_threshold: int
+) -> bytes:
+    """Returns serialized_object compressed with codec (if any)."""
+    if codec is not None:
+        return compression.compress(
+            serialized_object, codec, compression_threshold
+        )
+    return serialized_object
+
+
+def _serialize(
+    obj: Any,
+    _serializers: Sequence[Serializer],
+    buffer_threshold: Optional[int] = None
+) -> tuple[bytes, list[tuple[str, memoryview]]]:
+    """
+    Returns obj serialized by the first of _serializers that can handle
+    obj and the out-of-band buffers (pairs of digest and buffer) that
+    still need to be stored. If buffer_threshold is given, the
+    "pickle"-serializer passes buffers of at least that size
+    out-of-band.
+    """
+    if buffer_threshold is None:
+        return serializers.dumps(obj, _serializers), []
+    error: Optional[Exception] = None
+    for serializer in _serializers:
+        try:
+            if serializer == serializers.SERIALIZERS["pickle"]:
+                return serializers.dumps_out_of_band(obj, buffer_threshold)
+            return serializers.dumps(obj, (serializer,)), []
+        except serializers.ERRORS as exc_info:
+            error = exc_info
+    raise error
+
+
+def _check_buffer_serializers(
+    buffer_directory: Optional[Path], _serializers: Sequence[Serializer]
+) -> None:
+    """
+    Raises ValueError if out-of-band buffers are requested without the
+    "pickle"-serializer (which is the only one to support them).
+    """
+    if buffer_directory is not None \
+            and serializers.SERIALIZERS["pickle"] not in _serializers:
+        raise ValueError(
+            "Out-of-band buffers (buffer_directory) require the 'pickle'-"
+            + "serializer."
+        )
+
+
+def _dumps(
+    obj: Any,
+    _serializers: Sequence[Serializer],
+    codec: Optional[compression.Codec],
+    compression_threshold: int,
+    buffers: Optional[BufferStore] = None,
+    buffer_threshold: int = 1024 * 1024
+) -> bytes:
+    """
+    Returns obj serialized and compressed with codec (if any); if
+    buffers is given, out-of-band buffers are stored in buffers.
+    """
+    serialized_object, _buffers = _serialize(
+        obj, _serializers, None if buffers is None else buffer_threshold
+    )
+    for digest, buffer in _buffers:
+        buffers.put(digest, buffer)
+    return _compress(serialized_object, codec, compression_threshold)
+
+
+def _loads(
+    obj_string: Buffer, buffers: Optional[BufferStore] = None
+) -> Any:
+    """
+    Returns object deserialized from obj_string (with out-of-band
+    buffers from buffers); bytes-like objects other than bytes are read
+    without copying them as a whole.
+    """
+    return serializers.loads(
+        compression.decompress(obj_string),
+        None if buffers is None else buffers.get
+    )
+
 
 class Vinegar():
     """
@@ -14,14 +114,93 @@ class Vinegar():
     Serialized objects are stored on the local filesystem in the working
     directory.
 
+    By default, objects are serialized with the (faster) pickle-library
+    and only objects that pickle cannot handle (e.g., lambdas, closures,
+    or classes defined in `__main__` or locally) are serialized with
+    dill. The serializer is recorded in every payload such that `loads`
+    does not depend on this setting; payloads of earlier versions (which
+    always used dill) remain readable.
+
+    If a buffer_directory is given, the "pickle"-serializer pickles
+    objects with protocol 5 where large buffers (e.g., of bytearrays or
+    numpy-arrays) are stored out-of-band as separate files (see
+    `buffers.BufferStore`) instead of being copied into the payload;
+    this requires "pickle" to be among the serializers. On `load`, these
+    files are memory-mapped. Files are shared between identical buffers
+    and have to be removed explicitly with `collect_buffers`.
+
     Keyword arguments:
     db -- object of a class implementing the DBInterface
+
+    Optional arguments:
+    cache_size -- maximum number of deserialized objects that are kept
+                  in a least-recently-used cache for `load`; cached
+                  entries are invalidated by `dump` and `remove`
+                  (default None -> no caching)
+    copy_on_read -- if True, `load` returns a deep copy of the cached
+                    object; should be used if loaded objects are
+                    mutated by the caller
+                    (default False -> cached object is returned)
+    codec -- name of a codec (see `compression.CODECS`, e.g., "zlib",
+             "lzma", or "bz2") or `compression.Codec` that is used to
+             compress serialized objects; compressed and uncompressed
+             records can always be loaded regardless of this setting
+             (default None -> no compression)
+    compression_threshold -- minimum size in bytes of a serialized
+                             object to be compressed
+                             (default 1024)
+    metadata -- if True, `RecordMetadata` (size, time of creation and
+                last update, pickle protocol, content hash, type, and
+                labels) are stored along with every dumped object; db
+                has to support metadata
+                (default False)
+    serializers -- names of serializers (see `serializers.SERIALIZERS`,
+                   i.e., "pickle" or "dill") or `serializers.Serializer`
+                   that are tried in the given order
+                   (default DEFAULT_SERIALIZERS -> pickle with fallback
+                   to dill)
+    buffer_directory -- pathlib-Path of the directory for out-of-band
+                        buffers
+                        (default None -> all data are stored in-band)
+    buffer_threshold -- minimum size in bytes of a buffer to be stored
+                        out-of-band
+                        (default 1 MiB)
     """
 
-    def __init__(self, db: DBInterface) -> None:
+    def __init__(
+        self,
+        db: DBInterface,
+        cache_size: Optional[int] = None,
+        copy_on_read: bool = False,
+        codec: Optional[str | compression.Codec] = None,
+        compression_threshold: int = 1024,
+        metadata: bool = False,
+        serializers: Sequence[str | Serializer] = DEFAULT_SERIALIZERS,
+        buffer_directory: Optional[Path] = None,
+        buffer_threshold: int = 1024 * 1024
+    ) -> None:
+        if metadata and not getattr(db, "supports_metadata", False):
+            raise ValueError(
+                f"Database of type {db.__class__.__name__} does not "
+                + "support metadata."
+            )
         self._db = db
+        self._cache = None if cache_size is None else LRUCache(cache_size)
+        self._copy_on_read = copy_on_read
+        self._codec = None if codec is None else compression.get_codec(codec)
+        self._compression_threshold = compression_threshold
+        self._metadata = metadata
+        if not serializers:
+            raise ValueError("At least one serializer is required.")
+        self._serializers = tuple(map(get_serializer, serializers))
+        _check_buffer_serializers(buffer_directory, self._serializers)
+        self._buffers = None if buffer_directory is None \
+            else BufferStore(buffer_directory)
+        self._buffer_threshold = buffer_threshold
 
-    def dump(self, obj: Any, tag: str) -> None:
+    def dump(
+        self, obj: Any, tag: str, labels: Optional[Mapping[str, str]] = None
+    ) -> None:
         """
         Serializes the given Python-object obj and stores it with the
         given tag.
@@ -29,22 +208,222 @@ class Vinegar():
         Keyword arguments:
         obj -- Python object to be serialized
         tag -- tag for Python object
+
+        Optional arguments:
+        labels -- labels that are stored in the metadata of the record
+                  (only if metadata are enabled)
+                  (default None)
+        """
+
+        serialized_object, buffers = self._serialize(obj)
+        with self._transaction():
+            self._insert(obj, tag, serialized_object, labels, buffers)
+
+    def dump_versioned(
+        self,
+        obj: Any,
+        tag: str,
+        version: Optional[str],
+        labels: Optional[Mapping[str, str]] = None
+    ) -> str:
+        """
+        Serializes the given Python-object obj and stores it with the
+        given tag only if the stored record still has the given version
+        (see `version`); otherwise a VersionConflictError is raised.
+        Returns the new version of the record.
+
+        Check and update are only atomic if db provides transactions
+        (e.g., LockedDB).
+
+        Keyword arguments:
+        obj -- Python object to be serialized
+        tag -- tag for Python object
+        version -- expected version of the stored record; None if the
+                   record is expected to not exist
+
+        Optional arguments:
+        labels -- labels that are stored in the metadata of the record
+                  (only if metadata are enabled)
+                  (default None)
+        """
+
+        serialized_object, buffers = self._serialize(obj)
+        with self._transaction():
+            current = self.version(tag)
+            if current != version:
+                raise VersionConflictError(
+                    f"Record '{tag}' has version {current} (expected "
+                    + f"{version})."
+                )
+            return self._insert(
+                obj, tag, serialized_object, labels, buffers
+            )
+
+    def version(self, tag: str) -> Optional[str]:
         """
+        Returns the current version (sha256 hex-digest of the stored
+        obj) of the record with tag or None if it does not exist.
 
-        serialized_object = self.dumps(obj)
-        self._db.insert(serialized_object, tag)
+        Keyword arguments:
+        tag -- object's tag
+        """
+
+        record = self._db.find(tag)
+        if record is None:
+            return None
+        return hashlib.sha256(record["obj"]).hexdigest()
+
+    def dump_many(
+        self,
+        objs: Mapping[str, Any],
+        labels: Optional[Mapping[str, str]] = None
+    ) -> None:
+        """
+        Serializes the given Python-objects and stores them with the
+        associated tags in a single batch-operation.
+
+        Keyword arguments:
+        objs -- mapping of tags and Python objects to be serialized
+
+        Optional arguments:
+        labels -- labels that are stored in the metadata of every record
+                  (only if metadata are enabled)
+                  (default None)
+        """
+
+        serialized = {tag: self._serialize(obj) for tag, obj in objs.items()}
+        serialized_objects = {
+            tag: serialized_object
+            for tag, (serialized_object, _) in serialized.items()
+        }
+        compressed_objects = {
+            tag: self._compress(serialized_object)
+            for tag, serialized_object in serialized_objects.items()
+        }
+        with self._transaction():
+            for _, buffers in serialized.values():
+                self._store_buffers(buffers)
+            # metadata of existing records are discarded on insert
+            metadata = {
+                tag: self._make_metadata(
+                    obj, tag, serialized_objects[tag],
+                    compressed_objects[tag], labels
+                )
+                for tag, obj in objs.items()
+            } if self._metadata else {}
+            if hasattr(self._db, "insert_many"):
+                self._db.insert_many(compressed_objects)
+            else:
+                for tag, compressed_object in compressed_objects.items():
+                    self._db.insert(compressed_object, tag)
+            for tag, _metadata in metadata.items():
+                self._db.set_metadata(tag, _metadata)
+            if self._cache is not None:
+                for tag in objs:
+                    self._cache.invalidate(tag)
+
+    def _transaction(self):
+        """
+        Returns context manager for an atomic sequence of operations
+        (if supported by db).
+        """
+        if hasattr(self._db, "transaction"):
+            return self._db.transaction()
+        return contextlib.nullcontext()
+
+    def _insert(
+        self,
+        obj: Any,
+        tag: str,
+        serialized_object: bytes,
+        labels: Optional[Mapping[str, str]],
+        buffers: list[tuple[str, memoryview]]
+    ) -> str:
+        """
+        Stores serialized_object (along with its out-of-band buffers and
+        metadata) and returns the version of the new record.
+        """
+
+        self._store_buffers(buffers)
+        compressed_object = self._compress(serialized_object)
+        # metadata of an existing record are discarded on insert
+        metadata = self._make_metadata(
+            obj, tag, serialized_object, compressed_object, labels
+        ) if self._metadata else None
+        self._db.insert(compressed_object, tag)
+        if metadata is not None:
+            self._db.set_metadata(tag, metadata)
+        if self._cache is not None:
+            self._cache.invalidate(tag)
+        return hashlib.sha256(compressed_object).hexdigest()
+
+    def _make_metadata(
+        self,
+        obj: Any,
+        tag: str,
+        serialized_object: bytes,
+        compressed_object: bytes,
+        labels: Optional[Mapping[str, str]]
+    ) -> RecordMetadata:
+        """
+        Returns metadata for obj; the time of creation is taken from
+        the metadata of the existing record.
+        """
+
+        now = time.time()
+        previous = self._db.get_metadata(tag)
+        return {
+            "size": len(compressed_object),
+            "created": now if previous is None else previous["created"],
+            "updated": now,
+            "protocol": serializers.protocol(serialized_object),
+            "hash": hashlib.sha256(serialized_object).hexdigest(),
+            "type": f"{type(obj).__module__}.{type(obj).__qualname__}",
+            "labels": dict(labels or {}),
+        }
 
     def dumps(self, obj: Any) -> str:
         """
         Serializes the given Python-object obj and returns it as
         byte-encoded string.
 
+        Note that if a buffer_directory is configured, the out-of-band
+        buffers of obj are written to that directory as well since
+        they are required to `loads` the result.
+
         Keyword arguments:
         obj -- Python object to be serialized
         """
 
-        serialized_object = dill.dumps(obj)
-        return serialized_object
+        return _dumps(
+            obj, self._serializers, self._codec,
+            self._compression_threshold, self._buffers,
+            self._buffer_threshold
+        )
+
+    def _serialize(
+        self, obj: Any
+    ) -> tuple[bytes, list[tuple[str, memoryview]]]:
+        """
+        Returns obj serialized according to settings and the out-of-band
+        buffers (pairs of digest and buffer) that still need to be
+        stored.
+        """
+        return _serialize(
+            obj, self._serializers,
+            None if self._buffers is None else self._buffer_threshold
+        )
+
+    def _store_buffers(self, buffers: list[tuple[str, memoryview]]) -> None:
+        """Stores out-of-band buffers in the buffer directory."""
+        for digest, buffer in buffers:
+            self._buffers.put(digest, buffer)
+
+    def _compress(self, serialized_object: bytes) -> bytes:
+        """Returns serialized_object compressed according to settings."""
+        return _compress(
+            serialized_object, self._codec, self._compression_threshold
+        )
 
     def load(self, tag: str) -> Any:
         """
@@ -56,20 +435,88 @@ class Vinegar():
         tag -- object's tag
         """
 
+        if self._cache is not None:
+            cached, obj = self._cache.get(tag)
+            if cached:
+                return self._read_cached(obj)
+            # the record may be replaced by a concurrent dump while it is
+            # read; outdated objects are not cached
+            generation = self._cache.generation
+
         record = self._db.find(tag)
         if record is not None:
-            return self.loads(record["obj"])
+            obj = self.loads(record["obj"])
+            if self._cache is not None:
+                self._cache.put(tag, obj, generation)
+                return self._read_cached(obj)
+            return obj
         return None
 
-    def loads(self, obj_string: str) -> Any:
+    def _read_cached(self, obj: Any) -> Any:
+        """Returns obj or a copy of obj depending on cache settings."""
+        if self._copy_on_read:
+            return copy.deepcopy(obj)
+        return obj
+
+    def load_many(self, tags: Iterable[str]) -> list[Any]:
+        """
+        Attempts to deserialize objects for multiple tags in a single
+        batch-operation.
+
+        Returns a list with one element for every tag in tags; elements
+        are None if no entry tagged with that tag is found in db.
+
+        Keyword arguments:
+        tags -- objects' tags
+        """
+
+        _tags = list(tags)
+        objs = {}
+
+        # collect cached objects
+        if self._cache is not None:
+            for tag in _tags:
+                cached, obj = self._cache.get(tag)
+                if cached:
+                    objs[tag] = obj
+            generation = self._cache.generation
+        missing = [tag for tag in _tags if tag not in objs]
+
+        # load remaining objects from db
+        if hasattr(self._db, "find_many"):
+            records = self._db.find_many(missing)
+        else:
+            records = [self._db.find(tag) for tag in missing]
+        for record in records:
+            if record is None:
+                continue
+            objs[record["tag"]] = self.loads(record["obj"])
+            if self._cache is not None:
+                self._cache.put(
+                    record["tag"], objs[record["tag"]], generation
+                )
+
+        if self._cache is not None:
+            return [
+                self._read_cached(objs[tag]) if tag in objs else None
+                for tag in _tags
+            ]
+        return [objs.get(tag) for tag in _tags]
+
+    def loads(self, obj_string: Buffer) -> Any:
         """
         Attempts to deserialize from byte-encoded string obj_string.
 
+        Objects other than bytes (e.g., memoryviews of a memory-mapped
+        file as returned by the LogDB) are deserialized directly from
+        the buffer without copying it as a whole.
+
         Keyword arguments:
-        obj_string -- byte-encoded string representing Python object
+        obj_string -- byte-encoded string (or other bytes-like object)
+                      representing Python object
         """
 
-        return dill.loads(obj_string)
+        return _loads(obj_string, self._buffers)
 
     def find(self, tag: Optional[str] = None) -> list[DBRecord]:
         """
@@ -88,6 +535,98 @@ class Vinegar():
             records = self._db.all()
         return records
 
+    def iterate(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None,
+        tags_only: bool = False
+    ) -> Iterator[str | DBRecord]:
+        """
+        Returns iterator over the records (in lexicographic order of
+        their tags) without loading the entire database; objs are
+        fetched lazily while iterating.
+
+        Results can be paginated by passing the last tag of the previous
+        page as start_after, e.g.,
+        `vinegar.iterate(start_after=page[-1], limit=50, tags_only=True)`.
+
+        Optional arguments:
+        prefix -- only records with tags starting with this prefix are
+                  returned
+                  (default "")
+        start_after -- only records with tags that are lexicographically
+                       greater are returned
+                       (default None)
+        limit -- maximum number of records
+                 (default None -> no limit)
+        tags_only -- if True, tags are returned instead of DBRecords
+                     (default False)
+        """
+
+        if not tags_only and hasattr(self._db, "iterate"):
+            return self._db.iterate(prefix, start_after, limit)
+        if hasattr(self._db, "tags"):
+            tags = self._db.tags(prefix, start_after, limit)
+        else:
+            tags = select_tags(
+                (record["tag"] for record in self._db.all()),
+                prefix, start_after, limit
+            )
+        if tags_only:
+            return tags
+        return (
+            record for record in map(self._db.find, tags)
+            if record is not None
+        )
+
+    def metadata(self, tag: str) -> Optional[RecordMetadata]:
+        """
+        Returns metadata of the record with tag or None if the record
+        has no metadata (or does not exist).
+
+        Keyword arguments:
+        tag -- object's tag
+        """
+
+        if not hasattr(self._db, "get_metadata"):
+            return None
+        return self._db.get_metadata(tag)
+
+    def query(
+        self,
+        conditions: MetadataFilter,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[tuple[str, RecordMetadata]]:
+        """
+        Returns iterator over pairs of tag and metadata (in
+        lexicographic order of tags) of all records whose metadata meet
+        the given conditions; objects are not deserialized.
+
+        For example, records that have not been updated for a day can
+        be found with
+        `vinegar.query(MetadataFilter(updated_before=time.time() - 86400))`.
+
+        Keyword arguments:
+        conditions -- conditions on the metadata
+
+        Optional arguments:
+        prefix -- only records with tags starting with this prefix are
+                  returned
+                  (default "")
+        start_after -- only records with tags that are lexicographically
+                       greater are returned
+                       (default None)
+        limit -- maximum number of records
+                 (default None -> no limit)
+        """
+
+        if not hasattr(self._db, "query"):
+            return iter(())
+        return self._db.query(conditions, prefix, start_after, limit)
+
     def remove(self, tag:str) -> None:
         """
         Removes record with tag from database.
@@ -96,4 +635,48 @@ class Vinegar():
         tag -- record tag to be deleted
         """
 
-        self._db.remove(tag)
+        with self._transaction():
+            self._db.remove(tag)
+            if self._cache is not None:
+                self._cache.invalidate(tag)
+
+    def collect_buffers(self) -> int:
+        """
+        Removes out-of-band buffers that are not referenced by any
+        record and returns their number.
+
+        This requires reading all records; it is only safe while no
+        other process or thread dumps objects (unless db provides
+        transactions, e.g., LockedDB).
+        """
+
+        if self._buffers is None:
+            return 0
+        with self._transaction():
+            referenced = set()
+            for record in self.iterate():
+                referenced.update(
+                    serializers.buffer_digests(
+                        compression.decompress(record["obj"])
+                    )
+                )
+            return self._buffers.collect_garbage(referenced)
+
+    def cache_info(self) -> Optional[CacheInfo]:
+        """
+        Returns statistics (hits, misses, maxsize, currsize) of the
+        deserialization cache or None if caching is disabled.
+        """
+
+        if self._cache is None:
+            return None
+        return self._cache.info()
+
+    def cache_clear(self) -> None:
+        """
+        Removes all entries from the deserialization cache and resets
+        its statistics.
+        """
+
+        if self._cache is not None:
+            self._cache.clear()
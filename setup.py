@@ -17,6 +17,7 @@ setup(
     packages=[
         "dcm_s11n",
         "dcm_s11n.vinegar",
+        "dcm_s11n.benchmarks",
     ],
     package_data={"dcm_s11n": ["py.typed"]},
     setuptools_git_versioning={
@@ -32,6 +32,36 @@ def temporary_directory():
     """
     return TESTING_DIR
 
+def _fresh_path(directory: Path, request, suffix: str) -> Path:
+    """
+    Returns path to a file in directory that is named after the test
+    module of request; existing files starting with that name (e.g.,
+    journals) are removed.
+    """
+    path = directory / (request.module.__name__.rsplit(".", 1)[-1] + suffix)
+    for file in directory.glob(path.name + "*"):
+        file.unlink()
+    return path
+
+
+@pytest.fixture(name="log_path")
+def get_log_path(temporary_directory, request):
+    """Returns path to a fresh log-file."""
+    return _fresh_path(temporary_directory, request, ".log")
+
+
+@pytest.fixture(name="sqlite_path")
+def get_sqlite_path(temporary_directory, request):
+    """Returns path to a fresh sqlite-database file."""
+    return _fresh_path(temporary_directory, request, ".sqlite")
+
+
+@pytest.fixture(name="tinydb_path")
+def get_tinydb_path(temporary_directory, request):
+    """Returns path to a fresh tinydb-database file."""
+    return _fresh_path(temporary_directory, request, ".json")
+
+
 @pytest.fixture()
 def prepare_zip_filepaths():
     """
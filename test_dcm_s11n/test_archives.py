@@ -2,6 +2,17 @@
 Test module for the archives-module.
 """
 
+import asyncio
+import gzip
+import hashlib
+import io
+import os
+import shutil
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
 from dcm_common.util import write_test_file
 from dcm_s11n import archives
 
@@ -73,7 +84,10 @@ def test_unpack_archive_default(temporary_directory, prepare_zip_filepaths):
     expected_file = (temporary_directory / zip_filepaths[0].stem).rmdir()
 
 def test_unpack_archive_nondefault(temporary_directory, prepare_zip_filepaths):
-    """Test the archives.unpack_archive-function with non-default parameters."""
+    """
+    Test the archives.unpack_archive-function with non-default
+    parameters.
+    """
 
     # Prepare temporary directory
     zip_filepaths = prepare_zip_filepaths(temporary_directory)
@@ -115,7 +129,8 @@ def test_unpack_archive_recursively_complete(
     file_to_unzip = zip_filepaths[1]
     expected_files = [
         temporary_directory / file_to_unzip.stem / "file2.txt",
-        temporary_directory / file_to_unzip.stem / "packed_dir" / "nested_file.txt"
+        temporary_directory / file_to_unzip.stem / "packed_dir"
+        / "nested_file.txt"
     ]
 
     # Unpack the zipped file, with default optional arguments
@@ -226,3 +241,829 @@ def test_compress_directory_nondefault(temporary_directory):
     test_file_path.unlink()
     test_archive.unlink()
     test_archive_dir.rmdir()
+
+def _make_nested_zip(path, inner):
+    """
+    Write zip-archive at path which contains one inner zip-archive for
+    every pair of name and content in inner.
+    """
+    with zipfile.ZipFile(path, "w") as outer_zip:
+        for name, content in inner.items():
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w") as inner_zip:
+                inner_zip.writestr(f"{name}/file.txt", content)
+            outer_zip.writestr(f"{name}.zip", buffer.getvalue())
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_unpack_archive_recursively_workers(
+    temporary_directory, use_processes
+):
+    """
+    Test the archives.unpack_archive_recursively-function with a pool of
+    workers.
+    """
+
+    archive = temporary_directory / "siblings.zip"
+    _make_nested_zip(archive, {f"inner{i}": f"{i}" for i in range(5)})
+
+    archives.unpack_archive_recursively(
+        filename=archive,
+        workers=3,
+        use_processes=use_processes
+    )
+
+    extract_dir = temporary_directory / "siblings"
+    for i in range(5):
+        assert (extract_dir / f"inner{i}" / "file.txt").read_text() == f"{i}"
+        assert not (extract_dir / f"inner{i}.zip").exists()
+
+    # Cleanup
+    archive.unlink()
+    shutil.rmtree(extract_dir)
+
+def test_unpack_archive_recursively_workers_errors(temporary_directory):
+    """
+    Test error aggregation of the archives.unpack_archive_recursively-
+    function with a pool of workers.
+    """
+
+    archive = temporary_directory / "siblings.zip"
+    with zipfile.ZipFile(archive, "w") as outer_zip:
+        outer_zip.writestr("b.zip", b"no archive")
+        outer_zip.writestr("a.zip", b"no archive")
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as inner_zip:
+            inner_zip.writestr("c/file.txt", "c")
+        outer_zip.writestr("c.zip", buffer.getvalue())
+
+    with pytest.raises(archives.ArchiveUnpackError) as exc_info:
+        archives.unpack_archive_recursively(filename=archive, workers=3)
+
+    extract_dir = temporary_directory / "siblings"
+    assert [path.name for path, _ in exc_info.value.errors] == [
+        "a.zip", "b.zip"
+    ]
+    assert (extract_dir / "c" / "file.txt").is_file()
+
+    # Cleanup
+    archive.unlink()
+    shutil.rmtree(extract_dir)
+
+def test_unpack_archive_recursively_workers_single_error(
+    temporary_directory
+):
+    """
+    Test that the archives.unpack_archive_recursively-function
+    aggregates errors if workers is set, also for a single archive.
+    """
+
+    archive = temporary_directory / "single.zip"
+    with zipfile.ZipFile(archive, "w") as outer_zip:
+        outer_zip.writestr("a.zip", b"no archive")
+
+    with pytest.raises(archives.ArchiveUnpackError) as exc_info:
+        archives.unpack_archive_recursively(filename=archive, workers=4)
+    assert [path.name for path, _ in exc_info.value.errors] == ["a.zip"]
+
+    # Cleanup
+    archive.unlink()
+    shutil.rmtree(temporary_directory / "single")
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_unpack_archive_recursively_workers_collisions(
+    temporary_directory, use_processes
+):
+    """
+    Test that the archives.unpack_archive_recursively-function with a
+    pool of workers replaces members with the same name in the same
+    order as sequential processing.
+    """
+
+    archive = temporary_directory / "collisions.zip"
+    payloads = [bytes([i]) * 8 * 1024 * 1024 for i in range(4)]
+    with zipfile.ZipFile(archive, "w") as outer_zip:
+        for i, payload in enumerate(payloads):
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w") as inner_zip:
+                inner_zip.writestr("same.bin", payload)
+                inner_zip.writestr(f"sub/file{i}.txt", str(i))
+            outer_zip.writestr(f"inner{i}.zip", buffer.getvalue())
+    extract_dir = temporary_directory / "collisions"
+
+    for workers in (None, 4):
+        archives.unpack_archive_recursively(
+            filename=archive, workers=workers, use_processes=use_processes
+        )
+        assert (extract_dir / "same.bin").read_bytes() == payloads[-1]
+        assert sorted(p.name for p in (extract_dir / "sub").iterdir()) == [
+            f"file{i}.txt" for i in range(4)
+        ]
+        assert sorted(p.name for p in extract_dir.iterdir()) == [
+            "same.bin", "sub"
+        ]
+        shutil.rmtree(extract_dir)
+
+    # Cleanup
+    archive.unlink()
+
+def test_unpack_archive_recursively_sequential_errors(temporary_directory):
+    """
+    Test that the archives.unpack_archive_recursively-function raises
+    the original exception without a pool of workers.
+    """
+
+    archive = temporary_directory / "broken.zip"
+    with zipfile.ZipFile(archive, "w") as outer_zip:
+        outer_zip.writestr("a.zip", b"no archive")
+
+    with pytest.raises(shutil.ReadError):
+        archives.unpack_archive_recursively(filename=archive)
+
+    # Cleanup
+    archive.unlink()
+    shutil.rmtree(temporary_directory / "broken")
+
+@pytest.mark.parametrize(
+    "limits",
+    [
+        archives.ExtractionLimits(max_total_size=1000),
+        archives.ExtractionLimits(max_members=1),
+        archives.ExtractionLimits(max_ratio=10),
+    ],
+    ids=["total_size", "members", "ratio"]
+)
+def test_unpack_archive_limits(temporary_directory, limits):
+    """Test the archives.unpack_archive-function with limits."""
+
+    archive = temporary_directory / "bomb.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("file1.txt", b"0" * 100_000)
+        zip_file.writestr("file2.txt", b"0" * 100_000)
+
+    with pytest.raises(archives.UnsafeArchiveError):
+        archives.unpack_archive(filename=archive, limits=limits)
+    assert archive.is_file()
+
+    # Cleanup
+    archive.unlink()
+    shutil.rmtree(temporary_directory / "bomb", ignore_errors=True)
+
+def test_unpack_archive_path_traversal(temporary_directory):
+    """
+    Test the archives.unpack_archive-function with an archive containing
+    a member outside of the target directory.
+    """
+
+    archive = temporary_directory / "traversal.tar"
+    with tarfile.open(archive, "w") as tar_file:
+        info = tarfile.TarInfo("../outside.txt")
+        info.size = 1
+        tar_file.addfile(info, io.BytesIO(b"0"))
+
+    with pytest.raises(archives.UnsafeArchiveError):
+        archives.unpack_archive(filename=archive)
+    assert not (temporary_directory / "outside.txt").exists()
+
+    # Cleanup
+    archive.unlink()
+    shutil.rmtree(temporary_directory / "traversal", ignore_errors=True)
+
+def test_unpack_archive_symlink_swap(temporary_directory):
+    """
+    Test the archives.unpack_archive-function with an archive that
+    replaces a symlink such that an earlier symlink points outside of
+    the target directory.
+    """
+
+    base = temporary_directory / "symlink_swap"
+    extract_dir = base / "out" / "x"
+    extract_dir.mkdir(parents=True)
+    archive = base / "swap.tar"
+    with tarfile.open(archive, "w") as tar_file:
+        info = tarfile.TarInfo("d")
+        info.type = tarfile.DIRTYPE
+        tar_file.addfile(info)
+        for name, linkname in (
+            ("d/t", "u/v"), ("s", "d/t/../.."), ("d/t", ".")
+        ):
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.SYMTYPE
+            info.linkname = linkname
+            tar_file.addfile(info)
+        info = tarfile.TarInfo("s/pwned.txt")
+        info.size = 1
+        tar_file.addfile(info, io.BytesIO(b"0"))
+
+    with pytest.raises(archives.UnsafeArchiveError):
+        archives.unpack_archive(filename=archive, extract_dir=extract_dir)
+    assert not (base / "out" / "pwned.txt").exists()
+    assert os.readlink(extract_dir / "d" / "t") == "u/v"
+
+    # writing through an existing symlink is rejected as well
+    (extract_dir / "escape").symlink_to("../..")
+    archive2 = base / "escape.tar"
+    with tarfile.open(archive2, "w") as tar_file:
+        info = tarfile.TarInfo("escape/pwned.txt")
+        info.size = 1
+        tar_file.addfile(info, io.BytesIO(b"0"))
+    with pytest.raises(archives.UnsafeArchiveError):
+        archives.unpack_archive(filename=archive2, extract_dir=extract_dir)
+    assert not (base / "pwned.txt").exists()
+
+    # Cleanup
+    shutil.rmtree(base)
+
+def test_unpack_archive_recursively_limits(temporary_directory):
+    """
+    Test the archives.unpack_archive-function with limits applying to the
+    entire nested tree.
+    """
+
+    archive = temporary_directory / "siblings.zip"
+    _make_nested_zip(archive, {f"inner{i}": "0" * 100 for i in range(5)})
+
+    # 5 inner archives + 5 members
+    with pytest.raises(archives.UnsafeArchiveError):
+        archives.unpack_archive_recursively(
+            filename=archive,
+            limits=archives.ExtractionLimits(max_members=9)
+        )
+    shutil.rmtree(temporary_directory / "siblings")
+    archives.unpack_archive_recursively(
+        filename=archive,
+        limits=archives.ExtractionLimits(max_members=10)
+    )
+
+    # Cleanup
+    archive.unlink()
+    shutil.rmtree(temporary_directory / "siblings")
+
+@pytest.mark.parametrize(
+    ("name", "mode", "expected_format"),
+    [
+        ("example.tar.gz", "w:gz", "gztar"),
+        ("example.tgz", "w:gz", "gztar"),
+        ("example.tar.bz2", "w:bz2", "bztar"),
+        ("example.tar.xz", "w:xz", "xztar"),
+        ("example.tar", "w", "tar"),
+        ("example.tar", "w:gz", "gztar"),
+    ]
+)
+def test_get_archive_format_tar(
+    temporary_directory, name, mode, expected_format
+):
+    """Test the archives.get_archive_format-function for tar-archives."""
+
+    archive = temporary_directory / name
+    with tarfile.open(archive, mode) as tar_file:
+        info = tarfile.TarInfo("file.txt")
+        info.size = 4
+        tar_file.addfile(info, io.BytesIO(b"data"))
+
+    assert archives.get_archive_format(archive) == expected_format
+    assert archives.is_archive(archive)
+
+    # unpack into directory named without archive-suffixes
+    archives.unpack_archive(filename=archive, keep_archive=False)
+    extract_dir = temporary_directory / "example"
+    assert (extract_dir / "file.txt").read_bytes() == b"data"
+
+    # Cleanup
+    shutil.rmtree(extract_dir)
+
+def test_get_archive_format_sniffing(temporary_directory):
+    """
+    Test the archives.get_archive_format-function for files where the
+    suffix does not match the content.
+    """
+
+    # zip-archive without archive-suffix
+    archive = temporary_directory / "example"
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("file.txt", "data")
+    assert archives.get_archive_format(archive) is None
+    assert not archives.is_archive(archive)
+
+    # gzip-compressed file which is not a tar-archive
+    compressed = temporary_directory / "example.gz"
+    compressed.write_bytes(gzip.compress(b"data" * 100))
+    assert archives.get_archive_format(compressed) is None
+
+    # Cleanup
+    archive.unlink()
+    compressed.unlink()
+
+def test_unpack_archive_recursively_zip_based_formats(temporary_directory):
+    """
+    Test that files which are zip-archives internally (e.g., docx or
+    jar) are left untouched by archives.unpack_archive_recursively.
+    """
+
+    sip = temporary_directory / "sip_zip_based.zip"
+    payloads = {}
+    for name in ("report.docx", "lib.jar"):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zip_file:
+            zip_file.writestr("[Content_Types].xml", "<Types/>")
+            zip_file.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0")
+        payloads[name] = buffer.getvalue()
+    with zipfile.ZipFile(sip, "w") as zip_file:
+        for name, payload in payloads.items():
+            zip_file.writestr(f"data/{name}", payload)
+
+    archives.unpack_archive_recursively(filename=sip)
+    extract_dir = temporary_directory / "sip_zip_based" / "data"
+    assert sorted(p.name for p in extract_dir.iterdir()) == sorted(payloads)
+    for name, payload in payloads.items():
+        assert (extract_dir / name).read_bytes() == payload
+        assert not archives.is_archive(extract_dir / name)
+
+    # Cleanup
+    sip.unlink()
+    shutil.rmtree(temporary_directory / "sip_zip_based")
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["**/*", "*", "*.zip", "a/*", "**/b/*", "a/**/*.zip", "*/*"]
+)
+def test_iter_archives_pattern(temporary_directory, pattern):
+    """
+    Test the archives.iter_archives-function against Path.glob for
+    different patterns.
+    """
+
+    root = temporary_directory / "tree"
+    for archive in [
+        root / "x.zip",
+        root / "a" / "y.zip",
+        root / "a" / "b" / "z.zip",
+        root / "c" / "b" / "w.tar",
+    ]:
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr("file.txt", "data")
+    write_test_file(path=root / "a" / "file.txt")
+
+    result = archives.iter_archives(root, pattern)
+    assert not isinstance(result, list)
+    assert sorted(result) == sorted(
+        p for p in root.glob(pattern) if archives.is_archive(p)
+    )
+
+    # Cleanup
+    shutil.rmtree(root)
+
+@pytest.mark.parametrize(
+    "archive_format", ["zip", "tar", "gztar", "bztar", "xztar"]
+)
+def test_write_archive(temporary_directory, archive_format):
+    """Test the archives.write_archive-function with a binary stream."""
+
+    # Create directory
+    test_archive_dir = temporary_directory / "data"
+    write_test_file(path=test_archive_dir / "sub" / "file1.txt", mkdir=True)
+    write_test_file(path=test_archive_dir / "file2.txt")
+
+    buffer = io.BytesIO()
+    archives.write_archive(
+        test_archive_dir, buffer, archive_format, compresslevel=1
+    )
+    assert not buffer.closed
+
+    # Unpack the created archive to ensure its proper format
+    # the actual format is identified by the content
+    test_archive = temporary_directory / "data.tar"
+    test_archive.write_bytes(buffer.getvalue())
+    assert archives.get_archive_format(test_archive) == archive_format
+    extract_dir = temporary_directory / "extracted"
+    archives.unpack_archive(test_archive, extract_dir, keep_archive=False)
+    assert (extract_dir / "sub" / "file1.txt").is_file()
+    assert (extract_dir / "file2.txt").is_file()
+
+    # Cleanup
+    shutil.rmtree(extract_dir)
+    shutil.rmtree(test_archive_dir)
+
+def test_write_archive_pipe(temporary_directory):
+    """
+    Test the archives.write_archive-function with a non-seekable stream.
+    """
+
+    test_archive_dir = temporary_directory / "data"
+    write_test_file(path=test_archive_dir / "file.txt", mkdir=True)
+
+    read_fd, write_fd = os.pipe()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with open(read_fd, "rb") as reader:
+            data = executor.submit(reader.read)
+            with open(write_fd, "wb") as writer:
+                archives.write_archive(test_archive_dir, writer)
+            data = data.result()
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zip_file:
+        assert zip_file.namelist() == ["file.txt"]
+
+    # Cleanup
+    shutil.rmtree(test_archive_dir)
+
+@pytest.mark.parametrize(
+    "archive_format", [".zip", ".tar", ".gztar", ".bztar", ".xztar"]
+)
+def test_make_archive_workers(temporary_directory, archive_format):
+    """
+    Test the archives.make_archive-function with parallel compression.
+    """
+
+    # Create directory with a file spanning multiple compression blocks
+    test_archive_dir = temporary_directory / "data"
+    (test_archive_dir / "sub").mkdir(parents=True)
+    large_file = test_archive_dir / "sub" / "large.bin"
+    large_file.write_bytes(os.urandom(1024) * 5 * 1024)
+    for i in range(5):
+        (test_archive_dir / f"file{i}.txt").write_text(f"{i}" * 1000)
+
+    test_archive = archives.make_archive(
+        test_archive_dir,
+        archive_format=archive_format,
+        dir_name=temporary_directory / "subfolder",
+        workers=4
+    )
+    assert test_archive.is_file()
+    assert archives.get_archive_format(test_archive) \
+        == archive_format.lstrip(".")
+    if archive_format == ".zip":
+        with zipfile.ZipFile(test_archive) as zip_file:
+            assert zip_file.testzip() is None
+
+    # Unpack the created archive and compare contents
+    extract_dir = temporary_directory / "extracted"
+    archives.unpack_archive(test_archive, extract_dir, keep_archive=False)
+    assert (extract_dir / "sub" / "large.bin").read_bytes() \
+        == large_file.read_bytes()
+    for i in range(5):
+        assert (extract_dir / f"file{i}.txt").read_text() == f"{i}" * 1000
+
+    # Cleanup
+    shutil.rmtree(extract_dir)
+    shutil.rmtree(test_archive_dir)
+    shutil.rmtree(temporary_directory / "subfolder")
+
+def test_async_archiver(temporary_directory):
+    """Test the archives.AsyncArchiver-class."""
+
+    archive = temporary_directory / "siblings.zip"
+    _make_nested_zip(archive, {f"inner{i}": f"{i}" for i in range(3)})
+    extract_dir = temporary_directory / "siblings"
+
+    async def run():
+        async with archives.AsyncArchiver(max_concurrency=2) as archiver:
+            assert await archiver.list_archives(temporary_directory) == [
+                archive
+            ]
+            unpacked = [
+                path async for path in
+                archiver.iter_unpack_archive_recursively(archive, workers=2)
+            ]
+            packed = await archiver.make_archive(
+                extract_dir, ".tar", dir_name=temporary_directory / "packed"
+            )
+            return unpacked, packed
+
+    unpacked, packed = asyncio.run(run())
+
+    assert unpacked == [archive] + [
+        extract_dir / f"inner{i}.zip" for i in range(3)
+    ]
+    for i in range(3):
+        assert (extract_dir / f"inner{i}" / "file.txt").read_text() == f"{i}"
+    assert archives.get_archive_format(packed) == "tar"
+
+    # Cleanup
+    archive.unlink()
+    shutil.rmtree(extract_dir)
+    shutil.rmtree(temporary_directory / "packed")
+
+def test_async_archiver_cancel(temporary_directory):
+    """Test cancellation of operations of the archives.AsyncArchiver."""
+
+    archive = temporary_directory / "large.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("file.bin", b"0" * 50_000_000)
+    extract_dir = temporary_directory / "large"
+
+    async def run():
+        async with archives.AsyncArchiver() as archiver:
+            task = asyncio.create_task(
+                archiver.unpack_archive(archive, chunk_size=1024)
+            )
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(run())
+
+    # partially extracted member is removed
+    assert not (extract_dir / "file.bin").exists()
+
+    # Cleanup
+    archive.unlink()
+    shutil.rmtree(extract_dir)
+
+@pytest.mark.parametrize("own_executor", [True, False])
+def test_async_archiver_close(temporary_directory, own_executor):
+    """
+    Test that closing an archives.AsyncArchiver cancels and awaits
+    running operations.
+    """
+
+    archive = temporary_directory / "large.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("file.bin", b"0" * 50_000_000)
+    extract_dir = temporary_directory / "large"
+    executor = None if own_executor else ThreadPoolExecutor(max_workers=1)
+
+    async def run():
+        archiver = archives.AsyncArchiver(executor=executor)
+        task = asyncio.create_task(
+            archiver.unpack_archive(archive, chunk_size=1024)
+        )
+        await asyncio.sleep(0.05)
+        await asyncio.get_running_loop().run_in_executor(
+            None, archiver.close
+        )
+        # the operation has stopped before close returned
+        assert not (extract_dir / "file.bin").exists()
+        with pytest.raises(archives.ArchiveOperationCancelled):
+            await task
+
+    asyncio.run(run())
+    if executor is not None:
+        executor.shutdown()
+
+    # Cleanup
+    archive.unlink()
+    shutil.rmtree(extract_dir)
+
+@pytest.mark.parametrize(
+    ("workers", "use_processes"), [(None, False), (2, False), (2, True)]
+)
+def test_unpack_archive_recursively_events(
+    temporary_directory, workers, use_processes
+):
+    """
+    Test the on_event-callback of the archives.unpack_archive_recursively-
+    function and the archives.ArchiveStatistics-collector.
+    """
+
+    archive = temporary_directory / "siblings.zip"
+    _make_nested_zip(archive, {f"inner{i}": f"{i}" * 10 for i in range(3)})
+    extract_dir = temporary_directory / "siblings"
+
+    events = []
+    statistics = archives.ArchiveStatistics(keep_slowest=2)
+
+    def on_event(event):
+        events.append(event)
+        statistics(event)
+
+    archives.unpack_archive_recursively(
+        archive, workers=workers, use_processes=use_processes,
+        on_event=on_event
+    )
+
+    # every archive reports start and finish with its nesting depth
+    finished = {
+        event.archive: event for event in events
+        if event.kind == "archive_finish"
+    }
+    assert finished[archive].depth == 0
+    assert finished[archive].members == 3
+    for i in range(3):
+        event = finished[extract_dir / f"inner{i}.zip"]
+        assert event.depth == 1
+        assert event.members == 1
+        assert event.size == 10
+    assert len([e for e in events if e.kind == "archive_start"]) == 4
+    member_events = [e for e in events if e.kind == "member_finish"]
+    assert len(member_events) == 6
+    assert all(e.duration >= 0 for e in member_events)
+
+    # statistics are summarized per level
+    assert statistics.levels[1].archives == 3
+    assert statistics.levels[1].size == 30
+    assert statistics.total.archives == 4
+    assert statistics.total.members == 6
+    assert len(statistics.slowest_members) == 2
+    assert statistics.summary()["levels"][1]["size"] == 30
+
+    # Cleanup
+    archive.unlink()
+    shutil.rmtree(extract_dir)
+
+@pytest.mark.parametrize(
+    ("archive_format", "workers"),
+    [(".zip", None), (".zip", 2), (".gztar", None)]
+)
+def test_make_archive_events(temporary_directory, archive_format, workers):
+    """Test the on_event-callback of the archives.make_archive-function."""
+
+    test_archive_dir = temporary_directory / "data"
+    (test_archive_dir / "sub").mkdir(parents=True)
+    (test_archive_dir / "sub" / "file1.txt").write_text("a" * 100)
+    (test_archive_dir / "file2.txt").write_text("b" * 50)
+
+    statistics = archives.ArchiveStatistics()
+    test_archive = archives.make_archive(
+        test_archive_dir,
+        archive_format=archive_format,
+        dir_name=temporary_directory / "packed",
+        workers=workers,
+        on_event=statistics
+    )
+
+    assert statistics.levels[0].archives == 1
+    assert statistics.total.members == 3
+    assert statistics.total.size == 150
+    assert {
+        event.member for event in statistics.slowest_members
+    } == {"sub", "sub/file1.txt", "file2.txt"}
+    assert all(
+        event.archive == test_archive.absolute()
+        for event in statistics.slowest_members
+    )
+
+    # Cleanup
+    shutil.rmtree(test_archive_dir)
+    shutil.rmtree(temporary_directory / "packed")
+
+def _make_bag_directory(path):
+    """Write a small bag-like directory structure at path."""
+    (path / "bag" / "data").mkdir(parents=True)
+    (path / "bag" / "bag-info.txt").write_text("Source-Organization: test")
+    (path / "bag" / "manifest-sha256.txt").write_text("abc  data/file.txt")
+    (path / "bag" / "data" / "file.txt").write_text("payload" * 1000)
+
+@pytest.mark.parametrize("archive_format", [".zip", ".tar", ".gztar"])
+def test_list_and_open_members(temporary_directory, archive_format):
+    """
+    Test the archives.list_members- and archives.open_member-functions.
+    """
+
+    test_archive_dir = temporary_directory / "data"
+    _make_bag_directory(test_archive_dir)
+    test_archive = archives.make_archive(
+        test_archive_dir, archive_format=archive_format,
+        dir_name=temporary_directory / "packed"
+    )
+
+    members = {
+        member.name: member for member in archives.list_members(test_archive)
+    }
+    # tar-archives generated by shutil contain the root directory
+    members.pop(".", None)
+    assert set(members) == {
+        "bag", "bag/data", "bag/bag-info.txt", "bag/manifest-sha256.txt",
+        "bag/data/file.txt"
+    }
+    assert members["bag/data"].is_dir
+    assert members["bag/data/file.txt"].size == 7000
+
+    with archives.open_member(test_archive, "bag/bag-info.txt") as file:
+        assert file.read() == b"Source-Organization: test"
+    with pytest.raises(KeyError):
+        with archives.open_member(test_archive, "bag/unknown.txt"):
+            pass
+    with pytest.raises(ValueError):
+        with archives.open_member(test_archive, "bag/data"):
+            pass
+
+    # Cleanup
+    shutil.rmtree(test_archive_dir)
+    shutil.rmtree(temporary_directory / "packed")
+
+@pytest.mark.parametrize("archive_format", [".zip", ".gztar"])
+@pytest.mark.parametrize(
+    "member_filter",
+    ["bag/*.txt", lambda name: not name.startswith("bag/data")]
+)
+def test_unpack_archive_member_filter(
+    temporary_directory, archive_format, member_filter
+):
+    """
+    Test the archives.unpack_archive-function with a member_filter.
+    """
+
+    test_archive_dir = temporary_directory / "data"
+    _make_bag_directory(test_archive_dir)
+    test_archive = archives.make_archive(
+        test_archive_dir, archive_format=archive_format,
+        dir_name=temporary_directory / "packed"
+    )
+
+    extract_dir = temporary_directory / "extracted"
+    archives.unpack_archive(
+        test_archive, extract_dir,
+        member_filter=member_filter,
+        limits=archives.ExtractionLimits(max_total_size=1000)
+    )
+    assert (extract_dir / "bag" / "bag-info.txt").is_file()
+    assert (extract_dir / "bag" / "manifest-sha256.txt").is_file()
+    assert not (extract_dir / "bag" / "data").exists()
+
+    # Cleanup
+    shutil.rmtree(extract_dir)
+    shutil.rmtree(test_archive_dir)
+    shutil.rmtree(temporary_directory / "packed")
+
+@pytest.mark.parametrize(
+    ("archive_format", "workers"),
+    [(".zip", None), (".zip", 2), (".tar", None), (".gztar", 2)]
+)
+def test_archive_digests(temporary_directory, archive_format, workers):
+    """
+    Test the digests-argument of the archives.make_archive- and
+    archives.unpack_archive-functions.
+    """
+
+    test_archive_dir = temporary_directory / "data"
+    _make_bag_directory(test_archive_dir)
+    expected = {
+        "bag/bag-info.txt": "Source-Organization: test",
+        "bag/manifest-sha256.txt": "abc  data/file.txt",
+        "bag/data/file.txt": "payload" * 1000,
+    }
+    expected = {
+        name: {
+            "sha256": hashlib.sha256(content.encode()).hexdigest(),
+            "md5": hashlib.md5(content.encode()).hexdigest(),
+        }
+        for name, content in expected.items()
+    }
+
+    manifest = {}
+    test_archive = archives.make_archive(
+        test_archive_dir, archive_format=archive_format,
+        dir_name=temporary_directory / "packed", workers=workers,
+        digests=("sha256", "md5"), manifest=manifest
+    )
+    assert manifest == expected
+
+    extract_dir = temporary_directory / "extracted"
+    assert archives.unpack_archive(
+        test_archive, extract_dir, keep_archive=False,
+        digests=("sha256", "md5"), verify=True
+    ) == expected
+    assert not test_archive.exists()
+
+    with pytest.raises(ValueError):
+        archives.unpack_archive(test_archive, digests=("unknown",))
+
+    # Cleanup
+    shutil.rmtree(extract_dir)
+    shutil.rmtree(test_archive_dir)
+    shutil.rmtree(temporary_directory / "packed")
+
+def test_unpack_archive_verify(temporary_directory):
+    """
+    Test the verify-argument of the archives.unpack_archive-function
+    with corrupt archives.
+    """
+
+    # zip-archive with a corrupt member that is not extracted
+    zip_archive = temporary_directory / "corrupt.zip"
+    with zipfile.ZipFile(zip_archive, "w") as zip_file:
+        zip_file.writestr("bag-info.txt", "info")
+        zip_file.writestr("data.txt", "payload")
+    data = zip_archive.read_bytes()
+    zip_archive.write_bytes(data.replace(b"payload", b"PAYLOAD"))
+
+    # gztar-archive with a corrupt checksum in the gzip-trailer
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar_file:
+        info = tarfile.TarInfo("data.txt")
+        info.size = 7
+        tar_file.addfile(info, io.BytesIO(b"payload"))
+    data = bytearray(gzip.compress(buffer.getvalue()))
+    data[-8] ^= 0xFF
+    tar_archive = temporary_directory / "corrupt.tar.gz"
+    tar_archive.write_bytes(bytes(data))
+
+    extract_dir = temporary_directory / "extracted"
+    archives.unpack_archive(
+        zip_archive, extract_dir, member_filter="bag-info.txt"
+    )
+    for archive, member_filter in (
+        (zip_archive, "bag-info.txt"), (tar_archive, None)
+    ):
+        with pytest.raises(archives.ArchiveIntegrityError):
+            archives.unpack_archive(
+                archive, extract_dir, keep_archive=False,
+                member_filter=member_filter, verify=True
+            )
+        assert archive.exists()
+
+    # Cleanup
+    shutil.rmtree(extract_dir)
+    zip_archive.unlink()
+    tar_archive.unlink()
@@ -0,0 +1,143 @@
+"""
+Test module for the AsyncVinegar-class.
+"""
+
+import asyncio
+import threading
+import time
+from dcm_s11n.vinegar import (
+    AsyncVinegar, AsyncDBInterface, Vinegar, MemoryDB, LogDB
+)
+
+
+def test_sync_db(log_path):
+    """Test AsyncVinegar with an automatically adapted synchronous db."""
+
+    db = LogDB(log_path)
+
+    async def run():
+        async with AsyncVinegar(db, codec="zlib") as vinegar:
+            await vinegar.dump({"a": 1}, "test")
+            await vinegar.dump_many({"test2": [1, 2], "test3": "a" * 2000})
+            assert await vinegar.load("test") == {"a": 1}
+            assert await vinegar.load_many(["test3", "unknown", "test2"]) == [
+                "a" * 2000, None, [1, 2]
+            ]
+            assert len(await vinegar.find()) == 3
+            assert (await vinegar.find("test"))["tag"] == "test"
+            await vinegar.remove("test")
+            assert await vinegar.load("test") is None
+
+    asyncio.run(run())
+
+    # records are compatible with Vinegar
+    assert Vinegar(db).load("test2") == [1, 2]
+    db.close()
+
+
+def test_async_db():
+    """Test AsyncVinegar with a native asynchronous db."""
+
+    class AsyncMemoryDB(AsyncDBInterface):
+        def __init__(self):
+            self._db = {}
+        async def insert(self, obj, tag):
+            await asyncio.sleep(0)
+            self._db[tag] = obj
+        async def find(self, tag):
+            await asyncio.sleep(0)
+            if tag in self._db:
+                return {"tag": tag, "obj": self._db[tag]}
+            return None
+        async def all(self):
+            return [await self.find(tag) for tag in self._db]
+        async def remove(self, tag):
+            self._db.pop(tag, None)
+
+    async def run():
+        async with AsyncVinegar(AsyncMemoryDB()) as vinegar:
+            await vinegar.dump_many({"test": 1, "test2": 2})
+            assert await vinegar.load_many(["test2", "test"]) == [2, 1]
+            await vinegar.remove("test")
+            assert await vinegar.find() == [
+                {"tag": "test2", "obj": await vinegar.dumps(2)}
+            ]
+
+    asyncio.run(run())
+
+
+def test_out_of_band_buffers(temporary_directory):
+    """Test AsyncVinegar with out-of-band buffers in a buffer directory."""
+
+    db = MemoryDB()
+    buffer_directory = temporary_directory / "async_buffers"
+    large = bytearray(range(256)) * 100
+
+    async def run():
+        async with AsyncVinegar(
+            db, buffer_directory=buffer_directory, buffer_threshold=1024
+        ) as vinegar:
+            await vinegar.dump({"large": large}, "test")
+            assert len(db.find("test")["obj"]) < 1024
+            assert await vinegar.load("test") == {"large": large}
+
+    asyncio.run(run())
+
+    # records and buffers are compatible with Vinegar
+    assert len(list(buffer_directory.glob("*/*"))) == 1
+    assert Vinegar(db, buffer_directory=buffer_directory).load("test") == {
+        "large": large
+    }
+
+
+class ThreadRecorder:
+    """Records the threads that it is serialized in."""
+    threads = set()
+
+    def __reduce__(self):
+        self.threads.add(threading.get_ident())
+        return (ThreadRecorder, ())
+
+
+def test_event_loop_not_blocked():
+    """Test that serialization does not run in the event loop."""
+
+    async def run():
+        async with AsyncVinegar(MemoryDB()) as vinegar:
+            await vinegar.dump(ThreadRecorder(), "test")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert ThreadRecorder.threads
+    assert loop_thread not in ThreadRecorder.threads
+
+
+class SlowObject:
+    """Takes a while to be serialized."""
+
+    def __reduce__(self):
+        time.sleep(0.3)
+        return (SlowObject, ())
+
+
+def test_close_not_blocking():
+    """Test that leaving the context does not block the event loop."""
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        async with AsyncVinegar(MemoryDB()) as vinegar:
+            dumps = asyncio.create_task(vinegar.dumps(SlowObject()))
+            await asyncio.sleep(0.01)
+        ticker.cancel()
+        await dumps
+        return ticks
+
+    assert asyncio.run(run()) >= 10
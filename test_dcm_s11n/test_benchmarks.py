@@ -0,0 +1,74 @@
+"""
+Test module for the benchmark suite.
+"""
+
+import json
+from dcm_s11n.archives import unpack_archive_recursively
+from dcm_s11n.benchmarks import (
+    nested_archive_tree, synthetic_class, vinegar_case, archives_case,
+    run_benchmarks, compare_results
+)
+
+
+def test_nested_archive_tree(temporary_directory):
+    """Test generator for nested archives."""
+
+    tree = nested_archive_tree(
+        temporary_directory / "benchmark_tree", depth=2, fan_out=2,
+        files=2, file_size=64
+    )
+    assert tree.archives == 7
+    assert tree.files == 14
+    assert tree.size == 14 * 64
+
+    unpack_archive_recursively(
+        tree.path, temporary_directory / "benchmark_tree" / "unpacked"
+    )
+    assert len(
+        list((temporary_directory / "benchmark_tree" / "unpacked").iterdir())
+    ) == tree.files
+
+
+def test_synthetic_class():
+    """Test that synthetic classes are deterministic."""
+
+    assert synthetic_class(1).attribute_0 == synthetic_class(1).attribute_0
+    assert synthetic_class(1).attribute_0 != synthetic_class(2).attribute_0
+    assert synthetic_class(1)(2).describe() == "Synthetic1: 2"
+
+
+def test_run_benchmarks(temporary_directory):
+    """Test running benchmark cases and comparing results."""
+
+    output = temporary_directory / "benchmarks.json"
+    document = run_benchmarks(
+        [
+            (
+                vinegar_case,
+                {
+                    "backend": "memory", "records": 10, "payload": "data",
+                    "samples": 5
+                }
+            ),
+            (archives_case, {"depth": 1, "fan_out": 2, "repeat": 1}),
+        ],
+        output,
+        isolate=False
+    )
+    assert json.loads(output.read_text(encoding="utf-8")) == document
+    assert [
+        (r["suite"], r["operation"]) for r in document["results"]
+    ] == [
+        ("vinegar", "dump"), ("vinegar", "load"), ("vinegar", "find"),
+        ("vinegar", "all"), ("archives", "unpack"), ("archives", "pack"),
+    ]
+    for result in document["results"]:
+        assert 0 < result["latency"]["p50"] <= result["latency"]["max"]
+        assert result["throughput"] > 0
+
+    assert compare_results(document, document) == []
+    slower = json.loads(json.dumps(document))
+    slower["results"][0]["latency"]["p50"] *= 2
+    regressions = compare_results(document, slower)
+    assert len(regressions) == 1
+    assert regressions[0]["operation"] == "dump"
@@ -0,0 +1,41 @@
+"""
+Test module for the buffers-module of vinegar.
+"""
+
+import hashlib
+
+from dcm_s11n.vinegar.buffers import BufferStore
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_put_and_get(temporary_directory):
+    """Test storing and memory-mapping buffers."""
+
+    store = BufferStore(temporary_directory / "buffers_put")
+    data = bytes(range(256)) * 100
+    store.put(_digest(data), memoryview(data))
+    store.put(_digest(data), memoryview(data))
+    assert list(store.digests()) == [_digest(data)]
+
+    view = store.get(_digest(data))
+    assert view == data
+    # private mapping: changes are not written back
+    view[0] = 1
+    assert store.get(_digest(data)) == data
+
+    store.put(_digest(b""), b"")
+    assert store.get(_digest(b"")) == b""
+
+
+def test_collect_garbage(temporary_directory):
+    """Test removal of unreferenced buffers."""
+
+    store = BufferStore(temporary_directory / "buffers_gc")
+    for data in (b"a", b"b", b"c"):
+        store.put(_digest(data), data)
+    assert store.collect_garbage([_digest(b"b")]) == 2
+    assert list(store.digests()) == [_digest(b"b")]
+    assert store.collect_garbage([_digest(b"b")]) == 0
@@ -0,0 +1,70 @@
+"""
+Test module for the compression-module of vinegar.
+"""
+
+import zlib
+
+import pytest
+from dcm_s11n.vinegar import compression
+
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma", "bz2"])
+def test_roundtrip(codec):
+    """Test compression and decompression for builtin codecs."""
+
+    data = b"0123456789" * 1000
+    compressed = compression.compress(data, compression.get_codec(codec))
+    assert compressed.startswith(compression.MAGIC)
+    assert len(compressed) < len(data)
+    assert compression.decompress(compressed) == data
+
+
+def test_threshold():
+    """Test that small payloads are not compressed."""
+
+    data = b"0123456789" * 10
+    codec = compression.get_codec("zlib")
+    assert compression.compress(data, codec, threshold=101) == data
+    assert compression.compress(data, codec, threshold=100) != data
+
+
+def test_incompressible():
+    """Test that payloads are not compressed if size would increase."""
+
+    data = bytes(range(16))
+    assert compression.compress(
+        data, compression.get_codec("lzma")
+    ) == data
+
+
+def test_decompress_raw():
+    """Test that payloads without header are passed through."""
+
+    assert compression.decompress(b"\x80\x04data") == b"\x80\x04data"
+
+
+def test_unknown_codec():
+    """Test errors for unknown codecs."""
+
+    with pytest.raises(ValueError):
+        compression.get_codec("unknown")
+    with pytest.raises(ValueError):
+        compression.decompress(compression.MAGIC + b"\xff" + b"data")
+
+
+def test_register_codec():
+    """Test registration of custom codecs."""
+
+    codec = compression.Codec(
+        "zlib-9", 200,
+        lambda b: zlib.compress(b, level=9), zlib.decompress
+    )
+    compression.register_codec(codec)
+    assert compression.get_codec("zlib-9") == codec
+    assert compression.decompress(
+        compression.compress(b"data" * 10, codec)
+    ) == b"data" * 10
+    with pytest.raises(ValueError):
+        compression.register_codec(
+            compression.Codec("other", 200, bytes, bytes)
+        )
@@ -0,0 +1,71 @@
+"""
+Test module for the DedupDB-class.
+"""
+
+import pytest
+from dcm_s11n.vinegar import DedupDB, MemoryDB, SQLiteDB
+
+
+def test_deduplication():
+    """Test that identical objs are stored once and reference-counted."""
+
+    backend = MemoryDB()
+    db = DedupDB(backend)
+    db.insert(b"a" * 100, "tag1")
+    db.insert_many({"tag2": b"a" * 100, "tag3": b"b"})
+    assert db.payloads == 2
+    assert len(backend.all()) == 5
+    assert db.find("tag2") == {"tag": "tag2", "obj": b"a" * 100}
+    assert db.find_many(["tag3", "tag4"]) == [
+        {"tag": "tag3", "obj": b"b"}, None
+    ]
+    assert list(db.tags()) == ["tag1", "tag2", "tag3"]
+
+    # payload is kept while referenced
+    db.remove("tag1")
+    assert db.find("tag2")["obj"] == b"a" * 100
+    assert db.payloads == 2
+
+    # payload is removed with last reference
+    db.insert(b"b", "tag2")
+    assert db.payloads == 1
+    assert sorted(r["tag"] for r in backend.all()) == [
+        DedupDB.PAYLOAD_PREFIX + db._references["tag3"], "tag2", "tag3"
+    ]
+    db.remove("tag2")
+    db.remove("tag3")
+    assert db.payloads == 0
+    assert backend.all() == []
+
+
+def test_reserved_tags():
+    """Test that payload-tags cannot be used directly."""
+
+    with pytest.raises(ValueError):
+        DedupDB(MemoryDB()).insert(b"a", DedupDB.PAYLOAD_PREFIX + "a")
+
+
+def test_persistence_and_garbage(sqlite_path):
+    """
+    Test that DedupDB rebuilds reference counts from the underlying db
+    and removes orphaned payloads.
+    """
+
+    db = DedupDB(SQLiteDB(sqlite_path))
+    db.insert_many({"tag1": b"a", "tag2": b"a", "tag3": b"b"})
+    db.close()
+
+    backend = SQLiteDB(sqlite_path)
+    db = DedupDB(backend)
+    assert db.payloads == 2
+    db.remove("tag1")
+    assert db.find("tag2")["obj"] == b"a"
+    db.remove("tag2")
+    assert db.payloads == 1
+
+    # simulate interrupted write
+    backend.insert(b"c", DedupDB.PAYLOAD_PREFIX + "0" * 64)
+    assert db.collect_garbage() == 1
+    assert db.collect_garbage() == 0
+    assert db.find("tag3")["obj"] == b"b"
+    db.close()
@@ -0,0 +1,173 @@
+"""
+Test module for the LockedDB- and ReadWriteLock-classes.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import threading
+import time
+import pytest
+from dcm_s11n.vinegar import (
+    Vinegar, LockedDB, ReadWriteLock, MemoryDB, SQLiteDB,
+    VersionConflictError
+)
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+def test_read_write_lock():
+    """Test reentrancy and exclusivity of ReadWriteLock."""
+
+    lock = ReadWriteLock()
+    with lock.write():
+        with lock.write():
+            with lock.read():
+                pass
+    with lock.read():
+        with lock.read():
+            with pytest.raises(RuntimeError):
+                with lock.write():
+                    pass
+
+    # writer waits for reader
+    events = []
+    with lock.read():
+        writer = threading.Thread(
+            target=lambda: lock.write().__enter__() or events.append("w")
+        )
+        writer.start()
+        writer.join(0.1)
+        assert events == []
+        events.append("r")
+    writer.join()
+    assert events == ["r", "w"]
+
+
+def test_dump_versioned():
+    """Test optimistic versioning with Vinegar.dump_versioned."""
+
+    vinegar = Vinegar(LockedDB(MemoryDB()))
+    assert vinegar.version("test") is None
+    version = vinegar.dump_versioned(1, "test", None)
+    assert vinegar.version("test") == version
+    with pytest.raises(VersionConflictError):
+        vinegar.dump_versioned(2, "test", None)
+    assert vinegar.dump_versioned(2, "test", version) != version
+    with pytest.raises(VersionConflictError):
+        vinegar.dump_versioned(3, "test", version)
+    assert vinegar.load("test") == 2
+
+
+def test_concurrent_threads():
+    """Test concurrent read-modify-write from threads."""
+
+    vinegar = Vinegar(LockedDB(MemoryDB()))
+    vinegar.dump(0, "counter")
+
+    def increment(_):
+        while True:
+            version = vinegar.version("counter")
+            value = vinegar.loads(vinegar.find("counter")["obj"])
+            try:
+                vinegar.dump_versioned(value + 1, "counter", version)
+                return
+            except VersionConflictError:
+                continue
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(increment, range(200)))
+    assert vinegar.load("counter") == 200
+
+
+def _increment_in_process(path, n):
+    db = LockedDB(SQLiteDB(path), path.with_suffix(".lock"))
+    vinegar = Vinegar(db)
+    for _ in range(n):
+        with db.transaction():
+            vinegar.dump(vinegar.load("counter") + 1, "counter")
+    db.close()
+
+
+def test_concurrent_processes(sqlite_path):
+    """Test read-modify-write from multiple processes with file locks."""
+
+    db = LockedDB(SQLiteDB(sqlite_path), sqlite_path.with_suffix(".lock"))
+    Vinegar(db).dump(0, "counter")
+
+    processes = [
+        multiprocessing.Process(
+            target=_increment_in_process, args=(sqlite_path, 50)
+        )
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert Vinegar(db).load("counter") == 200
+    db.close()
+
+
+@pytest.mark.skipif(fcntl is None, reason="requires fcntl")
+def test_file_lock_outside_condition(temporary_directory):
+    """
+    Test that a thread waiting for the file lock does not block other
+    threads from using the lock.
+    """
+
+    path = temporary_directory / "test_db_locked_wait.lock"
+    lock = ReadWriteLock(path)
+    with open(path, "a+b") as other:
+        # simulate other process
+        fcntl.flock(other.fileno(), fcntl.LOCK_EX)
+        entered = threading.Event()
+
+        def read():
+            with lock.read():
+                entered.set()
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        assert not entered.wait(0.1)
+        assert lock._condition.acquire(timeout=1)
+        lock._condition.release()
+        fcntl.flock(other.fileno(), fcntl.LOCK_UN)
+        reader.join()
+    assert entered.is_set()
+    lock.close()
+
+
+def _increment_file(lock, path, n):
+    for _ in range(n):
+        with lock.write():
+            value = int(path.read_text())
+            time.sleep(0.001)
+            path.write_text(str(value + 1))
+
+
+@pytest.mark.skipif(fcntl is None, reason="requires fcntl")
+def test_file_lock_forked_processes(temporary_directory):
+    """
+    Test that a ReadWriteLock used before forking excludes the forked
+    processes from each other.
+    """
+
+    counter = temporary_directory / "test_db_locked_counter.txt"
+    counter.write_text("0")
+    lock = ReadWriteLock(temporary_directory / "test_db_locked_fork.lock")
+    with lock.write():
+        pass
+
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_increment_file, args=(lock, counter, 20))
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert counter.read_text() == "80"
+    lock.close()
@@ -0,0 +1,97 @@
+"""
+Test module for the LogDB-class.
+"""
+
+from dcm_s11n.vinegar import LogDB
+
+
+def test_persistence(log_path):
+    """Test that LogDB restores its index from the log-file."""
+
+    db = LogDB(log_path)
+    db.insert(b"a", "tag1")
+    db.insert(b"b", "tag2")
+    db.insert(b"c", "tag1")
+    db.remove("tag2")
+    db.close()
+
+    db = LogDB(log_path)
+    assert db.find("tag1") == {"tag": "tag1", "obj": b"c"}
+    assert db.find("tag2") is None
+    assert db.all() == [{"tag": "tag1", "obj": b"c"}]
+    db.close()
+
+
+def test_truncated_entry(log_path):
+    """Test that LogDB discards an incomplete trailing entry."""
+
+    db = LogDB(log_path)
+    db.insert(b"a", "tag1")
+    db.insert(b"bbbb", "tag2")
+    db.close()
+    log_path.write_bytes(log_path.read_bytes()[:-2])
+
+    db = LogDB(log_path)
+    assert db.find("tag1") == {"tag": "tag1", "obj": b"a"}
+    assert db.find("tag2") is None
+    db.insert(b"b", "tag2")
+    assert db.find("tag2") == {"tag": "tag2", "obj": b"b"}
+    db.close()
+
+
+def test_compact(log_path):
+    """Test method LogDB.compact."""
+
+    db = LogDB(log_path)
+    db.insert(b"a" * 100, "tag1")
+    db.insert(b"b" * 100, "tag1")
+    db.insert(b"c", "tag2")
+    db.remove("tag2")
+    db.set_metadata("tag1", {"labels": {"a": "a"}})
+    db.set_metadata("tag1", {"labels": {}})
+    garbage = db.garbage
+    size = log_path.stat().st_size
+    db.close()
+
+    # garbage covers entire entries and is restored with the index
+    db = LogDB(log_path)
+    assert db.garbage == garbage
+    db.compact()
+    assert db.garbage == 0
+    assert log_path.stat().st_size == size - garbage
+    assert db.get_metadata("tag1") == {"labels": {}}
+    assert db.find("tag1") == {"tag": "tag1", "obj": b"b" * 100}
+    assert db.find("tag2") is None
+
+    # write after compaction and reload
+    db.insert(b"d", "tag3")
+    db.close()
+    db = LogDB(log_path)
+    assert sorted(r["tag"] for r in db.all()) == ["tag1", "tag3"]
+    db.close()
+
+
+def test_find_returns_views(log_path):
+    """
+    Test that LogDB returns memoryviews which remain valid after updates
+    and compaction.
+    """
+
+    db = LogDB(log_path)
+    db.insert(bytearray(b"a" * 10), "tag1")
+    db.insert(memoryview(b"b" * 10), "tag2")
+    record = db.find("tag1")
+    assert isinstance(record["obj"], memoryview)
+    assert record["obj"].readonly
+    assert record["obj"] == b"a" * 10
+
+    db.insert(b"c", "tag1")
+    db.remove("tag2")
+    assert record["obj"] == b"a" * 10
+    assert db.find("tag1")["obj"] == b"c"
+
+    db.compact()
+    assert record["obj"] == b"a" * 10
+    assert db.find("tag1")["obj"] == b"c"
+    db.close()
+    assert record["obj"] == b"a" * 10
@@ -0,0 +1,93 @@
+"""
+Test module for the SQLiteDB-class.
+"""
+
+import gc
+import sqlite3
+import threading
+import pytest
+from dcm_s11n.vinegar import SQLiteDB
+
+
+def test_wal_mode(sqlite_path):
+    """Test that SQLiteDB operates in WAL-mode."""
+
+    db = SQLiteDB(sqlite_path)
+    assert db._connection.execute(
+        "PRAGMA journal_mode"
+    ).fetchone()[0] == "wal"
+    db.close()
+
+
+def test_blob_storage(sqlite_path):
+    """Test that objects are returned as raw bytes."""
+
+    db = SQLiteDB(sqlite_path)
+    db.insert(bytes(range(256)), "tag")
+    assert db.find("tag") == {"tag": "tag", "obj": bytes(range(256))}
+    db.close()
+
+
+def test_shared_store(sqlite_path):
+    """Test that multiple connections share a single store."""
+
+    writer = SQLiteDB(sqlite_path)
+    reader = SQLiteDB(sqlite_path)
+
+    writer.insert(b"a", "tag")
+    assert reader.find("tag") == {"tag": "tag", "obj": b"a"}
+    writer.insert(b"b", "tag")
+    assert reader.find("tag") == {"tag": "tag", "obj": b"b"}
+    writer.remove("tag")
+    assert reader.find("tag") is None
+
+    writer.close()
+    reader.close()
+
+
+def test_threads(sqlite_path):
+    """
+    Test that every thread uses a separate connection which is closed
+    after the thread has ended.
+    """
+
+    db = SQLiteDB(sqlite_path)
+    barrier = threading.Barrier(4)
+    connections = {}
+    errors = []
+
+    def work(i):
+        try:
+            connections[i] = db._connection
+            barrier.wait(5)
+            for j in range(20):
+                db.insert_many(
+                    {f"tag{i}-{j}": bytes([i]), f"other{i}": b"x"}
+                )
+                assert db.find(f"tag{i}-{j}") == {
+                    "tag": f"tag{i}-{j}", "obj": bytes([i])
+                }
+            db.remove(f"other{i}")
+        except Exception as exc_info:  # pylint: disable=broad-exception-caught
+            errors.append(exc_info)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(set(connections.values())) == 4
+    assert len(list(db.tags())) == 80
+
+    # connections of ended threads are released
+    gc.collect()
+    assert len(db._connections) == 1
+    for connection in connections.values():
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+    db.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        db.find("tag0-0")
@@ -0,0 +1,111 @@
+"""
+Test module for the TinyDBInterface-class.
+"""
+
+import sys
+import json
+import subprocess
+from time import sleep
+
+import pytest
+
+pytest.importorskip("tinydb")
+from dcm_s11n.vinegar.db_tinydb import TinyDBInterface
+
+
+def _stored_tags(path):
+    if not path.is_file():
+        return []
+    return sorted(
+        r["tag"] for r in json.loads(path.read_text())["_default"].values()
+    )
+
+
+def test_atomic_write(tinydb_path):
+    """Test that the JSON-file is replaced without leftovers."""
+
+    db = TinyDBInterface(tinydb_path)
+    db.insert(b"a", "tag")
+    db.insert(b"b", "tag2")
+    db.remove("tag")
+    assert _stored_tags(tinydb_path) == ["tag2"]
+    assert list(tinydb_path.parent.glob("." + tinydb_path.name + "*")) == []
+    db.close()
+
+
+def test_write_behind_flush(tinydb_path):
+    """Test that buffered changes are only written on flush."""
+
+    db = TinyDBInterface(
+        tinydb_path, write_behind=True, max_dirty_records=None,
+        max_age=None
+    )
+    db.insert_many({"a": b"a", "b": b"b"})
+    db.insert(b"c", "c")
+    db.remove("a")
+    assert db.find("c") == {"tag": "c", "obj": b"c"}
+    assert _stored_tags(tinydb_path) == []
+
+    db.flush()
+    assert _stored_tags(tinydb_path) == ["b", "c"]
+    assert TinyDBInterface(tinydb_path).find("b") == {"tag": "b", "obj": b"b"}
+    db.close()
+
+
+def test_write_behind_max_dirty_records(tinydb_path):
+    """Test that changes are written after max_dirty_records."""
+
+    db = TinyDBInterface(
+        tinydb_path, write_behind=True, max_dirty_records=3, max_age=None
+    )
+    db.insert(b"a", "a")
+    db.insert(b"b", "b")
+    assert _stored_tags(tinydb_path) == []
+    db.insert(b"c", "c")
+    assert _stored_tags(tinydb_path) == ["a", "b", "c"]
+    db.insert_many({"d": b"d", "e": b"e"})
+    assert _stored_tags(tinydb_path) == ["a", "b", "c"]
+    db.insert_many({"f": b"f"})
+    assert _stored_tags(tinydb_path) == ["a", "b", "c", "d", "e", "f"]
+    db.close()
+
+
+def test_write_behind_max_age(tinydb_path):
+    """Test that changes are written once they exceed max_age."""
+
+    db = TinyDBInterface(
+        tinydb_path, write_behind=True, max_dirty_records=None, max_age=0.1
+    )
+    db.insert(b"a", "a")
+    assert _stored_tags(tinydb_path) == []
+    sleep(0.2)
+    # checked on next access
+    db.find("a")
+    assert _stored_tags(tinydb_path) == ["a"]
+    db.close()
+
+
+def test_write_behind_close(tinydb_path):
+    """Test that changes are written when leaving the context."""
+
+    with TinyDBInterface(tinydb_path, write_behind=True) as db:
+        db.insert(b"a", "a")
+        assert _stored_tags(tinydb_path) == []
+    assert _stored_tags(tinydb_path) == ["a"]
+
+
+def test_write_behind_exit(tinydb_path):
+    """Test that changes are written at interpreter exit."""
+
+    subprocess.run(
+        [
+            sys.executable, "-c",
+            "from pathlib import Path\n"
+            + "from dcm_s11n.vinegar.db_tinydb import TinyDBInterface\n"
+            + f"db = TinyDBInterface(Path('{tinydb_path}'), "
+            + "write_behind=True)\n"
+            + "db.insert(b'a', 'a')\n",
+        ],
+        check=True
+    )
+    assert _stored_tags(tinydb_path) == ["a"]
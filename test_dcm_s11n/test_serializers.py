@@ -0,0 +1,96 @@
+"""
+Test module for the serializers-module of vinegar.
+"""
+
+import json
+import pickle
+
+import pytest
+import dill
+from dcm_s11n.vinegar import serializers
+
+
+DEFAULT = [serializers.get_serializer(s) for s in ("pickle", "dill")]
+
+
+def _serializer_id(data):
+    assert data.startswith(serializers.MAGIC)
+    return data[len(serializers.MAGIC)]
+
+
+def test_pickle_fast_path():
+    """Test that plain objects are serialized with pickle."""
+
+    obj = {"a": [1, 2.5, None], "b": ("c", b"d"), "e": {"f"}}
+    data = serializers.dumps(obj, DEFAULT)
+    assert _serializer_id(data) == serializers.SERIALIZERS["pickle"].id
+    assert serializers.protocol(data) == 5
+    assert serializers.loads(data) == obj
+    assert serializers.loads(memoryview(data)) == obj
+
+
+def test_dill_fallback():
+    """Test that objects unsupported by pickle are serialized with dill."""
+
+    data = serializers.dumps(lambda x: 2 * x, DEFAULT)
+    assert _serializer_id(data) == serializers.SERIALIZERS["dill"].id
+    assert serializers.loads(data)(2) == 4
+
+
+def test_main_by_value():
+    """Test that classes from __main__ are not pickled by reference."""
+
+    cls = type("Example", (), {"__module__": "__main__", "value": 1})
+    data = serializers.dumps(cls, DEFAULT)
+    assert _serializer_id(data) == serializers.SERIALIZERS["dill"].id
+    with pytest.raises(pickle.PicklingError):
+        serializers.dumps(cls, DEFAULT[:1])
+
+
+def test_legacy_payload():
+    """Test that payloads without header are loaded with dill."""
+
+    data = dill.dumps({"a": 1})
+    assert serializers.loads(data) == {"a": 1}
+    assert serializers.loads(memoryview(data)) == {"a": 1}
+
+
+def test_unserializable():
+    """Test error if no serializer can handle an object."""
+
+    with pytest.raises(pickle.PicklingError):
+        serializers.dumps(
+            type("Example", (), {"__module__": "__main__"}), DEFAULT[:1]
+        )
+    with pytest.raises(ValueError):
+        serializers.dumps(1, [])
+
+
+def test_unknown_serializer():
+    """Test errors for unknown serializers."""
+
+    with pytest.raises(ValueError):
+        serializers.get_serializer("unknown")
+    with pytest.raises(ValueError):
+        serializers.loads(serializers.MAGIC + b"\xff" + b"data")
+
+
+def test_register_serializer():
+    """Test registration of custom serializers."""
+
+    serializer = serializers.Serializer(
+        "json", 200, lambda obj: json.dumps(obj).encode("utf-8"),
+        lambda data: json.loads(bytes(data))
+    )
+    serializers.register_serializer(serializer)
+    assert serializers.get_serializer("json") == serializer
+    data = serializers.dumps({"a": 1}, [serializer, *DEFAULT])
+    assert _serializer_id(data) == 200
+    assert serializers.loads(data) == {"a": 1}
+    # falls back to next serializer
+    data = serializers.dumps({"a": {1}}, [serializer, *DEFAULT])
+    assert _serializer_id(data) == serializers.SERIALIZERS["pickle"].id
+    with pytest.raises(ValueError):
+        serializers.register_serializer(
+            serializers.Serializer("other", 200, bytes, bytes)
+        )
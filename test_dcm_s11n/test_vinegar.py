@@ -7,12 +7,40 @@ python objects (classes) including their references.
 
 import abc
 import shutil
+import threading
+import pickle
+import hashlib
+from time import sleep
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import pytest
-from dcm_s11n.vinegar import Vinegar, MemoryDB
+from dcm_s11n.vinegar import (
+    Vinegar, MemoryDB, LogDB, SQLiteDB, DedupDB, LockedDB, MetadataFilter,
+    serializers
+)
 
 WORKING_DIR = Path("tmp/")
 DB_FILE = Path("test.json")
+LOG_FILE = Path("test.log")
+SQLITE_FILE = Path("test.sqlite")
+
+class MinimalDB:
+    """
+    Db that only implements the required methods and does not inherit
+    from DBInterface.
+    """
+    def __init__(self):
+        self._db = {}
+    def insert(self, obj, tag):
+        self._db[tag] = obj
+    def find(self, tag):
+        if tag in self._db:
+            return {"tag": tag, "obj": self._db[tag]}
+        return None
+    def all(self):
+        return [self.find(tag) for tag in self._db]
+    def remove(self, tag):
+        self._db.pop(tag, None)
 
 @pytest.fixture(name="example_interface", scope="session")
 def get_example_interface():
@@ -111,13 +139,43 @@ def make_simple_class():
 
     return Jar
 
-@pytest.fixture(name="plain_vinegar")
-def make_plain_vinegar():
+@pytest.fixture(
+    name="plain_db", params=["memory", "log", "sqlite", "tinydb", "dedup"]
+)
+def make_plain_db(request):
+    """
+    Returns a fresh instance for every DBInterface-implementation that
+    is subject to the contract tests below.
+    """
+    def cleanup():
+        for file in WORKING_DIR.glob("test.*"):
+            file.unlink()
+
     # cleanup Vinegar
-    if (WORKING_DIR / DB_FILE).is_file():
-        (WORKING_DIR / DB_FILE).unlink()
+    cleanup()
+    # generate new db
+    if request.param == "log":
+        db = LogDB(WORKING_DIR / LOG_FILE)
+    elif request.param == "sqlite":
+        db = SQLiteDB(WORKING_DIR / SQLITE_FILE)
+    elif request.param == "tinydb":
+        pytest.importorskip("tinydb")
+        from dcm_s11n.vinegar.db_tinydb import TinyDBInterface
+        db = TinyDBInterface(WORKING_DIR / DB_FILE)
+    elif request.param == "dedup":
+        db = DedupDB(SQLiteDB(WORKING_DIR / SQLITE_FILE))
+    else:
+        db = MemoryDB()
+
+    yield db
+
+    if hasattr(db, "close"):
+        db.close()
+    cleanup()
+
+@pytest.fixture(name="plain_vinegar")
+def make_plain_vinegar(plain_db):
     # generate new Vinegar
-    plain_db = MemoryDB()
     plain_vinegar = Vinegar(plain_db)
 
     return plain_vinegar
@@ -200,3 +258,375 @@ def test_remove_record(plain_vinegar, simple_class):
     plain_vinegar.remove("test")
     everything = plain_vinegar.find()
     assert len(everything) == 1
+
+def test_dump_and_load_many(plain_vinegar):
+    """Test batch-operations Vinegar.dump_many and Vinegar.load_many."""
+
+    plain_vinegar.dump("a", tag="test")
+    plain_vinegar.dump_many({"test": "b", "test2": "c", "test3": "d"})
+    assert len(plain_vinegar.find()) == 3
+
+    assert plain_vinegar.load_many(["test3", "unknown", "test"]) == [
+        "d", None, "b"
+    ]
+    assert plain_vinegar.load_many([]) == []
+
+def test_dump_and_load_many_fallback():
+    """
+    Test batch-operations Vinegar.dump_many and Vinegar.load_many for a
+    db that does not inherit from DBInterface.
+    """
+
+    vinegar = Vinegar(MinimalDB())
+    vinegar.dump_many({"test": "a", "test2": "b"})
+    assert vinegar.load_many(["test2", "test3"]) == ["b", None]
+
+def test_load_cache(plain_db):
+    """Test deserialization cache of Vinegar.load."""
+
+    vinegar = Vinegar(plain_db, cache_size=2)
+    vinegar.dump({"a": 1}, tag="test")
+
+    first = vinegar.load("test")
+    assert first == {"a": 1}
+    assert vinegar.load("test") is first
+    assert vinegar.cache_info().hits == 1
+    assert vinegar.cache_info().misses == 1
+
+    # invalidate by dump
+    vinegar.dump({"a": 2}, tag="test")
+    assert vinegar.load("test") == {"a": 2}
+    assert vinegar.cache_info().misses == 2
+
+    # invalidate by remove
+    vinegar.remove("test")
+    assert vinegar.load("test") is None
+
+    # eviction
+    vinegar.dump_many({"test": 1, "test2": 2, "test3": 3})
+    assert vinegar.load_many(["test", "test2", "test3"]) == [1, 2, 3]
+    assert vinegar.cache_info().currsize == 2
+    vinegar.cache_clear()
+    assert vinegar.cache_info() == (0, 0, 2, 0)
+
+def test_load_cache_copy_on_read(plain_db):
+    """Test deserialization cache of Vinegar.load with copy_on_read."""
+
+    vinegar = Vinegar(plain_db, cache_size=1, copy_on_read=True)
+    vinegar.dump({"a": 1}, tag="test")
+
+    first = vinegar.load("test")
+    first["a"] = 2
+    second = vinegar.load("test")
+    assert second == {"a": 1}
+    assert second is not first
+    assert vinegar.cache_info().hits == 1
+
+def test_load_cache_concurrent_dump():
+    """
+    Test that Vinegar.load does not cache an object that has been
+    replaced by a concurrent dump while it was read.
+    """
+
+    reading = threading.Event()
+    release = threading.Event()
+
+    class SlowVinegar(Vinegar):
+        def loads(self, obj_string):
+            obj = super().loads(obj_string)
+            if not release.is_set():
+                reading.set()
+                release.wait(5)
+            return obj
+
+    vinegar = SlowVinegar(LockedDB(MemoryDB()), cache_size=10)
+    vinegar.dump("old", tag="test")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        stale = executor.submit(vinegar.load, "test")
+        assert reading.wait(5)
+        vinegar.dump("new", tag="test")
+        release.set()
+        assert stale.result() == "old"
+    assert vinegar.load("test") == "new"
+    assert vinegar.load("test") == "new"
+    assert vinegar.cache_info().hits == 1
+
+def test_load_cache_threads(plain_db):
+    """Test deserialization cache of Vinegar.load with threads."""
+
+    vinegar = Vinegar(LockedDB(plain_db), cache_size=4)
+    vinegar.dump_many({f"test{i}": i for i in range(8)})
+
+    def work(i):
+        for j in range(200):
+            tag = f"test{(i + j) % 8}"
+            if j % 10 == 0:
+                vinegar.dump((i + j) % 8, tag=tag)
+            assert vinegar.load(tag) == (i + j) % 8
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(work, range(4)))
+    assert vinegar.cache_info().currsize <= 4
+
+def test_load_cache_disabled(plain_vinegar):
+    """Test Vinegar without deserialization cache."""
+
+    plain_vinegar.dump({"a": 1}, tag="test")
+    assert plain_vinegar.load("test") is not plain_vinegar.load("test")
+    assert plain_vinegar.cache_info() is None
+
+def test_compression(plain_db):
+    """Test Vinegar with compression of serialized objects."""
+
+    vinegar = Vinegar(plain_db, codec="zlib", compression_threshold=100)
+    plain_vinegar = Vinegar(plain_db)
+
+    # large object is compressed
+    vinegar.dump("a" * 1000, tag="test")
+    assert len(vinegar.find("test")["obj"]) < len(
+        plain_vinegar.dumps("a" * 1000)
+    )
+    assert vinegar.load("test") == "a" * 1000
+    assert plain_vinegar.load("test") == "a" * 1000
+
+    # small object is not compressed
+    vinegar.dump("a", tag="test2")
+    assert vinegar.find("test2")["obj"] == plain_vinegar.dumps("a")
+
+    # uncompressed records remain readable
+    plain_vinegar.dump("b" * 1000, tag="test3")
+    assert vinegar.load("test3") == "b" * 1000
+
+@pytest.mark.parametrize("codec", [None, "zlib"])
+def test_loads_from_buffer(codec):
+    """Test Vinegar.loads with bytes-like objects other than bytes."""
+
+    vinegar = Vinegar(MemoryDB(), codec=codec, compression_threshold=0)
+    obj = {"a": list(range(1000)), "b": "line1\nline2"}
+    data = vinegar.dumps(obj)
+    assert vinegar.loads(bytearray(data)) == obj
+    assert vinegar.loads(memoryview(data)) == obj
+    assert vinegar.loads(memoryview(b"xx" + data)[2:]) == obj
+
+def test_serializers(plain_db, simple_class):
+    """Test Vinegar with pickle fast path and dill fallback."""
+
+    vinegar = Vinegar(plain_db, codec="zlib", compression_threshold=0)
+    dill_vinegar = Vinegar(plain_db, serializers=["dill"])
+
+    # plain objects are pickled, others are serialized by dill
+    vinegar.dump({"a": 1}, tag="test")
+    vinegar.dump(simple_class, tag="test2")
+    assert dill_vinegar.load("test") == {"a": 1}
+    assert dill_vinegar.load("test2").volume == 1
+
+    # payloads written by dill are loaded regardless of settings
+    dill_vinegar.dump({"b": 2}, tag="test3")
+    assert vinegar.load("test3") == {"b": 2}
+
+    with pytest.raises(ValueError):
+        Vinegar(plain_db, serializers=[])
+
+def test_out_of_band_buffers(plain_db):
+    """Test Vinegar with out-of-band buffers in a buffer directory."""
+
+    vinegar = Vinegar(
+        plain_db, codec="zlib", buffer_directory=WORKING_DIR / "buffers",
+        buffer_threshold=1024
+    )
+    large = bytearray(range(256)) * 100
+    obj = {"large": large, "small": bytearray(b"small"), "c": "c"}
+
+    # large buffers are not part of the record
+    vinegar.dump(obj, tag="test")
+    assert vinegar.load("test") == obj
+    assert len(vinegar.find("test")["obj"]) < 1024
+    assert len(list((WORKING_DIR / "buffers").glob("*/*"))) == 1
+
+    # buffers are shared and memory-mapped on load
+    vinegar.dump_many(
+        {
+            "test2": [large, bytes(large)],
+            "test3": {"a": pickle.PickleBuffer(large)},
+        }
+    )
+    assert vinegar.load("test2") == [large, bytes(large)]
+    assert isinstance(vinegar.load("test2")[1], bytes)
+    restored = vinegar.load("test3")["a"]
+    assert isinstance(restored, memoryview)
+    assert restored == large
+    assert len(list((WORKING_DIR / "buffers").glob("*/*"))) == 1
+
+    # objects without large buffers are pickled as usual
+    assert Vinegar(plain_db).dumps("c") == vinegar.dumps("c")
+    with pytest.raises(ValueError):
+        Vinegar(plain_db).load("test")
+
+    # unreferenced buffers are removed
+    vinegar.dump(large[:10], tag="test4")
+    assert len(list((WORKING_DIR / "buffers").glob("*/*"))) == 1
+    for tag in ("test", "test2"):
+        vinegar.remove(tag)
+    assert vinegar.collect_buffers() == 0
+    vinegar.remove("test3")
+    assert vinegar.collect_buffers() == 1
+    assert vinegar.load("test4") == large[:10]
+
+def test_out_of_band_buffers_serializers(plain_db):
+    """
+    Test that out-of-band buffers respect the configured serializers.
+    """
+
+    # serializers are tried in the given order
+    vinegar = Vinegar(
+        plain_db, serializers=["dill", "pickle"],
+        buffer_directory=WORKING_DIR / "buffers", buffer_threshold=1024
+    )
+    assert vinegar.dumps(bytearray(2048))[:4] == serializers.MAGIC + b"\x02"
+    assert vinegar.loads(vinegar.dumps(bytearray(2048))) == bytearray(2048)
+
+    # out-of-band buffers require pickle
+    with pytest.raises(ValueError):
+        Vinegar(
+            plain_db, serializers=["dill"],
+            buffer_directory=WORKING_DIR / "buffers"
+        )
+
+def test_iterate(plain_vinegar):
+    """Test lazy iteration with prefix filtering and pagination."""
+
+    plain_vinegar.dump_many(
+        {f"b{i:02d}": i for i in range(12)} | {"a": "a", "c": "c"}
+    )
+
+    # tags only
+    assert list(plain_vinegar.iterate(tags_only=True)) == (
+        ["a"] + [f"b{i:02d}" for i in range(12)] + ["c"]
+    )
+    assert list(plain_vinegar.iterate("c", tags_only=True)) == ["c"]
+    assert list(plain_vinegar.iterate("d", tags_only=True)) == []
+
+    # records
+    records = list(plain_vinegar.iterate("b0"))
+    assert [r["tag"] for r in records] == [f"b{i:02d}" for i in range(10)]
+    assert [plain_vinegar.loads(r["obj"]) for r in records] == list(range(10))
+
+    # pagination
+    pages = []
+    page = list(plain_vinegar.iterate("b", limit=5, tags_only=True))
+    while page:
+        pages.append(page)
+        page = list(
+            plain_vinegar.iterate(
+                "b", start_after=page[-1], limit=5, tags_only=True
+            )
+        )
+    assert [len(page) for page in pages] == [5, 5, 2]
+    assert sum(pages, []) == [f"b{i:02d}" for i in range(12)]
+    assert list(plain_vinegar.iterate(start_after="b11", limit=0)) == []
+    assert [
+        r["tag"] for r in plain_vinegar.iterate(start_after="b11", limit=1)
+    ] == ["c"]
+
+def test_iterate_fallback():
+    """Test Vinegar.iterate for a db that does not inherit DBInterface."""
+
+    vinegar = Vinegar(MinimalDB())
+    vinegar.dump_many({"test2": "b", "test1": "a", "other": "c"})
+    assert list(vinegar.iterate("test", tags_only=True)) == [
+        "test1", "test2"
+    ]
+    assert [
+        vinegar.loads(r["obj"]) for r in vinegar.iterate(start_after="test1")
+    ] == ["b"]
+
+def test_metadata(plain_db):
+    """Test metadata of records and queries on metadata."""
+
+    vinegar = Vinegar(plain_db, metadata=True)
+    vinegar.dump("a", tag="str1", labels={"owner": "x"})
+    vinegar.dump_many({"str2": "b" * 100, "int": 1}, labels={"owner": "y"})
+
+    metadata = vinegar.metadata("str1")
+    assert metadata["size"] == len(vinegar.find("str1")["obj"])
+    assert metadata["created"] == metadata["updated"]
+    assert metadata["hash"] == hashlib.sha256(vinegar.dumps("a")).hexdigest()
+    assert metadata["type"] == "builtins.str"
+    assert metadata["labels"] == {"owner": "x"}
+    assert vinegar.metadata("unknown") is None
+
+    # update keeps time of creation
+    sleep(0.01)
+    vinegar.dump("c", tag="str1")
+    updated_metadata = vinegar.metadata("str1")
+    assert updated_metadata["created"] == metadata["created"]
+    assert updated_metadata["updated"] > metadata["updated"]
+    assert updated_metadata["labels"] == {}
+    vinegar.dump_many({"str1": "d"})
+    assert vinegar.metadata("str1")["created"] == metadata["created"]
+
+    # queries
+    def tags(conditions, **kwargs):
+        return [tag for tag, _ in vinegar.query(conditions, **kwargs)]
+    assert tags(MetadataFilter()) == ["int", "str1", "str2"]
+    assert tags(MetadataFilter(type="builtins.str")) == ["str1", "str2"]
+    assert tags(MetadataFilter(labels={"owner": "y"})) == ["int", "str2"]
+    assert tags(MetadataFilter(min_size=100)) == ["str2"]
+    assert tags(MetadataFilter(max_size=99)) == ["int", "str1"]
+    assert tags(
+        MetadataFilter(updated_before=updated_metadata["updated"])
+    ) == ["int", "str2"]
+    assert tags(
+        MetadataFilter(created_after=metadata["created"])
+    ) == ["int", "str2"]
+    assert tags(MetadataFilter(), prefix="str", start_after="str1") == [
+        "str2"
+    ]
+    assert tags(MetadataFilter(), limit=1) == ["int"]
+
+    # metadata are discarded with record or by dump without metadata
+    vinegar.remove("int")
+    assert vinegar.metadata("int") is None
+    Vinegar(plain_db).dump("d", tag="str2")
+    assert vinegar.metadata("str2") is None
+    assert tags(MetadataFilter()) == ["str1"]
+    # ... even if the obj is unchanged
+    Vinegar(plain_db).dump("d", tag="str1")
+    assert vinegar.metadata("str1") is None
+    assert tags(MetadataFilter()) == []
+
+def test_metadata_persistence():
+    """Test that LogDB and SQLiteDB persist metadata."""
+
+    for db_class, file in ((LogDB, LOG_FILE), (SQLiteDB, SQLITE_FILE)):
+        for _file in WORKING_DIR.glob("test.*"):
+            _file.unlink()
+        db = db_class(WORKING_DIR / file)
+        vinegar = Vinegar(db, metadata=True)
+        vinegar.dump("a", tag="test", labels={"key": "value"})
+        vinegar.dump("b", tag="test")
+        vinegar.dump("c", tag="test2", labels={"key": "value"})
+        metadata = vinegar.metadata("test2")
+        if db_class is LogDB:
+            db.compact()
+        db.close()
+
+        db = db_class(WORKING_DIR / file)
+        vinegar = Vinegar(db, metadata=True)
+        assert vinegar.metadata("test2") == metadata
+        assert vinegar.metadata("test")["labels"] == {}
+        assert [
+            tag for tag, _ in vinegar.query(
+                MetadataFilter(labels={"key": "value"})
+            )
+        ] == ["test2"]
+        db.close()
+
+def test_metadata_unsupported():
+    """Test Vinegar with metadata for a db without support."""
+
+    with pytest.raises(ValueError):
+        Vinegar(MinimalDB(), metadata=True)
+    vinegar = Vinegar(MinimalDB())
+    assert vinegar.metadata("test") is None
+    assert list(vinegar.query(MetadataFilter())) == []